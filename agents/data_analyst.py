@@ -1,53 +1,138 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from tools.data_tools import DataTools
 from tools.analysis_tools import AnalysisTools
+from tools.precision import Float32AnalysisTools
+from tools.partition_tools import PartitionedExecutor
+from tools.rollup_cube import RollupCube, RollupCubeCache
+from tools.query_planner import DatasetStatistics
+from tools.time_index import TimeIndex, TimeIndexCache
+from tools.segment_scan import SegmentScanner
+from tools.distribution import DistributionProfiler
+from config import Config
 
 class DataAnalystAgent:
     """Agent responsible for data analysis tasks"""
     
-    def __init__(self):
+    def __init__(self, executor: Optional[PartitionedExecutor] = None):
         self.data_tools = DataTools()
-        self.analysis_tools = AnalysisTools()
+        self.analysis_tools = Float32AnalysisTools() if Config.COMPUTE_PRECISION == "float32" else AnalysisTools()
+        self.executor = executor
+        self.cubes = RollupCubeCache() if Config.ROLLUP_ENABLED else None
+        self.time_indexes = TimeIndexCache()
+        self.segment_scanner = SegmentScanner()
+        self.distribution_profiler = DistributionProfiler()
         self.name = "DataAnalyst"
     
-    def analyze(self, df: pd.DataFrame, analysis_type: str, **kwargs) -> Dict[str, Any]:
-        """Perform analysis based on type"""
+    def _tools_for(self, df: pd.DataFrame, strategy: Optional[str] = None):
+        """Use the partitioned executor for large frames or when planned, AnalysisTools otherwise"""
+        if self.executor is not None:
+            if strategy == "partitioned" or (strategy is None and len(df) >= Config.PARALLEL_MIN_ROWS):
+                return self.executor
+        return self.analysis_tools
+    
+    def _cube_for(self, df: pd.DataFrame, value_col: str, date_col: Optional[str] = None,
+                  group_col: Optional[str] = None, strategy: Optional[str] = None) -> Optional[RollupCube]:
+        """Rollup cube for the frame when enabled, planned or worthwhile, and it covers the query"""
+        if self.cubes is None or strategy not in (None, "rollup"):
+            return None
+        if strategy is None and len(df) < Config.ROLLUP_MIN_ROWS:
+            return None
+        cube = self.cubes.peek(df)
+        if cube is None:
+            # A cube with about as many cells as rows would not save any work, so skip building it
+            if strategy is None and not DatasetStatistics(df).cube_is_compact():
+                return None
+            cube = self.cubes.get(df)
+        return cube if cube.covers(value_col, date_col=date_col, group_col=group_col) else None
+    
+    def time_index_for(self, df: pd.DataFrame, date_col: str) -> TimeIndex:
+        """Parsed and sorted date column, built once per frame"""
+        return self.time_indexes.get(df, date_col)
+    
+    def sample(self, df: pd.DataFrame, rows: Optional[int] = None) -> pd.DataFrame:
+        """Seeded uniform sample of rows, kept in their original order"""
+        rows = rows or Config.PLANNER_SAMPLE_ROWS
+        if len(df) <= rows:
+            return df
+        positions = np.random.default_rng(0).choice(len(df), rows, replace=False)
+        return df.take(np.sort(positions))
+    
+    def analyze(self, df: pd.DataFrame, analysis_type: str, strategy: Optional[str] = None,
+                **kwargs) -> Dict[str, Any]:
+        """Perform analysis based on type, optionally with a planned strategy"""
         
         if analysis_type == "summary":
-            return self._analyze_summary(df)
+            return self._analyze_summary(df, strategy=strategy, **kwargs)
         
         elif analysis_type == "correlation":
-            return self._analyze_correlation(df)
+            return self._analyze_correlation(df, strategy=strategy)
         
         elif analysis_type == "trend":
-            return self._analyze_trend(df, **kwargs)
+            return self._analyze_trend(df, strategy=strategy, **kwargs)
         
         elif analysis_type == "group":
-            return self._analyze_groups(df, **kwargs)
+            return self._analyze_groups(df, strategy=strategy, **kwargs)
         
         elif analysis_type == "anomaly":
-            return self._detect_anomalies(df, **kwargs)
+            return self._detect_anomalies(df, strategy=strategy, **kwargs)
+        
+        elif analysis_type == "segments":
+            return self._scan_segments(df, strategy=strategy, **kwargs)
+        
+        elif analysis_type == "distribution":
+            return self._analyze_distribution(df, strategy=strategy, **kwargs)
         
         else:
             return {"error": f"Unknown analysis type: {analysis_type}"}
     
-    def _analyze_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _basic_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Shape, types and missing values without per-column statistics"""
+        return {
+            "shape": df.shape,
+            "columns": df.columns.tolist(),
+            "dtypes": df.dtypes.to_dict(),
+            "missing_values": df.isnull().sum().to_dict(),
+            "memory_usage": int(df.memory_usage(deep=False).sum())
+        }
+    
+    def _sample_info(self, df: pd.DataFrame, sample: pd.DataFrame) -> Dict[str, int]:
+        return {"sample_rows": len(sample), "rows": len(df)}
+    
+    def _analyze_summary(self, df: pd.DataFrame, detailed: bool = True,
+                         strategy: Optional[str] = None) -> Dict[str, Any]:
         """Generate data summary"""
-        summary = self.data_tools.get_data_summary(df)
+        if not detailed:
+            return self._basic_summary(df)
         
-        # Add descriptive stats for numeric columns
         numeric_cols = df.select_dtypes(include=['number']).columns
-        stats = {}
-        for col in numeric_cols:
-            stats[col] = self.analysis_tools.descriptive_statistics(df, col)
+        
+        if self._tools_for(df, strategy) is self.executor:
+            summary = self.executor.data_summary(df)
+            stats = self.executor.describe_columns(df, numeric_cols.tolist())
+        elif strategy == "sampled":
+            # Counts stay exact; distribution statistics come from the sample
+            sample = self.sample(df)
+            summary = self._basic_summary(df)
+            summary['numeric_summary'] = sample.describe().to_dict()
+            stats = {col: self.analysis_tools.descriptive_statistics(sample, col) for col in numeric_cols}
+            summary['approximate'] = self._sample_info(df, sample)
+        else:
+            summary = self.data_tools.get_data_summary(df)
+            
+            # Add descriptive stats for numeric columns
+            stats = {}
+            for col in numeric_cols:
+                stats[col] = self.analysis_tools.descriptive_statistics(df, col)
         
         summary['detailed_statistics'] = stats
         return summary
     
-    def _analyze_correlation(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_correlation(self, df: pd.DataFrame, strategy: Optional[str] = None) -> Dict[str, Any]:
         """Analyze correlations"""
-        corr_matrix = self.analysis_tools.correlation_analysis(df)
+        sample = self.sample(df) if strategy == "sampled" else df
+        corr_matrix = self._tools_for(df, strategy).correlation_analysis(sample)
         
         # Find strong correlations
         strong_corr = []
@@ -61,24 +146,44 @@ class DataAnalystAgent:
                         "correlation": round(corr_value, 3)
                     })
         
-        return {
+        result = {
             "correlation_matrix": corr_matrix.to_dict(),
             "strong_correlations": strong_corr
         }
+        if sample is not df:
+            result["approximate"] = self._sample_info(df, sample)
+        return result
     
-    def _analyze_trend(self, df: pd.DataFrame, date_col: str, value_col: str) -> Dict[str, Any]:
+    def _analyze_trend(self, df: pd.DataFrame, date_col: str, value_col: str,
+                       strategy: Optional[str] = None) -> Dict[str, Any]:
         """Analyze trends"""
-        trend_result = self.analysis_tools.trend_analysis(df, date_col, value_col)
-        growth_result = self.analysis_tools.calculate_growth_rate(df, date_col, value_col)
+        cube = self._cube_for(df, value_col, date_col=date_col, strategy=strategy)
+        if cube is not None:
+            trend_result = self.analysis_tools.trend_analysis(df, date_col, value_col, cube=cube)
+            growth_result = self.analysis_tools.calculate_growth_rate(df, date_col, value_col, cube=cube)
+        else:
+            tools = self._tools_for(df, strategy)
+            if tools is self.executor:
+                trend_result = tools.trend_analysis(df, date_col, value_col)
+                growth_result = tools.calculate_growth_rate(df, date_col, value_col)
+            else:
+                time_index = self.time_index_for(df, date_col)
+                trend_result = tools.trend_analysis(df, date_col, value_col, time_index=time_index)
+                growth_result = tools.calculate_growth_rate(df, date_col, value_col, time_index=time_index)
         
         return {
             "trend_analysis": trend_result,
             "growth_analysis": growth_result
         }
     
-    def _analyze_groups(self, df: pd.DataFrame, group_col: str, value_col: str) -> Dict[str, Any]:
+    def _analyze_groups(self, df: pd.DataFrame, group_col: str, value_col: str,
+                        strategy: Optional[str] = None) -> Dict[str, Any]:
         """Analyze by groups"""
-        group_stats = self.analysis_tools.group_analysis(df, group_col, value_col)
+        cube = self._cube_for(df, value_col, group_col=group_col, strategy=strategy)
+        if cube is not None:
+            group_stats = self.analysis_tools.group_analysis(df, group_col, value_col, cube=cube)
+        else:
+            group_stats = self._tools_for(df, strategy).group_analysis(df, group_col, value_col)
         
         return {
             "group_statistics": group_stats.to_dict(),
@@ -86,12 +191,30 @@ class DataAnalystAgent:
             "worst_performing": group_stats['mean'].idxmin()
         }
     
-    def _detect_anomalies(self, df: pd.DataFrame, column: str) -> Dict[str, Any]:
+    def _detect_anomalies(self, df: pd.DataFrame, column: str,
+                          strategy: Optional[str] = None) -> Dict[str, Any]:
         """Detect anomalies"""
-        anomaly_indices = self.analysis_tools.detect_anomalies(df, column)
+        anomaly_indices = self._tools_for(df, strategy).detect_anomalies(df, column)
         
         return {
             "anomaly_count": len(anomaly_indices),
             "anomaly_indices": anomaly_indices,
             "anomaly_percentage": round(len(anomaly_indices) / len(df) * 100, 2)
         }
+    
+    def _scan_segments(self, df: pd.DataFrame, strategy: Optional[str] = None) -> Dict[str, Any]:
+        """Rank every category x metric segment by how far it deviates from the rest"""
+        sample = self.sample(df) if strategy == "sampled" else df
+        result = self.segment_scanner.scan(sample)
+        if sample is not df:
+            result["approximate"] = self._sample_info(df, sample)
+        return result
+    
+    def _analyze_distribution(self, df: pd.DataFrame, columns: Optional[list] = None,
+                              strategy: Optional[str] = None) -> Dict[str, Any]:
+        """Histograms, quantiles and moments of numeric columns"""
+        sample = self.sample(df) if strategy == "sampled" else df
+        result = self.distribution_profiler.profile(sample, columns)
+        if sample is not df:
+            result["approximate"] = self._sample_info(df, sample)
+        return result
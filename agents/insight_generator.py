@@ -32,6 +32,14 @@ class InsightGeneratorAgent:
         if "anomaly" in analysis_results:
             insights.extend(self._generate_anomaly_insights(analysis_results["anomaly"]))
         
+        # Segment insights
+        if "segments" in analysis_results:
+            insights.extend(self._generate_segment_insights(analysis_results["segments"]))
+        
+        # Distribution insights
+        if "distribution" in analysis_results:
+            insights.extend(self._generate_distribution_insights(analysis_results["distribution"]))
+        
         return insights
     
     def _generate_summary_insights(self, summary: Dict[str, Any]) -> List[str]:
@@ -110,3 +118,50 @@ class InsightGeneratorAgent:
             insights.append("✅ No significant anomalies detected")
         
         return insights
+    
+    def _generate_segment_insights(self, segments: Dict[str, Any]) -> List[str]:
+        """Generate insights from the segment scan"""
+        insights = []
+        
+        top = segments.get("segments", [])
+        if not top:
+            insights.append(f"🔍 No segment stands out across {segments.get('segments_scanned', 0):,} "
+                            f"category × metric combinations")
+            return insights
+        
+        for segment in top[:3]:  # Top 3
+            if segment["lift_percent"] is not None:
+                change = f"{segment['lift_percent']:+.1f}% vs average"
+            else:
+                change = f"{segment['effect_size']:+.2f} std vs average"
+            insights.append(
+                f"🔍 {segment['dimension']} = {segment['segment']}: {segment['metric']} {change} "
+                f"({segment['count']:,} rows, z = {segment['z_score']:.1f})"
+            )
+        
+        return insights
+    
+    def _generate_distribution_insights(self, distribution: Dict[str, Any]) -> List[str]:
+        """Generate insights from column distributions"""
+        insights = []
+        
+        # Pearson's median skewness, 3 * (mean - median) / std
+        skews = {}
+        for col, stats in distribution.get("distributions", {}).items():
+            if stats.get("count", 0) > 1 and stats["std"] > 0:
+                skews[col] = 3 * (stats["mean"] - stats["quantiles"]["p50"]) / stats["std"]
+        
+        for col in sorted(skews, key=lambda c: abs(skews[c]), reverse=True)[:3]:  # Most skewed 3
+            stats = distribution["distributions"][col]
+            q = stats["quantiles"]
+            shape = "symmetric"
+            if skews[col] > 0.5:
+                shape = "right-skewed"
+            elif skews[col] < -0.5:
+                shape = "left-skewed"
+            insights.append(
+                f"📐 {col} is {shape}: median {q['p50']:.2f}, mean {stats['mean']:.2f}, "
+                f"middle 50% between {q['p25']:.2f} and {q['p75']:.2f}, 99th percentile {q['p99']:.2f}"
+            )
+        
+        return insights
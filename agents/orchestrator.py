@@ -1,63 +1,148 @@
+import time
 import pandas as pd
-from typing import Dict, Any, List
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 from agents.data_analyst import DataAnalystAgent
 from agents.visualizer import VisualizerAgent
 from agents.insight_generator import InsightGeneratorAgent
 from agents.recommender import RecommenderAgent
 from memory.memory_system import MemorySystem
+from tools.tracer import get_tracer
+from tools.partition_tools import PartitionedExecutor
+from tools.shared_dataset import SharedDatasetRegistry
+from tools.rollup_cube import detect_date_column
+from tools.time_index import parse_time_window
+from tools.query_planner import QueryPlanner
+from tools.resource_governor import ResourceGovernor
+from config import Config
 
 class OrchestratorAgent:
     """Main orchestrator that coordinates all agents"""
     
     def __init__(self):
-        self.data_analyst = DataAnalystAgent()
+        self.datasets = SharedDatasetRegistry()
+        executor = PartitionedExecutor(registry=self.datasets) if Config.PARALLEL_ENABLED else None
+        self.data_analyst = DataAnalystAgent(executor)
         self.visualizer = VisualizerAgent()
         self.insight_generator = InsightGeneratorAgent()
         self.recommender = RecommenderAgent()
         self.memory = MemorySystem()
+        self.planner = QueryPlanner(self.data_analyst)
+        self.governor = ResourceGovernor() if Config.GOVERNOR_ENABLED else None
+        self.tracer = get_tracer()
         self.name = "Orchestrator"
     
-    def process_query(self, query: str, df: pd.DataFrame) -> Dict[str, Any]:
+    def process_query(self, query: str, df: pd.DataFrame, profile: bool = False,
+                      explain: bool = False) -> Dict[str, Any]:
         """Process user query and coordinate agents"""
         
-        print(f"\n🤖 Orchestrator: Processing query: '{query}'")
-        
-        # Check memory for relevant past analyses
-        relevant_memories = self.memory.get_relevant_memories(query)
+        if not profile:
+            return self._run_query(query, df, explain)
         
-        # Parse query and create execution plan
-        plan = self._create_execution_plan(query, df)
-        
-        print(f"📋 Execution Plan: {plan['description']}")
+        # Opt-in cProfile/tracemalloc run for a single query
+        profile_name = f"query_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        with self.tracer.profile(Config.PROFILE_DIR, profile_name) as report:
+            response = self._run_query(query, df, explain)
+        response["profile"] = report
+        return response
+    
+    def _run_query(self, query: str, df: pd.DataFrame, explain: bool = False) -> Dict[str, Any]:
+        """Execute the plan for a query inside a trace"""
         
-        # Execute analysis
-        analysis_results = {}
-        agents_used = []
+        print(f"\n🤖 Orchestrator: Processing query: '{query}'")
         
-        for task in plan['tasks']:
-            agent_name = task['agent']
-            agents_used.append(agent_name)
+        with self.tracer.span("process_query", "orchestrator", query=query, rows=len(df)) as root:
+            budget = self.governor.start_query() if self.governor is not None else None
             
-            if agent_name == "DataAnalyst":
-                print(f"  🔬 {agent_name}: {task['action']}")
-                result = self.data_analyst.analyze(df, task['analysis_type'], **task.get('params', {}))
-                analysis_results[task['analysis_type']] = result
+            # Hand agents and workers a zero-copy view over the shared dataset
+            if Config.SHARED_DATA_ENABLED:
+                with self.tracer.span("share_dataset", "orchestrator"):
+                    df = self.datasets.share(df).to_frame()
             
-            elif agent_name == "Visualizer":
-                print(f"  📊 {agent_name}: {task['action']}")
-                result = self.visualizer.create_visualization(df, task['viz_type'], **task.get('params', {}))
-                analysis_results['visualization'] = result
-        
-        # Generate insights
-        print(f"  💡 InsightGenerator: Generating insights")
-        insights = self.insight_generator.generate_insights(analysis_results)
-        
-        # Generate recommendations
-        print(f"  🎯 Recommender: Generating recommendations")
-        recommendations = self.recommender.generate_recommendations(analysis_results, insights)
-        
-        # Store in memory
-        self.memory.add_memory(query, agents_used, analysis_results, "\n".join(insights))
+            # Restrict the data to a time window named in the query
+            time_window = None
+            window = parse_time_window(query)
+            if window is not None:
+                with self.tracer.span("time_window", "orchestrator", window=window["label"]):
+                    df, time_window = self._apply_time_window(df, window)
+            
+            # Check memory for relevant past analyses
+            relevant_memories = self.memory.get_relevant_memories(query)
+            
+            # Parse query and create execution plan
+            with self.tracer.span("plan", "orchestrator"):
+                plan = self._create_execution_plan(query, df)
+            
+            print(f"📋 Execution Plan: {plan['description']}")
+            
+            # Execute analysis
+            analysis_results = {}
+            agents_used = []
+            
+            for task in list(plan['tasks']):
+                agent_name = task['agent']
+                
+                # Degrade or drop tasks that would not fit the query's memory and time budget
+                if budget is not None:
+                    reason = None
+                    if task.get('source') and task['source'] not in analysis_results:
+                        reason = f"{task['source']} analysis was rejected"
+                    elif not self._admit(task, df, budget):
+                        reason = task['governor']['reason']
+                    if reason is not None:
+                        plan['tasks'].remove(task)
+                        name = f"{agent_name}.{task.get('analysis_type') or task.get('viz_type')}"
+                        plan['skipped'].append({"task": name, "reason": f"governor: {reason}"})
+                        print(f"  ⛔ {agent_name}: {task['action']} rejected ({reason})")
+                        continue
+                
+                # A column without finite values has no histogram to chart
+                if (task.get('source') == "distribution" and "distribution" in analysis_results
+                        and self._histogram(task, analysis_results) is None):
+                    plan['tasks'].remove(task)
+                    plan['skipped'].append({"task": f"{agent_name}.{task['viz_type']}",
+                                            "reason": "column has no finite values"})
+                    print(f"  ⏭  {agent_name}: {task['action']} skipped (no finite values)")
+                    continue
+                
+                agents_used.append(agent_name)
+                started = time.perf_counter()
+                
+                if agent_name == "DataAnalyst":
+                    print(f"  🔬 {agent_name}: {task['action']} [{task['strategy']}]")
+                    with self.tracer.span(f"{agent_name}.{task['analysis_type']}", "task", rows=len(df),
+                                          strategy=task['strategy']):
+                        result = self.data_analyst.analyze(df, task['analysis_type'], strategy=task['strategy'],
+                                                           **task.get('params', {}))
+                    analysis_results[task['analysis_type']] = result
+                
+                elif agent_name == "Visualizer":
+                    print(f"  📊 {agent_name}: {task['action']}")
+                    viz_df = self._task_data(task, df, analysis_results)
+                    if task.get('strategy') == "sampled":
+                        viz_df = self.data_analyst.sample(viz_df)
+                    with self.tracer.span(f"{agent_name}.{task['viz_type']}", "task", rows=len(viz_df)):
+                        result = self.visualizer.create_visualization(viz_df, task['viz_type'], **task.get('params', {}))
+                    analysis_results['visualization'] = result
+                
+                task['actual_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            
+            if budget is not None:
+                plan['estimated_ms'] = round(sum(task['estimated_ms'] for task in plan['tasks']), 2)
+            
+            # Generate insights
+            print(f"  💡 InsightGenerator: Generating insights")
+            with self.tracer.span("InsightGenerator.generate_insights", "task"):
+                insights = self.insight_generator.generate_insights(analysis_results)
+            
+            # Generate recommendations
+            print(f"  🎯 Recommender: Generating recommendations")
+            with self.tracer.span("Recommender.generate_recommendations", "task"):
+                recommendations = self.recommender.generate_recommendations(analysis_results, insights)
+            
+            # Store in memory
+            with self.tracer.span("MemorySystem.add_memory", "memory"):
+                self.memory.add_memory(query, agents_used, analysis_results, "\n".join(insights))
         
         # Compile final response
         response = {
@@ -70,108 +155,101 @@ class OrchestratorAgent:
             "relevant_memories": relevant_memories
         }
         
-        return response
-    
-    def _create_execution_plan(self, query: str, df: pd.DataFrame) -> Dict[str, Any]:
-        """Create execution plan based on query"""
+        if time_window is not None:
+            response["time_window"] = time_window
         
-        query_lower = query.lower()
-        tasks = []
+        if explain or Config.PLANNER_EXPLAIN:
+            response["explain"] = self.planner.explain(plan)
+            print(response["explain"])
         
-        # Always start with summary
-        tasks.append({
-            "agent": "DataAnalyst",
-            "action": "Generate data summary",
-            "analysis_type": "summary"
-        })
+        if root is not None:
+            response["trace"] = self.tracer.get_trace(root.trace_id)
+            self.tracer.export(Config.TRACE_FILE, Config.TRACE_FORMAT)
         
-        # Detect query intent
-        if any(word in query_lower for word in ["trend", "time", "over time", "growth"]):
-            # Find date and value columns
-            date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
-            if not date_cols:
-                date_cols = [col for col in df.columns if 'date' in col.lower()]
-            
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-            
-            if date_cols and numeric_cols:
-                tasks.append({
-                    "agent": "DataAnalyst",
-                    "action": "Analyze trends",
-                    "analysis_type": "trend",
-                    "params": {"date_col": date_cols[0], "value_col": numeric_cols[0]}
-                })
-                
-                tasks.append({
-                    "agent": "Visualizer",
-                    "action": "Create trend visualization",
-                    "viz_type": "line",
-                    "params": {
-                        "x_col": date_cols[0],
-                        "y_col": numeric_cols[0],
-                        "title": f"{numeric_cols[0]} Trend Over Time"
-                    }
-                })
-        
-        if any(word in query_lower for word in ["correlation", "relationship", "related"]):
-            tasks.append({
-                "agent": "DataAnalyst",
-                "action": "Analyze correlations",
-                "analysis_type": "correlation"
-            })
-            
-            tasks.append({
-                "agent": "Visualizer",
-                "action": "Create correlation heatmap",
-                "viz_type": "heatmap",
-                "params": {"title": "Correlation Matrix"}
-            })
-        
-        if any(word in query_lower for word in ["group", "by", "category", "segment"]):
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-            
-            if categorical_cols and numeric_cols:
-                tasks.append({
-                    "agent": "DataAnalyst",
-                    "action": "Analyze by groups",
-                    "analysis_type": "group",
-                    "params": {"group_col": categorical_cols[0], "value_col": numeric_cols[0]}
-                })
-                
-                # Create aggregated data for visualization
-                group_data = df.groupby(categorical_cols[0])[numeric_cols[0]].mean().reset_index()
-                
-                tasks.append({
-                    "agent": "Visualizer",
-                    "action": "Create group comparison",
-                    "viz_type": "bar",
-                    "params": {
-                        "x_col": categorical_cols[0],
-                        "y_col": numeric_cols[0],
-                        "title": f"{numeric_cols[0]} by {categorical_cols[0]}"
-                    }
-                })
-        
-        if any(word in query_lower for word in ["anomaly", "outlier", "unusual"]):
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-            if numeric_cols:
-                tasks.append({
-                    "agent": "DataAnalyst",
-                    "action": "Detect anomalies",
-                    "analysis_type": "anomaly",
-                    "params": {"column": numeric_cols[0]}
-                })
+        return response
+    
+    def _admit(self, task: Dict[str, Any], df: pd.DataFrame, budget) -> bool:
+        """Ask the governor whether a task fits, possibly switching it to a cheaper strategy"""
+        stats = self.planner.statistics(df)
+        index_cached = (stats.date_col is None
+                        or self.data_analyst.time_indexes.peek(df, stats.date_col) is not None)
+        cubes = self.data_analyst.cubes
+        cube_cached = cubes is None or cubes.peek(df) is not None
+        admitted = self.governor.admit(task, stats, budget, index_cached, cube_cached)
+        if task['governor']['action'] == "degraded":
+            print(f"  ⚠️ {task['agent']}: {task['action']} degraded to {task['strategy']} "
+                  f"({task['governor']['reason']})")
+        return admitted
+    
+    def _apply_time_window(self, df: pd.DataFrame,
+                           window: Dict[str, Any]) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+        """Slice the rows in a query's time window using the cached time index"""
+        date_col = detect_date_column(df)
+        if date_col is None:
+            return df, None
+        
+        index = self.data_analyst.time_index_for(df, date_col)
+        start, end = index.resolve(window)
+        lo, hi = index.bounds(start, end)
+        time_window = {
+            "label": window["label"],
+            "column": date_col,
+            "start": str(pd.Timestamp(index.values[lo])) if hi > lo else None,
+            "end": str(pd.Timestamp(index.values[hi - 1])) if hi > lo else None,
+            "rows": hi - lo,
+            "applied": hi > lo
+        }
         
-        # If no specific intent, do comprehensive analysis
-        if len(tasks) == 1:  # Only summary task
-            tasks.append({
-                "agent": "DataAnalyst",
-                "action": "Analyze correlations",
-                "analysis_type": "correlation"
-            })
+        if hi == lo:
+            print(f"🕒 Time window '{window['label']}' matches no rows, using all data")
+            return df, time_window
         
-        return {
-            "description": f"Execute {len(tasks)} analysis tasks",
-            "tasks": tasks
-        }
+        print(f"🕒 Time window: {window['label']} ({hi - lo:,} of {len(df):,} rows)")
+        return index.slice(df, start, end), time_window
+    
+    def prepare(self, df: pd.DataFrame):
+        """Build the planner statistics, time index and rollup cube for a frame ahead of queries"""
+        stats = self.planner.statistics(df)
+        if stats.date_col is not None:
+            self.data_analyst.time_index_for(df, stats.date_col)
+        if self.data_analyst.cubes is not None:
+            self.data_analyst.cubes.get(df)
+    
+    def drop_dataset(self, df: pd.DataFrame):
+        """Free the shared segments backing a DataFrame"""
+        self.datasets.release(df)
+    
+    def close(self):
+        """Release worker processes and shared datasets"""
+        if self.data_analyst.executor is not None:
+            self.data_analyst.executor.close()
+        self.datasets.drop_all()
+    
+    def _create_execution_plan(self, query: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Create execution plan based on query"""
+        return self.planner.plan(query, df)
+    
+    @staticmethod
+    def _histogram(task: Dict[str, Any], analysis_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Bins the distribution analysis produced for a chart's column, if it has any"""
+        distribution = analysis_results.get("distribution")
+        if distribution is None:
+            return None
+        return distribution["distributions"].get(str(task["params"]["column"]), {}).get("histogram")
+    
+    def _task_data(self, task: Dict[str, Any], df: pd.DataFrame,
+                   analysis_results: Dict[str, Any]) -> pd.DataFrame:
+        """Input frame for a visualization, reusing analysis output when the plan says so"""
+        group = analysis_results.get("group")
+        if task.get("source") == "group" and group is not None:
+            params = task["params"]
+            means = pd.Series(group["group_statistics"]["mean"])
+            return pd.DataFrame({params["x_col"]: means.index.astype(str), params["y_col"]: means.values})
+        correlation = analysis_results.get("correlation")
+        if task.get("source") == "correlation" and correlation is not None:
+            return pd.DataFrame(correlation["correlation_matrix"])
+        histogram = self._histogram(task, analysis_results)
+        if task.get("source") == "distribution" and histogram is not None:
+            edges = histogram["edges"]
+            return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": histogram["counts"]})
+        return df
@@ -28,6 +28,10 @@ class RecommenderAgent:
         if "anomaly" in analysis_results:
             recommendations.extend(self._recommend_from_anomaly(analysis_results["anomaly"]))
         
+        # Based on segments
+        if "segments" in analysis_results:
+            recommendations.extend(self._recommend_from_segments(analysis_results["segments"]))
+        
         # Prioritize recommendations
         return self._prioritize_recommendations(recommendations)
     
@@ -109,6 +113,36 @@ class RecommenderAgent:
         
         return recommendations
     
+    def _recommend_from_segments(self, segments: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Recommendations from the strongest segments above and below average"""
+        recommendations = []
+        
+        top = segments.get("segments", [])
+        above = next((seg for seg in top if seg["direction"] == "above"), None)
+        below = next((seg for seg in top if seg["direction"] == "below"), None)
+        
+        if below is not None:
+            recommendations.append({
+                "priority": "high",
+                "action": "Investigate Underperforming Segment",
+                "recommendation": f"{below['dimension']} '{below['segment']}' lags on {below['metric']} "
+                                  f"({self._segment_change(below)}) - review what sets it apart and address it"
+            })
+        if above is not None:
+            recommendations.append({
+                "priority": "medium",
+                "action": "Replicate Segment Success",
+                "recommendation": f"{above['dimension']} '{above['segment']}' leads on {above['metric']} "
+                                  f"({self._segment_change(above)}) - identify its drivers and apply them elsewhere"
+            })
+        
+        return recommendations
+    
+    def _segment_change(self, segment: Dict[str, Any]) -> str:
+        if segment["lift_percent"] is not None:
+            return f"{segment['lift_percent']:+.1f}% vs average"
+        return f"{segment['effect_size']:+.2f} std vs average"
+    
     def _prioritize_recommendations(self, recommendations: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Sort recommendations by priority"""
         priority_order = {"high": 0, "medium": 1, "low": 2}
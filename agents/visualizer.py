@@ -1,17 +1,77 @@
+import io
+from pathlib import Path
+import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional
 from tools.viz_tools import VizTools
+from tools.chart_cache import ChartCache, chart_columns, chart_key, fingerprint_frame
+from config import Config
 
 class VisualizerAgent:
     """Agent responsible for creating visualizations"""
     
-    def __init__(self):
+    def __init__(self, chart_cache: Optional[ChartCache] = None):
         self.viz_tools = VizTools()
         self.name = "Visualizer"
+        if chart_cache is None and Config.CHART_CACHE_ENABLED:
+            chart_cache = ChartCache(Config.CHART_CACHE_DIR, Config.CHART_CACHE_MAX_MB * 1024 * 1024,
+                                     Config.CHART_CACHE_HOT_ENTRIES)
+        self.chart_cache = chart_cache
     
     def create_visualization(self, df: pd.DataFrame, viz_type: str, **kwargs) -> Dict[str, Any]:
         """Create visualization based on type"""
         
+        if self.chart_cache is None:
+            return self._render(df, viz_type, **kwargs)
+        
+        try:
+            return self._cached_visualization(df, viz_type, **kwargs)
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+    
+    def _cached_visualization(self, df: pd.DataFrame, viz_type: str, save_path: Optional[str] = None,
+                              **kwargs) -> Dict[str, Any]:
+        """Serve a chart's image bytes from the cache, rendering and storing it on a miss"""
+        fmt = Path(save_path).suffix.lstrip(".").lower() if save_path else Config.CHART_FORMAT
+        if fmt not in ("png", "svg"):
+            fmt = Config.CHART_FORMAT
+        
+        fingerprint = fingerprint_frame(df[list(chart_columns(viz_type, kwargs, df))])
+        key = chart_key(fingerprint, viz_type, kwargs, fmt, Config.CHART_DPI)
+        
+        image = self.chart_cache.get(key, fmt)
+        cached = image is not None
+        figure = None
+        if not cached:
+            result = self._render(df, viz_type, **kwargs)
+            if result.get("status") != "success":
+                return result
+            figure = result["figure"]
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format=fmt, dpi=Config.CHART_DPI, bbox_inches='tight')
+            image = buffer.getvalue()
+            self.chart_cache.put(key, fmt, image)
+        
+        if save_path:
+            Path(save_path).write_bytes(image)
+        
+        return {
+            "status": "success",
+            "viz_type": viz_type,
+            "figure": figure,
+            "image": image,
+            "format": fmt,
+            "chart_key": key,
+            "cached": cached
+        }
+    
+    def _render(self, df: pd.DataFrame, viz_type: str, **kwargs) -> Dict[str, Any]:
+        """Draw a chart with matplotlib"""
+        
         try:
             if viz_type == "line":
                 fig = self.viz_tools.create_line_chart(df, **kwargs)
@@ -28,8 +88,16 @@ class VisualizerAgent:
             elif viz_type == "distribution":
                 fig = self.viz_tools.create_distribution_plot(df, **kwargs)
             
+            elif viz_type == "histogram":
+                # df holds precomputed bins: one row per bin with bin_start, bin_end and count
+                edges = np.append(df["bin_start"].to_numpy(), df["bin_end"].to_numpy()[-1:])
+                fig = self.viz_tools.create_histogram_plot(edges, df["count"].to_numpy(), **kwargs)
+            
             else:
-                return {"error": f"Unknown visualization type: {viz_type}"}
+                return {"status": "error", "error": f"Unknown visualization type: {viz_type}"}
+            
+            # Detach from pyplot so figures do not accumulate across queries; the caller keeps its reference
+            plt.close(fig)
             
             return {
                 "status": "success",
@@ -47,7 +115,7 @@ class VisualizerAgent:
         """Suggest appropriate visualization type"""
         
         numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
         
         if "trend" in analysis_goal.lower() or "time" in analysis_goal.lower():
             return "line"
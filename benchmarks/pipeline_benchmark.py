@@ -0,0 +1,320 @@
+"""Benchmark suite for the analytics pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.pipeline_benchmark --sizes 1000 10000 100000 --output run.json
+    python -m benchmarks.pipeline_benchmark --compare baseline.json run.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from agents.data_analyst import DataAnalystAgent
+from agents.orchestrator import OrchestratorAgent
+from memory.memory_system import MemorySystem
+from tools.analysis_tools import AnalysisTools
+from tools.data_tools import DataTools
+from tools.viz_tools import VizTools
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_WIDE_COLUMNS = [0, 50]
+DEFAULT_MEMORY_SIZES = [10, 100, 1_000]
+SUITES = ["analysis", "viz", "memory", "pipeline"]
+
+PIPELINE_QUERIES = [
+    "Analyze sales trends over time",
+    "What are the correlations between different metrics?",
+    "Compare performance by region",
+    "Detect any anomalies in the sales data"
+]
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS counter (Linux only, best effort)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_bytes() -> int:
+    """Peak resident set size since the last reset"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is the lifetime peak, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> Dict[str, Any]:
+    """Time a callable and record its peak RSS and Python allocations"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        plt.close('all')
+
+    # Separate traced run so tracemalloc overhead does not skew the timings
+    gc.collect()
+    _reset_peak_rss()
+    rss_before = _peak_rss_bytes()
+    tracemalloc.start()
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_rss = _peak_rss_bytes()
+    plt.close('all')
+
+    return {
+        "wall_time_min": min(timings),
+        "wall_time_median": statistics.median(timings),
+        "wall_time_mean": statistics.mean(timings),
+        "repeat": repeat,
+        "peak_rss_bytes": peak_rss,
+        "peak_rss_delta_bytes": max(peak_rss - rss_before, 0),
+        "alloc_peak_bytes": peak,
+        "alloc_retained_bytes": current
+    }
+
+
+def make_dataset(rows: int, extra_columns: int = 0, seed: int = 42) -> pd.DataFrame:
+    """Sample sales data, optionally widened with extra numeric metrics"""
+    df = DataTools.generate_sample_data(rows=rows)
+    if extra_columns:
+        rng = np.random.default_rng(seed)
+        extra = pd.DataFrame(
+            rng.normal(size=(rows, extra_columns)),
+            columns=[f"metric_{i}" for i in range(extra_columns)]
+        )
+        df = pd.concat([df, extra], axis=1)
+    return df
+
+
+def _sample_memory_record(df: pd.DataFrame) -> Dict[str, Any]:
+    """Build a memory entry shaped like the ones process_query stores"""
+    analyst = DataAnalystAgent()
+    results = {
+        "summary": analyst.analyze(df, "summary"),
+        "correlation": analyst.analyze(df, "correlation"),
+        "trend": analyst.analyze(df, "trend", date_col="date", value_col="sales"),
+        "group": analyst.analyze(df, "group", group_col="product", value_col="sales"),
+        "anomaly": analyst.analyze(df, "anomaly", column="sales")
+    }
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "query": "Analyze sales trends over time by region",
+        "agents_used": ["DataAnalyst", "DataAnalyst", "Visualizer"],
+        "results": results,
+        "insights": "Benchmark insight"
+    }
+
+
+class PipelineBenchmark:
+    """Runs the benchmark suites and collects results"""
+
+    def __init__(self, sizes: List[int], wide_columns: List[int], memory_sizes: List[int],
+                 repeat: int = 3, suites: Optional[List[str]] = None):
+        self.sizes = sizes
+        self.wide_columns = wide_columns
+        self.memory_sizes = memory_sizes
+        self.repeat = repeat
+        self.suites = suites or SUITES
+        self.results: List[Dict[str, Any]] = []
+        self.workdir = Path(tempfile.mkdtemp(prefix="agentic_bench_"))
+
+    def run(self) -> Dict[str, Any]:
+        """Run all selected suites"""
+        for rows in self.sizes:
+            for extra in self.wide_columns:
+                df = make_dataset(rows, extra)
+                if "analysis" in self.suites:
+                    self._bench_analysis(df, rows)
+                if "viz" in self.suites:
+                    self._bench_viz(df, rows)
+                if "pipeline" in self.suites:
+                    self._bench_pipeline(df, rows)
+                del df
+                gc.collect()
+
+        if "memory" in self.suites:
+            self._bench_memory()
+
+        return {"metadata": self._metadata(), "results": self.results}
+
+    def _record(self, suite: str, case: str, fn: Callable[[], Any], **params):
+        """Measure one case and store the result"""
+        print(f"  ⏱  {suite}/{case} {params}")
+        try:
+            metrics = measure(fn, self.repeat)
+            metrics["status"] = "success"
+        except Exception as e:
+            metrics = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        self.results.append({"suite": suite, "case": case, **params, **metrics})
+
+    def _bench_analysis(self, df: pd.DataFrame, rows: int):
+        """Time every AnalysisTools analysis"""
+        tools = AnalysisTools()
+        params = {"rows": rows, "columns": len(df.columns)}
+        cases = {
+            "descriptive_statistics": lambda: tools.descriptive_statistics(df, "sales"),
+            "correlation_analysis": lambda: tools.correlation_analysis(df),
+            "trend_analysis": lambda: tools.trend_analysis(df, "date", "sales"),
+            "detect_anomalies": lambda: tools.detect_anomalies(df, "sales"),
+            "group_analysis": lambda: tools.group_analysis(df, "region", "sales"),
+            "calculate_growth_rate": lambda: tools.calculate_growth_rate(df, "date", "sales")
+        }
+        for case, fn in cases.items():
+            self._record("analysis", case, fn, **params)
+
+    def _bench_viz(self, df: pd.DataFrame, rows: int):
+        """Time every VizTools chart type, including the PNG export"""
+        viz = VizTools()
+        params = {"rows": rows, "columns": len(df.columns)}
+        group_data = df.groupby("region")["sales"].mean().reset_index()
+        corr = AnalysisTools.correlation_analysis(df)
+        out = str(self.workdir / "chart.png")
+        cases = {
+            "line": lambda: viz.create_line_chart(df, "date", "sales", save_path=out),
+            "bar": lambda: viz.create_bar_chart(group_data, "region", "sales", save_path=out),
+            "scatter": lambda: viz.create_scatter_plot(df, "sales", "revenue", hue_col="region",
+                                                       save_path=out),
+            "heatmap": lambda: viz.create_heatmap(corr, save_path=out),
+            "distribution": lambda: viz.create_distribution_plot(df, "sales", save_path=out)
+        }
+        for case, fn in cases.items():
+            self._record("viz", case, fn, **params)
+
+    def _bench_pipeline(self, df: pd.DataFrame, rows: int):
+        """Time end-to-end process_query for each example query"""
+        orchestrator = OrchestratorAgent()
+        orchestrator.memory = MemorySystem(str(self.workdir / "pipeline_memory.json"))
+        params = {"rows": rows, "columns": len(df.columns)}
+
+        for query in PIPELINE_QUERIES:
+            def run_query(query=query):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    orchestrator.process_query(query, df)
+            self._record("pipeline", query, run_query, **params)
+
+    def _bench_memory(self):
+        """Time memory appends, compaction, load and retrieval as the store grows"""
+        record = _sample_memory_record(make_dataset(1_000))
+        for size in self.memory_sizes:
+            memory_file = self.workdir / f"memory_{size}.json"
+            memory = MemorySystem(str(memory_file), max_size=size)
+            # Assigning the memories writes the full store; it is setup, not a timed case
+            memory.memories = [dict(record, query=f"{record['query']} {i}") for i in range(size)]
+            params = {"memory_size": size}
+
+            # A full store keeps appending, compacting once the log holds twice max_size records
+            self._record("memory", "add_memory",
+                         lambda: memory.add_memory(record["query"], record["agents_used"],
+                                                   record["results"], record["insights"]), **params)
+            self._record("memory", "compact", memory.save_memory, **params)
+            self._record("memory", "load_memory",
+                         lambda: MemorySystem(str(memory_file), max_size=size), **params)
+            self._record("memory", "get_relevant_memories",
+                         lambda: memory.get_relevant_memories("sales trends by region"), **params)
+            self._record("memory", "get_statistics", memory.get_statistics, **params)
+
+    def _metadata(self) -> Dict[str, Any]:
+        """Environment details needed to compare runs"""
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "matplotlib": matplotlib.__version__,
+            "sizes": self.sizes,
+            "wide_columns": self.wide_columns,
+            "memory_sizes": self.memory_sizes,
+            "repeat": self.repeat,
+            "suites": self.suites
+        }
+
+
+def _result_key(result: Dict[str, Any]) -> tuple:
+    return (result["suite"], result["case"], result.get("rows"),
+            result.get("columns"), result.get("memory_size"))
+
+
+def compare_results(baseline_file: str, current_file: str):
+    """Print the wall-time and peak-allocation ratio for each matching case"""
+    with open(baseline_file) as f:
+        baseline = {_result_key(r): r for r in json.load(f)["results"]}
+    with open(current_file) as f:
+        current = json.load(f)["results"]
+
+    print(f"{'case':<70} {'time':>10} {'ratio':>8} {'alloc':>8}")
+    print("-" * 100)
+    for result in current:
+        base = baseline.get(_result_key(result))
+        if not base or base.get("status") != "success" or result.get("status") != "success":
+            continue
+        time_ratio = result["wall_time_min"] / base["wall_time_min"]
+        alloc_ratio = result["alloc_peak_bytes"] / max(base["alloc_peak_bytes"], 1)
+        size = result.get("rows", result.get("memory_size"))
+        label = f"{result['suite']}/{result['case']} [{size}x{result.get('columns', '-')}]"
+        print(f"{label[:70]:<70} {result['wall_time_min']:>9.4f}s {time_ratio:>7.2f}x {alloc_ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agentic analytics pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Row counts to benchmark; each dataset is built in memory")
+    parser.add_argument("--wide-columns", type=int, nargs="+", default=DEFAULT_WIDE_COLUMNS,
+                        help="Extra numeric columns for wide-table variants")
+    parser.add_argument("--memory-sizes", type=int, nargs="+", default=DEFAULT_MEMORY_SIZES,
+                        help="Number of stored memories to benchmark")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two saved result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    print("🚀 Running pipeline benchmarks...")
+    benchmark = PipelineBenchmark(args.sizes, args.wide_columns, args.memory_sizes,
+                                  repeat=args.repeat, suites=args.suites)
+    report = benchmark.run()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Saved {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
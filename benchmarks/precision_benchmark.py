@@ -0,0 +1,114 @@
+"""Benchmark the float32 precision mode against the float64 AnalysisTools.
+
+Run from the repository root:
+
+    python -m benchmarks.precision_benchmark --sizes 100000 1000000 10000000 --output precision.json
+"""
+import argparse
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.pipeline_benchmark import make_dataset, measure
+from tools.analysis_tools import AnalysisTools
+from tools.data_tools import DataTools
+from tools.precision import Float32AnalysisTools
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+DEFAULT_WIDE_COLUMNS = 20
+
+
+def _cases(df: pd.DataFrame) -> Dict[str, Any]:
+    return {
+        "descriptive_statistics": lambda tools: tools.descriptive_statistics(df, "sales"),
+        "correlation_analysis": lambda tools: tools.correlation_analysis(df),
+        "trend_analysis": lambda tools: tools.trend_analysis(df, "date", "sales"),
+        "detect_anomalies": lambda tools: tools.detect_anomalies(df, "sales")
+    }
+
+
+def _max_error(reference: Any, result: Any) -> float:
+    """Largest relative difference between two results (absolute for correlations, which are bounded)"""
+    if isinstance(reference, pd.DataFrame):
+        difference = np.abs(result.to_numpy() - reference.to_numpy())
+        return float(np.nanmax(difference)) if difference.size else 0.0
+    if isinstance(reference, dict):
+        keys = [k for k, v in reference.items() if isinstance(v, (int, float, np.number))]
+        reference = np.array([reference[k] for k in keys], dtype=np.float64)
+        result = np.array([result[k] for k in keys], dtype=np.float64)
+    else:
+        # Anomaly positions: the share of rows flagged by only one of the two
+        reference, result = set(reference), set(result)
+        return len(reference ^ result) / max(len(reference), 1)
+    reference = np.asarray(reference, dtype=np.float64)
+    result = np.asarray(result, dtype=np.float64)
+    both = np.isfinite(reference) & np.isfinite(result)
+    scale = np.maximum(np.abs(reference[both]), 1e-12)
+    return float(np.max(np.abs(result[both] - reference[both]) / scale)) if both.any() else 0.0
+
+
+def run(sizes: List[int], wide_columns: int, repeat: int) -> Dict[str, Any]:
+    results = []
+    for rows in sizes:
+        df64 = make_dataset(rows, wide_columns)
+        df32 = DataTools.downcast_numeric(df64)
+        frame_bytes = {"float64": int(df64.memory_usage(deep=False).sum()),
+                       "float32": int(df32.memory_usage(deep=False).sum())}
+
+        reference_cases = _cases(df64)
+        precise_cases = _cases(df32)
+        for case in reference_cases:
+            print(f"  ⏱  precision/{case} rows={rows}")
+            reference = reference_cases[case](AnalysisTools)
+            approximate = precise_cases[case](Float32AnalysisTools)
+            baseline = measure(lambda: reference_cases[case](AnalysisTools), repeat)
+            reduced = measure(lambda: precise_cases[case](Float32AnalysisTools), repeat)
+            results.append({
+                "case": case,
+                "rows": rows,
+                "columns": len(df64.columns),
+                "float64_seconds": baseline["wall_time_min"],
+                "float32_seconds": reduced["wall_time_min"],
+                "speedup": baseline["wall_time_min"] / max(reduced["wall_time_min"], 1e-12),
+                "float64_alloc_peak_bytes": baseline["alloc_peak_bytes"],
+                "float32_alloc_peak_bytes": reduced["alloc_peak_bytes"],
+                "float64_frame_bytes": frame_bytes["float64"],
+                "float32_frame_bytes": frame_bytes["float32"],
+                "max_error": _max_error(reference, approximate)
+            })
+    return {"timestamp": datetime.now().isoformat(), "sizes": sizes, "results": results}
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'case':<26} {'rows':>11} {'f64 s':>9} {'f32 s':>9} {'speedup':>8} "
+          f"{'f64 MB':>8} {'f32 MB':>8} {'max error':>12}")
+    print("-" * 100)
+    for r in report["results"]:
+        print(f"{r['case']:<26} {r['rows']:>11,} {r['float64_seconds']:>9.4f} {r['float32_seconds']:>9.4f} "
+              f"{r['speedup']:>7.2f}x {r['float64_alloc_peak_bytes'] / 1024**2:>8.1f} "
+              f"{r['float32_alloc_peak_bytes'] / 1024**2:>8.1f} {r['max_error']:>12.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark float32 against float64 analysis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--wide-columns", type=int, default=DEFAULT_WIDE_COLUMNS,
+                        help="Extra numeric columns, widening the correlation matrix")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="precision_results.json")
+    args = parser.parse_args()
+
+    print("🚀 Running precision benchmarks...")
+    report = run(args.sizes, args.wide_columns, args.repeat)
+    print_report(report)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Saved {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Benchmark the compact JSON and binary serialization against the original memory encoding.
+
+Run from the repository root:
+
+    python -m benchmarks.serialization_benchmark --memory-sizes 10 100 1000 --output serialization.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from agents.data_analyst import DataAnalystAgent
+from agents.orchestrator import OrchestratorAgent
+from benchmarks.pipeline_benchmark import make_dataset, measure
+from memory.memory_system import MemorySystem
+from tools.serialization import dumps, loads
+
+DEFAULT_MEMORY_SIZES = [10, 100, 1_000]
+DEFAULT_ROWS = 100_000
+
+
+class _LegacyEncoder(json.JSONEncoder):
+    """The encoder MemorySystem.save_memory used with json.dump(indent=2)"""
+
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.bool_):
+            return bool(obj)
+        if isinstance(obj, (np.datetime64, pd.Timestamp)):
+            return str(obj)
+        if isinstance(obj, (np.dtype, pd.api.extensions.ExtensionDtype)):
+            return str(obj)
+        if hasattr(obj, 'savefig'):
+            return "Matplotlib Figure"
+        if isinstance(obj, bytes):
+            return f"Image ({len(obj)} bytes)"
+        return json.JSONEncoder.default(self, obj)
+
+
+def _codecs() -> Dict[str, Dict[str, Callable]]:
+    return {
+        "legacy_json": {"dumps": lambda obj: json.dumps(obj, indent=2, cls=_LegacyEncoder).encode(),
+                        "loads": json.loads},
+        "compact_json": {"dumps": lambda obj: dumps(obj, "json", images=False), "loads": loads},
+        "binary": {"dumps": lambda obj: dumps(obj, "binary", images=False), "loads": loads}
+    }
+
+
+def _memory_records(df: pd.DataFrame, count: int) -> List[Dict[str, Any]]:
+    """Distinct memory entries, each analysing a different slice of df"""
+    analyst = DataAnalystAgent()
+    rows = max(len(df) // count, 50)
+    records = []
+    for i in range(count):
+        part = df.iloc[(i * rows) % len(df):][:rows]
+        results = {
+            "summary": analyst.analyze(part, "summary"),
+            "correlation": analyst.analyze(part, "correlation"),
+            "trend": analyst.analyze(part, "trend", date_col="date", value_col="sales"),
+            "group": analyst.analyze(part, "group", group_col="product", value_col="sales"),
+            "anomaly": analyst.analyze(part, "anomaly", column="sales")
+        }
+        records.append({
+            "timestamp": datetime.now().isoformat(),
+            "query": f"Analyze sales trends over time by region {i}",
+            "agents_used": ["DataAnalyst", "DataAnalyst", "Visualizer"],
+            "results": results,
+            "insights": "Benchmark insight"
+        })
+    return records
+
+
+def _query_response(df: pd.DataFrame) -> Dict[str, Any]:
+    orchestrator = OrchestratorAgent()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return orchestrator.process_query("Analyze sales trends over time", df)
+
+
+def _compare(payload: Any, case: str, repeat: int, **params) -> List[Dict[str, Any]]:
+    results = []
+    for name, codec in _codecs().items():
+        encoded = codec["dumps"](payload)
+        encode = measure(lambda: codec["dumps"](payload), repeat)
+        decode = measure(lambda: codec["loads"](encoded), repeat)
+        results.append({
+            "case": case,
+            "codec": name,
+            **params,
+            "bytes": len(encoded),
+            "encode_seconds": encode["wall_time_min"],
+            "decode_seconds": decode["wall_time_min"]
+        })
+    return results
+
+
+def _compare_append(records: List[Dict[str, Any]], size: int, repeat: int,
+                    workdir: Path) -> List[Dict[str, Any]]:
+    """add_memory on a full store: the legacy path re-encoded every entry on each save"""
+    record = records[-1]
+    legacy_file = workdir / "legacy_memory.json"
+    legacy = _codecs()["legacy_json"]["dumps"]
+    results = [{"case": "append", "codec": "legacy_json", "memory_size": size,
+                "bytes": len(legacy(records[:size])),
+                "encode_seconds": measure(lambda: legacy_file.write_bytes(legacy(records[:size])),
+                                          repeat)["wall_time_min"],
+                "decode_seconds": 0.0}]
+    for fmt, codec in (("json", "compact_json"), ("binary", "binary")):
+        memory = MemorySystem(str(workdir / f"memory_{fmt}_{size}"), max_size=size, fmt=fmt)
+        memory.memories = list(records[:size])
+        memory.save_memory()
+        add = measure(lambda: memory.add_memory(record["query"], record["agents_used"],
+                                                record["results"], record["insights"]), repeat)
+        results.append({"case": "append", "codec": codec, "memory_size": size,
+                        "bytes": memory.memory_file.stat().st_size,
+                        "encode_seconds": add["wall_time_min"], "decode_seconds": 0.0})
+    return results
+
+
+def run(memory_sizes: List[int], rows: int, repeat: int) -> Dict[str, Any]:
+    df = make_dataset(rows)
+    records = _memory_records(df, max(memory_sizes))
+    workdir = Path(tempfile.mkdtemp(prefix="agentic_serialization_"))
+    results = []
+    for size in memory_sizes:
+        print(f"  ⏱  serialization/memory size={size}")
+        results += _compare(records[:size], "memory", repeat, memory_size=size)
+        results += _compare_append(records, size, repeat, workdir)
+    print(f"  ⏱  serialization/response rows={rows}")
+    results += _compare(_query_response(df), "response", repeat, rows=rows)
+    return {"timestamp": datetime.now().isoformat(), "memory_sizes": memory_sizes, "rows": rows,
+            "results": results}
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'case':<10} {'size':>6} {'codec':<14} {'KB':>10} {'encode ms':>10} {'decode ms':>10} "
+          f"{'vs legacy':>18}")
+    print("-" * 86)
+    legacy = {}
+    for r in report["results"]:
+        size = r.get("memory_size", r.get("rows"))
+        if r["codec"] == "legacy_json":
+            legacy[(r["case"], size)] = r
+        base = legacy[(r["case"], size)]
+        ratio = (f"{base['bytes'] / r['bytes']:.1f}x smaller "
+                 f"{base['encode_seconds'] / max(r['encode_seconds'], 1e-12):.1f}x")
+        print(f"{r['case']:<10} {size:>6} {r['codec']:<14} {r['bytes'] / 1024:>10.1f} "
+              f"{r['encode_seconds'] * 1000:>10.2f} {r['decode_seconds'] * 1000:>10.2f} {ratio:>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response and memory serialization")
+    parser.add_argument("--memory-sizes", type=int, nargs="+", default=DEFAULT_MEMORY_SIZES)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS,
+                        help="Rows of the dataset the memory entries and response are built from")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="serialization_results.json")
+    args = parser.parse_args()
+
+    print("🚀 Running serialization benchmarks...")
+    report = run(args.memory_sizes, args.rows, args.repeat)
+    print_report(report)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Saved {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,76 @@ class Config:
     
     # Agent Configuration
     MAX_ITERATIONS = 5
-    AGENT_TIMEOUT = 30
+    AGENT_TIMEOUT = 30  # Seconds per query, enforced by the resource governor
     
     # Memory Configuration
     MEMORY_SIZE = 100
     MEMORY_FILE = "agent_memory.json"
+    MEMORY_HOT_ENTRIES = 16  # Full memories kept in RAM; the rest are read from MEMORY_FILE when retrieved
     
     # Visualization Configuration
     FIGURE_SIZE = (10, 6)
     STYLE = "seaborn-v0_8"
+    
+    # Tracing Configuration
+    TRACING_ENABLED = False
+    TRACE_FILE = "agent_trace.json"
+    TRACE_FORMAT = "chrome"  # "chrome" or "otel"
+    TRACE_MAX_SPANS = 10000
+    PROFILE_DIR = "profiles"
+    
+    # Parallel Execution Configuration
+    PARALLEL_ENABLED = False
+    PARALLEL_WORKERS = os.cpu_count() or 1
+    PARALLEL_MIN_ROWS = 1_000_000
+    PARTITION_MIN_ROWS = 250_000
+    
+    # Shared Dataset Configuration
+    SHARED_DATA_ENABLED = False
+    SHARED_DATA_BACKEND = "shm"  # "shm" or "mmap"
+    SHARED_DATA_DIR = None  # Directory for memory-mapped files (system temp dir if None)
+    
+    # Rollup Cube Configuration
+    ROLLUP_ENABLED = False
+    ROLLUP_MIN_ROWS = 100_000
+    
+    # Planner Configuration
+    PLANNER_EXPLAIN = False
+    PLANNER_TASK_BUDGET_MS = 2000  # Exact tasks estimated above this may run on a sample
+    PLANNER_SAMPLE_ROWS = 200_000
+    
+    # Segment Scan Configuration
+    SEGMENT_TOP_K = 10
+    SEGMENT_MIN_SIZE = 30
+    SEGMENT_MIN_Z = 3.0
+    SEGMENT_MIN_EFFECT = 0.2  # Segment vs rest mean difference, in overall standard deviations
+    
+    # Heatmap Configuration
+    HEATMAP_DETAIL_MAX_COLS = 30  # Wider matrices render with imshow, clustered and sparsely annotated
+    HEATMAP_ANNOTATE_THRESHOLD = 0.7
+    HEATMAP_MAX_ANNOTATIONS = 200
+    HEATMAP_MAX_LABELS = 60  # Tick labels per axis
+    
+    # Chart Cache Configuration
+    CHART_CACHE_ENABLED = False
+    CHART_CACHE_DIR = ".chart_cache"
+    CHART_CACHE_MAX_MB = 256
+    CHART_CACHE_HOT_ENTRIES = 64  # Charts kept in memory as well as on disk
+    CHART_FORMAT = "png"  # "png" or "svg"
+    CHART_DPI = 300
+    
+    # Distribution Configuration
+    DISTRIBUTION_BINS = 30
+    DISTRIBUTION_ADAPTIVE_BINS = 20
+    DISTRIBUTION_SKETCH_ACCURACY = 0.01  # Relative error of sketched quantiles
+    
+    # Resource Governor Configuration
+    GOVERNOR_ENABLED = False  # Check each task's estimated memory and time before it runs
+    GOVERNOR_QUERY_MEMORY_MB = 2048  # Memory one query may add to the process
+    GOVERNOR_PROCESS_MEMORY_MB = None  # Process RSS ceiling (75% of physical memory if None)
+    
+    # Precision Configuration
+    COMPUTE_PRECISION = "float64"  # "float32" computes AnalysisTools statistics in float32 with compensated sums
+    
+    # Serialization Configuration
+    MEMORY_FORMAT = "json"  # "json" (compact) or "binary" for the memory store; both load either format
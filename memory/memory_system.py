@@ -1,53 +1,143 @@
-import json
+import os
+from collections import Counter, deque
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Deque, Optional, BinaryIO
 from pathlib import Path
-import pandas as pd
-import numpy as np
+from config import Config
+from tools.serialization import dumps, loads, append_log, iter_log, log_format, log_header
+from tools.tracer import traced
+
+
+class _Entry:
+    """What stays in RAM for a stored memory; the full record only while it is hot"""
+
+    __slots__ = ("query", "words", "agents_used", "offset", "length", "record", "hits", "last_used")
+
+    def __init__(self, record: Dict[str, Any], offset: int, length: int):
+        self.query = record['query']
+        self.words = frozenset(self.query.lower().split())
+        self.agents_used = tuple(record['agents_used'])
+        self.offset = offset  # Position of the encoded record in the memory file
+        self.length = length
+        self.record: Optional[Dict[str, Any]] = None
+        self.hits = 0
+        self.last_used = 0
+
 
 class MemorySystem:
-    """Stores and retrieves agent interactions and learnings"""
-    
-    def __init__(self, memory_file: str = "agent_memory.json", max_size: int = 100):
+    """Stores and retrieves agent interactions and learnings.
+
+    Memories are kept in two tiers. Every stored memory has a small index
+    entry in RAM (its query words, agents and position in the memory file),
+    while full records, with their analysis results, are held for at most
+    hot_size memories and read back from the file when a cold one is
+    retrieved. When the hot set is full the record with the lowest score is
+    dropped, where the score is one plus the memory's retrievals divided by
+    the number of store operations since it was last used.
+
+    The file is an append-only record log, so add_memory writes one record;
+    it is compacted once it holds twice max_size records. Only the newest
+    max_size memories are kept, and agent usage counts are updated as
+    memories are added and expire, so get_statistics does not scan them.
+    Query and agent usage totals also count memories that have since
+    expired: they start from the loaded store and grow with each add_memory.
+    """
+
+    def __init__(self, memory_file: str = Config.MEMORY_FILE, max_size: int = Config.MEMORY_SIZE,
+                 fmt: str = Config.MEMORY_FORMAT, hot_size: int = Config.MEMORY_HOT_ENTRIES):
         self.memory_file = Path(memory_file)
         self.max_size = max_size
-        self.memories: List[Dict[str, Any]] = []
+        self.format = fmt
+        self.hot_size = hot_size
+        self._reset()
         self.load_memory()
-    
+
+    def _reset(self):
+        self._entries: Deque[_Entry] = deque()  # Oldest first
+        self._hot: List[_Entry] = []
+        self._clock = 0
+        self._agent_usage: Counter = Counter()  # Over the stored memories
+        self._total_queries = 0  # Since the store was loaded, including expired memories
+        self._total_agent_usage: Counter = Counter()
+        self._log_records = 0  # Records in the file, including expired ones
+
+    def _start_totals(self):
+        self._total_queries = len(self._entries)
+        self._total_agent_usage = self._agent_usage.copy()
+
+    @traced("memory")
     def load_memory(self):
-        """Load memories from file"""
-        if self.memory_file.exists():
-            with open(self.memory_file, 'r') as f:
-                self.memories = json.load(f)
-    
+        """Index the memory file, keeping the most recent records hot"""
+        self._reset()
+        if not self.memory_file.exists():
+            return
+
+        with open(self.memory_file, 'rb') as f:
+            fmt = log_format(f.read(64))
+            if fmt == self.format:
+                size = f.seek(0, os.SEEK_END)
+                header = len(log_header(fmt))
+                end = header if size >= header else 0
+                for offset, data, end in iter_log(f):
+                    self._add_entry(loads(data, copy_arrays=True), offset, len(data))
+                    self._log_records += 1
+            elif fmt is not None:
+                records = [loads(data, copy_arrays=True) for _, data, _ in iter_log(f)]
+
+        if fmt == self.format:
+            if size > end:
+                # Drop the partial record an interrupted append left
+                os.truncate(self.memory_file, end)
+            self._start_totals()
+            return
+        if fmt is None:
+            # A single JSON array or frame, as earlier versions wrote
+            records = loads(self.memory_file.read_bytes(), copy_arrays=True)
+        # Convert the file to a record log in this store's format
+        self.memories = records
+
+    @traced("memory")
     def save_memory(self):
-        """Save memories to file"""
-        
-        class NumpyEncoder(json.JSONEncoder):
-            def default(self, obj):
-                if isinstance(obj, (np.int64, np.int32, np.int16, np.int8,
-                                  np.uint64, np.uint32, np.uint16, np.uint8)):
-                    return int(obj)
-                elif isinstance(obj, (np.float64, np.float32, np.float16)):
-                    return float(obj)
-                elif isinstance(obj, (np.ndarray,)):
-                    return obj.tolist()
-                elif isinstance(obj, (np.bool_)):
-                    return bool(obj)
-                elif isinstance(obj, (np.datetime64, pd.Timestamp)):
-                    return str(obj)
-                elif hasattr(obj, 'dtype') and 'datetime64' in str(obj.dtype):
-                    return str(obj)
-                elif isinstance(obj, np.dtype):
-                    return str(obj)
-                elif hasattr(obj, 'savefig'):  # Simple check for matplotlib Figure
-                    return "Matplotlib Figure"
-                return json.JSONEncoder.default(self, obj)
-
-        with open(self.memory_file, 'w') as f:
-            json.dump(self.memories[-self.max_size:], f, indent=2, cls=NumpyEncoder)
-    
-    def add_memory(self, query: str, agents_used: List[str], 
+        """Rewrite the memory file with only the stored memories, dropping expired records"""
+        if not self.memory_file.exists():
+            self.memories = []
+            return
+        tmp = self.memory_file.with_name(self.memory_file.name + ".tmp")
+        offsets = []
+        with open(self.memory_file, 'rb') as src, open(tmp, 'wb') as dst:
+            for entry in self._entries:
+                src.seek(entry.offset)
+                offsets.append(append_log(dst, src.read(entry.length), self.format))
+        os.replace(tmp, self.memory_file)
+        for entry, offset in zip(self._entries, offsets):
+            entry.offset = offset
+        self._log_records = len(self._entries)
+
+    @property
+    def memories(self) -> List[Dict[str, Any]]:
+        """Every stored memory, oldest first; cold records are read without being made hot"""
+        if not self._entries:
+            return []
+        with open(self.memory_file, 'rb') as f:
+            return [entry.record if entry.record is not None else self._read(entry, f)
+                    for entry in self._entries]
+
+    @memories.setter
+    def memories(self, records: List[Dict[str, Any]]):
+        """Replace the store, rewriting the memory file"""
+        self._reset()
+        tmp = self.memory_file.with_name(self.memory_file.name + ".tmp")
+        with open(tmp, 'wb') as f:
+            for record in records[-self.max_size:]:
+                encoded = dumps(record, self.format, images=False)
+                offset = append_log(f, encoded, self.format)
+                self._add_entry(loads(encoded, copy_arrays=True), offset, len(encoded))
+                self._log_records += 1
+        os.replace(tmp, self.memory_file)
+        self._start_totals()
+
+    def add_memory(self, query: str, agents_used: List[str],
                    results: Dict[str, Any], insights: str):
         """Add a new memory entry"""
         memory = {
@@ -57,35 +147,87 @@ class MemorySystem:
             "results": results,
             "insights": insights
         }
-        self.memories.append(memory)
-        self.save_memory()
-    
+        # Chart images are stored as their size, figures as a placeholder
+        encoded = dumps(memory, self.format, images=False)
+        with open(self.memory_file, 'ab') as f:
+            offset = append_log(f, encoded, self.format)
+        self._log_records += 1
+        self._total_queries += 1
+        self._total_agent_usage.update(agents_used)
+        # Hold the stored form, so a hot record matches what a cold read returns
+        self._add_entry(loads(encoded, copy_arrays=True), offset, len(encoded))
+        if self._log_records > 2 * self.max_size:
+            self.save_memory()
+
+    def _add_entry(self, record: Dict[str, Any], offset: int, length: int):
+        entry = _Entry(record, offset, length)
+        self._entries.append(entry)
+        self._agent_usage.update(entry.agents_used)
+        self._use(entry, record)
+        while len(self._entries) > self.max_size:
+            expired = self._entries.popleft()
+            self._agent_usage.subtract(expired.agents_used)
+            for agent in expired.agents_used:
+                if self._agent_usage[agent] <= 0:
+                    del self._agent_usage[agent]
+            if expired.record is not None:
+                self._hot.remove(expired)
+
+    def _use(self, entry: _Entry, record: Dict[str, Any]):
+        """Mark a memory as just used, making it hot and evicting the lowest-scoring hot record"""
+        self._clock += 1
+        entry.last_used = self._clock
+        if entry.record is None:
+            entry.record = record
+            self._hot.append(entry)
+        while len(self._hot) > self.hot_size:
+            coldest = min(self._hot, key=lambda e: (1 + e.hits) / (1 + self._clock - e.last_used))
+            coldest.record = None
+            self._hot.remove(coldest)
+
+    def _read(self, entry: _Entry, f: BinaryIO) -> Dict[str, Any]:
+        f.seek(entry.offset)
+        return loads(f.read(entry.length), copy_arrays=True)
+
+    def _get(self, entry: _Entry) -> Dict[str, Any]:
+        """Full record of a memory, paged in from the file if it is cold"""
+        record = entry.record
+        if record is None:
+            with open(self.memory_file, 'rb') as f:
+                record = self._read(entry, f)
+        entry.hits += 1
+        self._use(entry, record)
+        return record
+
+    @traced("memory")
     def get_relevant_memories(self, query: str, top_k: int = 3) -> List[Dict]:
         """Retrieve relevant past memories (simple keyword matching)"""
         query_words = set(query.lower().split())
         scored_memories = []
-        
-        for memory in self.memories:
-            memory_words = set(memory['query'].lower().split())
-            score = len(query_words & memory_words)
+
+        for entry in self._entries:
+            score = len(query_words & entry.words)
             if score > 0:
-                scored_memories.append((score, memory))
-        
+                scored_memories.append((score, entry))
+
         scored_memories.sort(reverse=True, key=lambda x: x[0])
-        return [m[1] for m in scored_memories[:top_k]]
-    
+        return [self._get(m[1]) for m in scored_memories[:top_k]]
+
     def get_statistics(self) -> Dict[str, Any]:
-        """Get memory statistics"""
+        """Get memory statistics.
+
+        total_queries and agents_usage include memories that have expired;
+        stored_queries and stored_agents_usage cover the memories kept.
+        """
         return {
-            "total_queries": len(self.memories),
-            "agents_usage": self._count_agent_usage(),
-            "recent_queries": [m['query'] for m in self.memories[-5:]]
+            "total_queries": self._total_queries,
+            "agents_usage": dict(self._total_agent_usage),
+            "stored_queries": len(self._entries),
+            "stored_agents_usage": self._count_agent_usage(),
+            "recent_queries": [entry.query for entry in islice(reversed(self._entries), 5)][::-1],
+            "hot_memories": len(self._hot)
         }
-    
+
     def _count_agent_usage(self) -> Dict[str, int]:
-        """Count how many times each agent was used"""
-        usage = {}
-        for memory in self.memories:
-            for agent in memory['agents_used']:
-                usage[agent] = usage.get(agent, 0) + 1
-        return usage
+        """Count how many times each agent was used by the stored memories"""
+        return dict(self._agent_usage)
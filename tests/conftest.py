@@ -0,0 +1,17 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import pytest
+
+from tools.data_tools import DataTools
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    """Run each test in its own directory, so memory files and traces do not leak"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def sales_df():
+    return DataTools.generate_sample_data(rows=2_000)
@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+import pytest
+
+from agents.visualizer import VisualizerAgent
+from config import Config
+from tools.chart_cache import ChartCache, chart_columns, chart_key, fingerprint_frame
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ChartCache(str(tmp_path / "charts"), max_bytes=10_000, hot_entries=2)
+
+
+@pytest.fixture
+def visualizer(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CHART_DPI", 40)
+    return VisualizerAgent(chart_cache=ChartCache(str(tmp_path / "rendered"), max_bytes=50 * 1024 * 1024))
+
+
+def test_chart_columns():
+    df = pd.DataFrame({"a": [1], "b": [2], "c": [3]})
+    assert chart_columns("line", {"x_col": "a", "y_col": "b"}, df) == ("a", "b")
+    assert chart_columns("heatmap", {}, df) == ("a", "b", "c")
+    assert chart_columns("bar", {"x_col": "missing"}, df) == ("a", "b", "c")
+
+
+def test_fingerprint_follows_values(sales_df):
+    df = sales_df.copy()
+    before = fingerprint_frame(df)
+    assert fingerprint_frame(df.copy()) == before
+    df.loc[df.index[0], "sales"] += 1
+    assert fingerprint_frame(df) != before
+
+
+def test_chart_key_depends_on_spec():
+    key = chart_key("f", "line", {"x_col": "a"}, "png", 100)
+    assert key == chart_key("f", "line", {"x_col": "a"}, "png", 100)
+    assert key != chart_key("f", "line", {"x_col": "a"}, "svg", 100)
+    assert key != chart_key("g", "line", {"x_col": "a"}, "png", 100)
+
+
+def test_hot_tier_and_disk_hits(cache):
+    for key in ("a", "b", "c"):
+        cache.put(key, "png", key.encode() * 10)
+    assert cache.stats()["hot_entries"] == 2
+    assert cache.get("a", "png") == b"a" * 10
+    assert cache.get("missing", "png") is None
+    assert cache.stats()["disk_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used(cache):
+    for i, key in enumerate(("old", "new")):
+        cache.put(key, "png", b"x" * 4_000)
+        os.utime(cache._path(key, "png"), (i, i))
+    cache.put("newest", "png", b"x" * 4_000)
+    assert not cache._path("old", "png").exists()
+    assert cache._path("new", "png").exists() and cache._path("newest", "png").exists()
+    assert cache.stats()["disk_bytes"] == 8_000
+
+
+def test_visualization_is_served_from_cache(visualizer, sales_df):
+    params = {"x_col": "date", "y_col": "sales", "title": "Sales"}
+    first = visualizer.create_visualization(sales_df, "line", **params)
+    second = visualizer.create_visualization(sales_df, "line", **params)
+    assert first["status"] == "success" and not first["cached"]
+    assert second["cached"] and second["image"] == first["image"]
+    assert second["chart_key"] == first["chart_key"]
+
+
+def test_visualization_misses_after_data_changes(visualizer, sales_df):
+    df = sales_df.copy()
+    params = {"x_col": "product", "y_col": "sales"}
+    first = visualizer.create_visualization(df, "bar", **params)
+    df.loc[df.index[0], "revenue"] += 1  # Not charted
+    assert visualizer.create_visualization(df, "bar", **params)["cached"]
+    df.loc[df.index[0], "sales"] += 1
+    changed = visualizer.create_visualization(df, "bar", **params)
+    assert not changed["cached"] and changed["chart_key"] != first["chart_key"]
+
+
+def test_unknown_type_reports_error(visualizer, sales_df):
+    result = visualizer.create_visualization(sales_df, "pie")
+    assert result["status"] == "error" and "pie" in result["error"]
+    assert VisualizerAgent(chart_cache=None)._render(sales_df, "pie")["status"] == "error"
+
+
+def test_save_path_writes_cached_bytes(visualizer, sales_df, tmp_path):
+    path = tmp_path / "chart.svg"
+    result = visualizer.create_visualization(sales_df, "scatter", x_col="sales", y_col="revenue",
+                                             save_path=str(path))
+    assert result["format"] == "svg" and path.read_bytes() == result["image"]
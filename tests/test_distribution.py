@@ -0,0 +1,89 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.orchestrator import OrchestratorAgent
+from tools.distribution import QUANTILES, DistributionProfiler, QuantileSketch
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    return np.concatenate([rng.lognormal(3, 1, 5_000), -rng.exponential(10, 1_000), np.zeros(50)])
+
+
+def test_sketch_quantiles_within_accuracy(values):
+    sketch = QuantileSketch(0.01)
+    sketch.add(values)
+    qs = np.array(QUANTILES)
+    # The sketch returns a value of the rank it targets, so compare against the lower order statistic
+    expected = np.quantile(values, qs, method="lower")
+    np.testing.assert_allclose(sketch.quantiles(qs), expected, rtol=0.01)
+
+
+def test_sketch_merge_equals_whole(values):
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    whole.add(values)
+    left.add(values[:2_000])
+    right.add(values[2_000:])
+    left.merge(right)
+    np.testing.assert_array_equal(left.quantiles(QUANTILES), whole.quantiles(QUANTILES))
+    with pytest.raises(ValueError):
+        left.merge(QuantileSketch(0.05))
+
+
+def test_profile_matches_numpy(values):
+    df = pd.DataFrame({"x": np.append(values, [np.nan] * 10)})
+    stats = DistributionProfiler(bins=20).profile(df)["distributions"]["x"]
+    assert stats["count"] == len(values) and stats["missing"] == 10 and stats["infinite"] == 0
+    assert stats["mean"] == pytest.approx(values.mean(), rel=1e-9)
+    assert stats["std"] == pytest.approx(values.std(ddof=1), rel=1e-9)
+    assert (stats["min"], stats["max"]) == (values.min(), values.max())
+    counts, edges = np.histogram(values, bins=20, range=(values.min(), values.max()))
+    np.testing.assert_allclose(stats["histogram"]["edges"], edges)
+    assert stats["histogram"]["counts"] == counts.tolist()
+    assert sum(stats["adaptive_histogram"]["counts"]) == len(values)
+
+
+def test_chunks_merge_exactly(values):
+    df = pd.DataFrame({"x": values})
+    profiler = DistributionProfiler()
+    expected = profiler.profile(df)
+    profiler.CHUNK_ROWS = 1_000
+    chunked = profiler.profile(df)
+    assert chunked["distributions"]["x"]["histogram"] == expected["distributions"]["x"]["histogram"]
+    assert chunked["distributions"]["x"]["quantiles"] == expected["distributions"]["x"]["quantiles"]
+    assert chunked["distributions"]["x"]["mean"] == pytest.approx(expected["distributions"]["x"]["mean"])
+
+
+def test_infinite_values_are_counted_separately():
+    df = pd.DataFrame({"x": [1.0, 2.0, np.inf, -np.inf, np.nan, 3.0]})
+    stats = DistributionProfiler(bins=4).profile(df)["distributions"]["x"]
+    assert (stats["count"], stats["missing"], stats["infinite"]) == (3, 1, 2)
+    assert (stats["min"], stats["max"], stats["mean"]) == (1.0, 3.0, 2.0)
+    assert sum(stats["histogram"]["counts"]) == 3
+
+
+@pytest.mark.parametrize("column", [[np.nan] * 4, [np.inf, -np.inf, np.nan, np.inf]])
+def test_column_without_finite_values(column):
+    stats = DistributionProfiler().profile(pd.DataFrame({"x": column}))["distributions"]["x"]
+    assert stats["count"] == 0 and "histogram" not in stats
+    assert stats["missing"] + stats["infinite"] == 4
+
+
+@pytest.mark.parametrize("fill", [np.nan, np.inf])
+def test_distribution_query_on_column_without_finite_values(sales_df, fill):
+    df = sales_df[["date", "product", "sales"]].copy()
+    df["sales"] = fill
+    orchestrator = OrchestratorAgent()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = orchestrator.process_query("Show the sales distribution", df)
+    finally:
+        orchestrator.close()
+    assert response["analysis_results"]["distribution"]["distributions"]["sales"]["count"] == 0
+    assert "visualization" not in response["analysis_results"]
+    assert any(s["task"] == "Visualizer.histogram" for s in response["execution_plan"]["skipped"])
@@ -0,0 +1,68 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import Config
+from tools.viz_tools import VizTools
+
+
+@pytest.fixture
+def viz():
+    yield VizTools()
+    plt.close("all")
+
+
+def _block_correlation(blocks: int, size: int, seed: int = 0) -> pd.DataFrame:
+    """Correlation matrix of columns in independent blocks, columns shuffled across blocks"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(500, blocks))
+    data = np.repeat(factors, size, axis=1) + 0.3 * rng.normal(size=(500, blocks * size))
+    order = rng.permutation(blocks * size)
+    return pd.DataFrame(data[:, order], columns=[f"c{i}_b{order[i] // size}" for i in range(blocks * size)]).corr()
+
+
+def test_cluster_order_groups_blocks():
+    matrix = VizTools._cluster_order(_block_correlation(4, 5))
+    blocks = [label.split("_")[1] for label in matrix.columns]
+    changes = sum(a != b for a, b in zip(blocks, blocks[1:]))
+    assert changes == 3
+    assert list(matrix.index) == list(matrix.columns)
+
+
+def test_cluster_order_leaves_non_square_alone():
+    matrix = pd.DataFrame(np.eye(3)[:2], columns=list("abc"))
+    assert VizTools._cluster_order(matrix) is matrix
+
+
+def test_top_correlated_keeps_strongest_columns():
+    matrix = pd.DataFrame(np.eye(4), index=list("abcd"), columns=list("abcd"))
+    matrix.loc["a", "c"] = matrix.loc["c", "a"] = 0.9
+    matrix.loc["b", "d"] = matrix.loc["d", "b"] = 0.1
+    top = VizTools._top_correlated(matrix, 2)
+    assert list(top.columns) == ["a", "c"] and list(top.index) == ["a", "c"]
+
+
+def test_detailed_heatmap_annotates_every_cell(viz, sales_df):
+    matrix = sales_df.select_dtypes(include=["number"]).corr()
+    fig = viz.create_heatmap(matrix)
+    assert len(fig.axes[0].texts) == matrix.size
+
+
+def test_wide_heatmap_renders_one_image(viz):
+    matrix = _block_correlation(8, 6)
+    assert len(matrix.columns) > Config.HEATMAP_DETAIL_MAX_COLS
+    fig = viz.create_heatmap(matrix, annotate_threshold=0.95)
+    ax = fig.axes[0]
+    assert len(ax.images) == 1
+    values = matrix.to_numpy()
+    off_diagonal = (np.abs(values) >= 0.95).sum() - len(values)
+    assert len(ax.texts) == min(off_diagonal, Config.HEATMAP_MAX_ANNOTATIONS)
+    assert len(ax.get_xticks()) <= Config.HEATMAP_MAX_LABELS
+
+
+def test_tiles_cover_the_diagonal(viz):
+    matrix = _block_correlation(3, 5)
+    figures = viz.create_heatmap_tiles(matrix, tile_size=6)
+    assert len(figures) == 3
+    assert [len(fig.axes[0].get_xticklabels()) for fig in figures] == [6, 6, 3]
@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pytest
+
+from memory.memory_system import MemorySystem
+
+
+def _fill(memory, count, start=0):
+    for i in range(start, start + count):
+        memory.add_memory(f"query {i} about sales", ["DataAnalyst", "Visualizer"] if i % 2 else ["DataAnalyst"],
+                          {"values": np.arange(3) + i}, f"insight {i}")
+
+
+@pytest.fixture(params=["json", "binary"])
+def fmt(request):
+    return request.param
+
+
+def test_keeps_newest_memories_with_bounded_hot_set(tmp_path, fmt):
+    memory = MemorySystem(str(tmp_path / "memory"), max_size=10, fmt=fmt, hot_size=3)
+    _fill(memory, 25)
+    assert [m["query"] for m in memory.memories] == [f"query {i} about sales" for i in range(15, 25)]
+    assert memory.get_statistics()["hot_memories"] == 3
+    assert memory._log_records <= 20
+
+
+def test_cold_memories_are_paged_in(tmp_path, fmt):
+    memory = MemorySystem(str(tmp_path / "memory"), max_size=10, fmt=fmt, hot_size=2)
+    _fill(memory, 10)
+    [record] = memory.get_relevant_memories("query 0", top_k=1)
+    assert record["insights"] == "insight 0"
+    assert list(record["results"]["values"]) == [0, 1, 2]
+    assert memory.get_statistics()["hot_memories"] == 2
+
+
+def test_reload_matches_saved_store(tmp_path, fmt):
+    path = str(tmp_path / "memory")
+    memory = MemorySystem(path, max_size=10, fmt=fmt)
+    _fill(memory, 14)
+    reloaded = MemorySystem(path, max_size=10, fmt=fmt)
+    def as_json(records):
+        return json.dumps(records, default=lambda value: np.asarray(value).tolist())
+
+    assert as_json(reloaded.memories) == as_json(memory.memories)
+
+
+def test_torn_append_is_dropped(tmp_path, fmt):
+    path = tmp_path / "memory"
+    memory = MemorySystem(str(path), max_size=10, fmt=fmt)
+    _fill(memory, 3)
+    with open(path, "ab") as f:
+        f.write(b"\x05\x00\x00" if fmt == "binary" else b'{"query": "partial')
+    reloaded = MemorySystem(str(path), max_size=10, fmt=fmt)
+    assert len(reloaded.memories) == 3
+    _fill(reloaded, 1, start=3)
+    assert len(MemorySystem(str(path), max_size=10, fmt=fmt).memories) == 4
+
+
+def test_legacy_file_is_converted(tmp_path, fmt):
+    path = tmp_path / "memory"
+    records = [{"timestamp": "2024-01-01T00:00:00", "query": f"old {i}", "agents_used": ["DataAnalyst"],
+                "results": {}, "insights": ""} for i in range(3)]
+    path.write_text(json.dumps(records, indent=2))
+    memory = MemorySystem(str(path), max_size=10, fmt=fmt)
+    assert memory.memories == records
+    assert MemorySystem(str(path), max_size=10, fmt=fmt).memories == records
+
+
+def test_statistics_count_expired_memories(tmp_path, fmt):
+    path = str(tmp_path / "memory")
+    memory = MemorySystem(path, max_size=10, fmt=fmt)
+    _fill(memory, 25)
+    stats = memory.get_statistics()
+    assert stats["total_queries"] == 25 and stats["stored_queries"] == 10
+    assert stats["agents_usage"] == {"DataAnalyst": 25, "Visualizer": 12}
+    assert stats["stored_agents_usage"] == {"DataAnalyst": 10, "Visualizer": 5}
+    assert stats["recent_queries"][-1] == "query 24 about sales"
+
+    # A reloaded store counts from the memories it kept
+    reloaded = MemorySystem(path, max_size=10, fmt=fmt)
+    _fill(reloaded, 2, start=25)
+    assert reloaded.get_statistics()["total_queries"] == 12
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.analysis_tools import AnalysisTools
+from tools.data_tools import DataTools
+from tools.partition_tools import PartitionedExecutor
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = PartitionedExecutor(workers=2, min_partition_rows=500)
+    yield executor
+    executor.close()
+
+
+@pytest.fixture
+def df(sales_df):
+    df = sales_df.copy()
+    df.loc[df.index[::97], "revenue"] = np.nan
+    return df
+
+
+def test_runs_on_several_partitions(executor, df):
+    assert len(executor._partitions(len(df))) == 4
+
+
+def test_describe_matches_pandas(executor, df):
+    stats = executor.describe_columns(df, ["sales", "revenue"])
+    for col in ("sales", "revenue"):
+        expected = AnalysisTools.descriptive_statistics(df, col)
+        for key, value in expected.items():
+            assert stats[col][key] == pytest.approx(value, rel=1e-9), (col, key)
+
+
+def test_data_summary_matches_pandas(executor, df):
+    summary = executor.data_summary(df)
+    expected = DataTools.get_data_summary(df)
+    assert summary["missing_values"] == expected["missing_values"]
+    for col, values in expected["numeric_summary"].items():
+        if col == "date":
+            continue
+        for key, value in values.items():
+            assert summary["numeric_summary"][col][key] == pytest.approx(value, rel=1e-9), (col, key)
+
+
+def test_correlation_matches_pandas(executor, df):
+    pd.testing.assert_frame_equal(executor.correlation_analysis(df),
+                                  AnalysisTools.correlation_analysis(df), rtol=1e-9)
+
+
+def test_trend_and_growth_match(executor, df):
+    expected = AnalysisTools.trend_analysis(df, "date", "sales")
+    result = executor.trend_analysis(df, "date", "sales")
+    assert result["trend"] == expected["trend"]
+    assert result["slope"] == pytest.approx(expected["slope"], rel=1e-6)
+    assert result["r_squared"] == pytest.approx(expected["r_squared"], rel=1e-6, abs=1e-12)
+    assert executor.calculate_growth_rate(df, "date", "sales") == \
+        AnalysisTools.calculate_growth_rate(df, "date", "sales")
+
+
+def test_group_analysis_matches_pandas(executor, df):
+    pd.testing.assert_frame_equal(executor.group_analysis(df, "region", "sales"),
+                                  AnalysisTools.group_analysis(df, "region", "sales"),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_anomalies_match(executor, df):
+    assert executor.detect_anomalies(df, "sales", threshold=2.0) == \
+        AnalysisTools.detect_anomalies(df, "sales", threshold=2.0)
@@ -0,0 +1,28 @@
+import json
+
+from benchmarks.pipeline_benchmark import PipelineBenchmark, compare_results, make_dataset, measure
+
+
+def test_measure_reports_timings_and_allocations():
+    metrics = measure(lambda: bytearray(1 << 20), repeat=2)
+    assert metrics["repeat"] == 2
+    assert 0 <= metrics["wall_time_min"] <= metrics["wall_time_mean"]
+    assert metrics["alloc_peak_bytes"] >= 1 << 20
+
+
+def test_make_dataset_adds_extra_columns():
+    df = make_dataset(500, extra_columns=3)
+    assert len(df) == 500
+    assert [f"metric_{i}" for i in range(3)] == list(df.columns[-3:])
+
+
+def test_suites_run_and_compare(tmp_path, capsys):
+    benchmark = PipelineBenchmark([300], [0], [5], repeat=1, suites=["analysis", "memory"])
+    report = benchmark.run()
+    assert {r["suite"] for r in report["results"]} == {"analysis", "memory"}
+    assert all(r["status"] == "success" for r in report["results"])
+
+    path = tmp_path / "run.json"
+    path.write_text(json.dumps(report, default=str))
+    compare_results(str(path), str(path))
+    assert "1.00x" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.analysis_tools import AnalysisTools
+from tools.precision import Float32AnalysisTools, as_shifted_float32, block_sum
+
+
+@pytest.fixture(params=[0.0, 1e6], ids=["centred", "offset"])
+def df(request):
+    """Unit-spread columns around 0 or around 1e6, with a slight trend"""
+    rng = np.random.default_rng(0)
+    n = 100_000
+    minutes = np.arange(n)
+    df = pd.DataFrame({"date": pd.Timestamp("2024-01-01") + pd.to_timedelta(minutes, unit="min"),
+                       "a": request.param + rng.normal(size=n) + minutes * 1e-5})
+    df["b"] = 0.5 * df["a"] + rng.normal(size=n)
+    df["c"] = rng.integers(0, 1_000, n)
+    return df
+
+
+def test_block_sum_accumulates_in_float64():
+    x = np.full(3 * (1 << 16) + 5, 0.1, dtype=np.float32)
+    assert block_sum(x) == pytest.approx(len(x) * float(np.float32(0.1)), rel=1e-6)
+
+
+def test_shift_keeps_float32_input():
+    x = pd.Series(np.arange(5, dtype=np.float32) + 1e6)
+    shifted, shift = as_shifted_float32(x)
+    assert shift == 0.0 and shifted.dtype == np.float32
+
+
+def test_shift_preserves_spread():
+    x = pd.Series(1e6 + np.linspace(-1, 1, 1_001))
+    shifted, shift = as_shifted_float32(x)
+    np.testing.assert_allclose(shifted.astype(np.float64) + shift, x.to_numpy(), rtol=0, atol=1e-7)
+
+
+@pytest.mark.parametrize("column", ["a", "b", "c"])
+def test_descriptive_statistics_match_float64(df, column):
+    result = Float32AnalysisTools.descriptive_statistics(df, column)
+    expected = AnalysisTools.descriptive_statistics(df, column)
+    spread = expected["std"]
+    for key in ("mean", "median", "min", "max", "q25", "q75"):
+        assert result[key] == pytest.approx(expected[key], abs=1e-6 * spread), key
+    assert result["std"] == pytest.approx(expected["std"], rel=1e-6)
+    assert result["skewness"] == pytest.approx(expected["skewness"], abs=1e-4)
+    assert result["kurtosis"] == pytest.approx(expected["kurtosis"], abs=1e-4)
+
+
+def test_correlation_matches_float64(df):
+    df.loc[df.index[::101], "b"] = np.nan
+    pd.testing.assert_frame_equal(Float32AnalysisTools.correlation_analysis(df),
+                                  AnalysisTools.correlation_analysis(df), rtol=0, atol=1e-6)
+
+
+def test_trend_matches_float64(df):
+    result = Float32AnalysisTools.trend_analysis(df, "date", "a")
+    expected = AnalysisTools.trend_analysis(df, "date", "a")
+    assert result["trend"] == expected["trend"]
+    assert result["slope"] == pytest.approx(expected["slope"], rel=1e-5)
+    assert result["intercept"] == pytest.approx(expected["intercept"], rel=1e-6)
+    assert result["r_squared"] == pytest.approx(expected["r_squared"], rel=1e-5)
+
+
+def test_anomalies_match_float64(df):
+    assert (Float32AnalysisTools.detect_anomalies(df, "a", 2.5)
+            == AnalysisTools.detect_anomalies(df, "a", 2.5))
@@ -0,0 +1,68 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from agents.data_analyst import DataAnalystAgent
+from agents.orchestrator import OrchestratorAgent
+from tools.query_planner import DatasetStatistics, QueryPlanner
+
+
+@pytest.fixture
+def planner():
+    return QueryPlanner(DataAnalystAgent())
+
+
+def _task_types(plan):
+    return [task.get("analysis_type", task.get("viz_type")) for task in plan["tasks"]]
+
+
+def test_statistics_match_pandas(sales_df):
+    stats = DatasetStatistics(sales_df)
+    assert stats.rows == len(sales_df)
+    assert stats.numeric_cols == sales_df.select_dtypes(include=["number"]).columns.tolist()
+    assert stats.date_col == "date"
+    assert stats.cardinalities == {col: sales_df[col].nunique() for col in ("product", "region")}
+    assert stats.days == (sales_df["date"].max() - sales_df["date"].min()).days + 1
+
+
+def test_plan_prefers_mentioned_columns(planner, sales_df):
+    plan = planner.plan("Compare revenue by region", sales_df)
+    group = next(task for task in plan["tasks"] if task.get("analysis_type") == "group")
+    assert group["params"] == {"group_col": "region", "value_col": "revenue"}
+    assert all("strategy" in task and "estimated_ms" in task for task in plan["tasks"])
+
+
+def test_only_last_visualization_is_kept(planner, sales_df):
+    plan = planner.plan("Show sales trend over time and correlation", sales_df)
+    assert _task_types(plan).count("line") == 0 and "heatmap" in _task_types(plan)
+    assert any(s["task"] == "Visualizer.line" for s in plan["skipped"])
+
+
+def test_statistics_are_cached_per_frame(planner, sales_df):
+    assert planner.statistics(sales_df) is planner.statistics(sales_df)
+
+
+def test_statistics_follow_column_changes(planner, sales_df):
+    df = sales_df.copy()
+    planner.statistics(df)
+    df.drop(columns=["region"], inplace=True)
+    assert "region" not in planner.statistics(df).categorical_cols
+    df["region"] = df["product"].astype("category")
+    assert planner.statistics(df).cardinalities["region"] == df["product"].nunique()
+
+
+def test_query_after_dropping_a_column(sales_df):
+    df = sales_df.copy()
+    orchestrator = OrchestratorAgent()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            orchestrator.process_query("Compare sales by region", df)
+            df.drop(columns=["region"], inplace=True)
+            response = orchestrator.process_query("Compare sales by region", df)
+    finally:
+        orchestrator.close()
+    group = next(task for task in response["execution_plan"]["tasks"] if task.get("analysis_type") == "group")
+    assert group["params"]["group_col"] == "product"
+    assert "group" in response["analysis_results"]
@@ -0,0 +1,71 @@
+import contextlib
+import io
+
+import pytest
+
+from agents.orchestrator import OrchestratorAgent
+from config import Config
+from tools.query_planner import DatasetStatistics
+from tools.resource_governor import ResourceGovernor
+
+
+@pytest.fixture
+def stats(sales_df):
+    return DatasetStatistics(sales_df)
+
+
+def _group_task(strategy="rollup"):
+    return {"agent": "DataAnalyst", "analysis_type": "group", "strategy": strategy,
+            "params": {"group_col": "region", "value_col": "sales"},
+            "candidates": {"exact": 5.0, "rollup": 1.0}}
+
+
+def _governor(query_memory_mb):
+    return ResourceGovernor(query_memory_mb=query_memory_mb, process_memory_mb=1e9, timeout_s=60)
+
+
+def test_disabled_by_default():
+    assert Config.GOVERNOR_ENABLED is False
+    assert OrchestratorAgent().governor is None
+
+
+def test_rollup_is_charged_for_building_the_cube(stats):
+    governor = _governor(1)
+    task = _group_task()
+    assert governor.estimate_bytes(task, "rollup", stats, cube_cached=True) == 0
+    # Date keys, 5 copies per numeric column and 8 per dimension
+    expected = stats.rows * (7 + 5 * len(stats.numeric_cols) + 8 * 2) * 8
+    assert governor.estimate_bytes(task, "rollup", stats, cube_cached=False) == expected
+
+
+def test_uncached_cube_that_does_not_fit_degrades_to_exact(stats):
+    governor = _governor(0.3)
+    task = _group_task()
+    assert governor.admit(task, stats, governor.start_query(), cube_cached=False)
+    assert task["governor"]["action"] == "degraded" and task["strategy"] == "exact"
+
+    task = _group_task()
+    assert governor.admit(task, stats, governor.start_query(), cube_cached=True)
+    assert task["governor"]["action"] == "run" and task["strategy"] == "rollup"
+
+
+def test_task_without_fitting_strategy_is_rejected(stats):
+    governor = _governor(0)
+    task = _group_task("exact")
+    assert not governor.admit(task, stats, governor.start_query(), cube_cached=False)
+    assert task["governor"]["action"] == "rejected" and "MB" in task["governor"]["reason"]
+
+
+def test_orchestrator_skips_rejected_tasks(sales_df, monkeypatch):
+    monkeypatch.setattr(Config, "GOVERNOR_ENABLED", True)
+    orchestrator = OrchestratorAgent()
+    assert orchestrator.governor is not None
+    orchestrator.governor = _governor(0)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = orchestrator.process_query("Compare sales by region", sales_df)
+    finally:
+        orchestrator.close()
+    skipped = {s["task"] for s in response["execution_plan"]["skipped"] if s["reason"].startswith("governor")}
+    assert {"DataAnalyst.group", "Visualizer.bar"} <= skipped
+    assert "group" not in response["analysis_results"]
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.data_analyst import DataAnalystAgent
+from config import Config
+from tools.analysis_tools import AnalysisTools
+from tools.rollup_cube import RollupCube, RollupCubeCache
+
+
+@pytest.fixture
+def df(sales_df):
+    df = sales_df.copy()
+    # Timestamps off midnight exercise the within-day time sums
+    df["date"] += pd.to_timedelta(np.arange(len(df)) % 86400, unit="s")
+    return df
+
+
+@pytest.fixture
+def cube(df):
+    return RollupCube.build(df)
+
+
+def test_covers(cube):
+    assert cube.covers("sales", date_col="date")
+    assert cube.covers("sales", group_col="region")
+    assert not cube.covers("sales", group_col="sales")
+    assert not cube.covers("product")
+
+
+@pytest.mark.parametrize("value_col", ["sales", "quantity", "revenue"])
+def test_trend_matches_regression(cube, df, value_col):
+    expected = AnalysisTools.trend_analysis(df, "date", value_col)
+    result = cube.trend_analysis(value_col)
+    assert result["trend"] == expected["trend"]
+    for key in ("slope", "intercept", "r_squared"):
+        assert result[key] == pytest.approx(expected[key], rel=1e-6), key
+
+
+@pytest.mark.parametrize("group_col", ["product", "region"])
+@pytest.mark.parametrize("value_col", ["sales", "quantity"])
+def test_group_matches_pandas(cube, df, group_col, value_col):
+    expected = AnalysisTools.group_analysis(df, group_col, value_col)
+    pd.testing.assert_frame_equal(cube.group_analysis(group_col, value_col), expected,
+                                  check_dtype=False, check_index_type=False)
+
+
+def test_growth_matches_sorted_frame(cube, df):
+    assert cube.calculate_growth_rate("sales") == AnalysisTools.calculate_growth_rate(df, "date", "sales")
+
+
+def test_undated_rows_are_grouped_but_not_trended(df):
+    df.loc[df.index[:50], "date"] = pd.NaT
+    cube = RollupCube.build(df)
+    pd.testing.assert_frame_equal(cube.group_analysis("region", "sales"),
+                                  AnalysisTools.group_analysis(df, "region", "sales"),
+                                  check_dtype=False, check_index_type=False)
+    expected = AnalysisTools.trend_analysis(df.dropna(subset=["date"]), "date", "sales")
+    assert cube.trend_analysis("sales")["slope"] == pytest.approx(expected["slope"], rel=1e-6)
+
+
+def test_cache_reuses_cube(df):
+    cache = RollupCubeCache()
+    cube = cache.get(df)
+    assert cache.get(df) is cube and cache.peek(df) is cube
+
+
+def test_cache_rebuilds_after_column_change(df):
+    cache = RollupCubeCache()
+    cube = cache.get(df)
+    df["sales"] = df["sales"].to_numpy()[::-1].copy()
+    assert cache.peek(df) is None
+    rebuilt = cache.get(df)
+    assert rebuilt is not cube
+    assert rebuilt.calculate_growth_rate("sales") == AnalysisTools.calculate_growth_rate(df, "date", "sales")
+
+    df.drop(columns=["region"], inplace=True)
+    assert "region" not in cache.get(df).dimensions
+
+
+@pytest.fixture
+def analyst(monkeypatch):
+    monkeypatch.setattr(Config, "ROLLUP_ENABLED", True)
+    monkeypatch.setattr(Config, "ROLLUP_MIN_ROWS", 0)
+    return DataAnalystAgent()
+
+
+def _frame(rows, ids):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"date": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) % 10, unit="D"),
+                         "region": rng.choice(["North", "South", "East", "West"], rows),
+                         "order": [f"order {i % ids}" for i in range(rows)],
+                         "sales": rng.normal(100, 10, rows)})
+
+
+def test_unplanned_query_skips_building_a_dense_cube(analyst, monkeypatch):
+    df = _frame(20_000, ids=20_000)
+    monkeypatch.setattr(RollupCube, "build", lambda *args, **kwargs: pytest.fail("cube was built"))
+    result = analyst.analyze(df, "group", group_col="region", value_col="sales")
+    assert len(analyst.cubes) == 0
+    expected = AnalysisTools.group_analysis(df, "region", "sales")
+    assert result["group_statistics"] == expected.to_dict()
+
+
+def test_unplanned_query_builds_a_compact_cube(analyst):
+    df = _frame(20_000, ids=3)
+    result = analyst.analyze(df, "group", group_col="region", value_col="sales")
+    assert analyst.cubes.peek(df) is not None
+    expected = AnalysisTools.group_analysis(df, "region", "sales")
+    pd.testing.assert_frame_equal(pd.DataFrame(result["group_statistics"]), expected,
+                                  check_dtype=False, check_index_type=False, check_names=False)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.segment_scan import SegmentScanner, factorize_columns
+
+
+@pytest.fixture
+def df(sales_df):
+    df = sales_df.copy()
+    # Plant one segment that stands out, and some missing values
+    df.loc[df["region"] == "North", "sales"] += 2_000
+    df.loc[df.index[::37], "revenue"] = np.nan
+    return df
+
+
+def _expected(df, dim, metric):
+    """Segment mean, rest mean and Welch z from pandas"""
+    valid = df[df[metric].notna()]
+    stats = valid.groupby(dim, observed=True)[metric].agg(["count", "mean", "var"])
+    rest = {seg: valid.loc[valid[dim] != seg, metric] for seg in stats.index}
+    z = {seg: (stats.loc[seg, "mean"] - r.mean())
+         / np.sqrt(stats.loc[seg, "var"] / stats.loc[seg, "count"] + r.var() / len(r))
+         for seg, r in rest.items()}
+    return stats, z
+
+
+def test_factorize_reuses_categorical_codes(df):
+    df["product"] = df["product"].astype("category")
+    factorized = factorize_columns(df, ["product", "region"])
+    codes, categories = factorized["product"]
+    np.testing.assert_array_equal(codes, df["product"].cat.codes.to_numpy())
+    codes, categories = factorized["region"]
+    np.testing.assert_array_equal(categories[codes], df["region"].to_numpy())
+
+
+def test_planted_segment_ranks_first(df):
+    result = SegmentScanner().scan(df)
+    top = result["segments"][0]
+    assert (top["dimension"], top["segment"], top["metric"]) == ("region", "North", "sales")
+    assert top["direction"] == "above"
+    assert result["dimensions"] == ["product", "region"]
+    assert result["segments_scanned"] == (df["product"].nunique() + df["region"].nunique()) * 4
+
+
+@pytest.mark.parametrize("metric", ["sales", "revenue"])
+def test_segments_match_pandas(df, metric):
+    scanner = SegmentScanner(top_k=100, min_size=1, min_z=0.0, min_effect=0.0)
+    result = scanner.scan(df, ["region"], [metric])
+    stats, z = _expected(df, "region", metric)
+    assert len(result["segments"]) == len(stats)
+    for segment in result["segments"]:
+        expected = stats.loc[segment["segment"]]
+        assert segment["count"] == expected["count"]
+        assert segment["mean"] == pytest.approx(expected["mean"], abs=1e-4)
+        assert segment["overall_mean"] == pytest.approx(df[metric].mean(), abs=1e-4)
+        assert segment["z_score"] == pytest.approx(z[segment["segment"]], abs=0.01)
+
+
+def test_chunking_does_not_change_result(df):
+    scanner = SegmentScanner()
+    expected = scanner.scan(df)
+    scanner.CHUNK_ROWS = 300
+    assert scanner.scan(df) == expected
+
+
+def test_filters(df):
+    assert SegmentScanner(min_z=1e6).scan(df)["segments"] == []
+    assert SegmentScanner(min_size=len(df)).scan(df)["segments"] == []
+    assert len(SegmentScanner(top_k=1, min_z=0.0, min_effect=0.0).scan(df)["segments"]) == 1
+
+
+def test_without_dimensions(df):
+    result = SegmentScanner().scan(df[["sales", "revenue"]])
+    assert result["segments"] == [] and result["segments_scanned"] == 0
@@ -0,0 +1,126 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.serialization import (MAGIC, append_log, decode_response, dumps, encode_response,
+                                 iter_log, loads, log_format, log_header, normalize, validate)
+
+
+@pytest.fixture
+def payload():
+    return {
+        "ints": np.arange(5, dtype=np.int32),
+        "floats": np.linspace(0, 1, 300).reshape(100, 3),
+        "labels": np.array(["a", "b"], dtype=object),
+        "scalar": np.float64(1.5),
+        "flag": np.bool_(True),
+        "when": pd.Timestamp("2024-01-01"),
+        "series": pd.Series([1, 2], index=["x", "y"]),
+        np.int64(3): "numpy key",
+        (1, 2): "tuple key",
+        "image": b"\x89PNG" + bytes(range(50)),
+        "nested": [{"value": np.int64(7)}, None, "text"],
+    }
+
+
+def _expected(payload):
+    """What either format decodes the payload to; JSON object keys are always strings"""
+    expected = {str(key): value for key, value in normalize(payload).items()}
+    expected["floats"] = np.asarray(expected["floats"])
+    expected["ints"] = np.asarray(expected["ints"])
+    return expected
+
+
+def _assert_decoded(decoded, expected):
+    for key, value in expected.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(np.asarray(decoded[key]), value)
+        else:
+            assert decoded[key] == value, key
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_round_trip(payload, fmt):
+    data = dumps(payload, fmt)
+    assert data.startswith(MAGIC) == (fmt == "binary")
+    _assert_decoded(loads(data), _expected(payload))
+
+
+def test_binary_arrays_are_views(payload):
+    decoded = loads(dumps(payload))
+    assert decoded["floats"].shape == (100, 3) and decoded["floats"].dtype == np.float64
+    assert not decoded["floats"].flags.writeable
+    assert loads(dumps(payload), copy_arrays=True)["floats"].flags.writeable
+
+
+def test_large_structure_is_compressed():
+    payload = {"rows": [{"name": f"row {i}", "value": i} for i in range(1_000)]}
+    data = dumps(payload)
+    assert len(data) < len(json.dumps(payload)) / 2
+    assert loads(data) == payload
+
+
+def test_images_can_be_dropped(payload):
+    assert loads(dumps(payload, images=False))["image"] == f"Image ({len(payload['image'])} bytes)"
+
+
+def test_reads_legacy_json():
+    assert loads(json.dumps([{"query": "q"}], indent=2).encode()) == [{"query": "q"}]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        dumps({}, "xml")
+
+
+def test_truncated_frame_is_rejected(payload):
+    with pytest.raises(ValueError):
+        loads(dumps(payload)[:-1])
+
+
+def _response(**overrides):
+    response = {"query": "q", "execution_plan": {}, "analysis_results": {"x": np.arange(3)},
+                "insights": [], "recommendations": [], "agents_used": [], "relevant_memories": []}
+    response.update(overrides)
+    return response
+
+
+def test_validate():
+    validate(_response())
+    with pytest.raises(ValueError, match="missing 'insights'"):
+        validate({k: v for k, v in _response().items() if k != "insights"})
+    with pytest.raises(ValueError, match="should be list"):
+        validate(_response(insights="text"))
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_response_round_trip(fmt):
+    decoded = decode_response(encode_response(_response(), fmt))
+    assert list(decoded["analysis_results"]["x"]) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_log_round_trip_and_torn_tail(fmt):
+    records = [{"query": f"q{i}", "values": np.arange(i)} for i in range(4)]
+    f = io.BytesIO()
+    offsets = [append_log(f, dumps(record, fmt), fmt) for record in records]
+    assert log_format(f.getvalue()[:8]) == fmt
+    assert f.getvalue().startswith(log_header(fmt))
+
+    entries = list(iter_log(f))
+    assert [offset for offset, _, _ in entries] == offsets
+    assert [loads(data)["query"] for _, data, _ in entries] == ["q0", "q1", "q2", "q3"]
+
+    # An interrupted append leaves a partial last record, which is not returned
+    torn = io.BytesIO(f.getvalue()[:-3])
+    assert [loads(data)["query"] for _, data, _ in iter_log(torn)] == ["q0", "q1", "q2"]
+
+
+def test_binary_log_loads_as_list():
+    f = io.BytesIO()
+    for i in range(3):
+        append_log(f, dumps({"i": i}))
+    assert loads(f.getvalue()) == [{"i": 0}, {"i": 1}, {"i": 2}]
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.analysis_tools import AnalysisTools
+from tools.partition_tools import PartitionedExecutor
+from tools.shared_dataset import SharedDataset, SharedDatasetRegistry
+
+
+@pytest.fixture(params=["shm", "mmap"])
+def registry(request, tmp_path):
+    registry = SharedDatasetRegistry(backend=request.param, directory=str(tmp_path))
+    yield registry
+    registry.drop_all()
+
+
+@pytest.fixture
+def executor(registry):
+    executor = PartitionedExecutor(workers=2, min_partition_rows=500, registry=registry)
+    yield executor
+    executor.close()
+
+
+def _replaced(frame: pd.DataFrame, col, values) -> pd.DataFrame:
+    """Shallow copy of a frame with one column swapped for a new array"""
+    replaced = frame.copy(deep=False)
+    replaced[col] = values
+    return replaced
+
+
+def test_to_frame_round_trips(registry, sales_df):
+    frame = registry.register(sales_df).to_frame()
+    assert list(frame.columns) == list(sales_df.columns)
+    for col in sales_df.columns:
+        np.testing.assert_array_equal(np.asarray(frame[col]), sales_df[col].to_numpy())
+    assert registry.dataset_for(frame) is not None
+
+
+def test_attach_reads_the_same_values(registry, sales_df):
+    dataset = registry.register(sales_df)
+    attached = SharedDataset.attach(dataset.descriptor())
+    try:
+        np.testing.assert_array_equal(attached.view("sales"), sales_df["sales"].to_numpy())
+    finally:
+        attached.close()
+
+
+def test_owns_checks_every_column(registry, sales_df):
+    dataset = registry.register(sales_df)
+    frame = dataset.to_frame()
+    replaced = _replaced(frame, "sales", frame["sales"].to_numpy() * 2)
+    assert dataset.backs(replaced, "date")
+    assert not dataset.backs(replaced, "sales")
+    assert not dataset.owns(replaced)
+    assert registry.dataset_for(replaced) is None
+
+
+def test_reordered_view_is_not_backed(registry, sales_df):
+    dataset = registry.register(sales_df)
+    frame = dataset.to_frame()
+    assert not dataset.backs(_replaced(frame, "sales", dataset.view("sales")[::-1]), "sales")
+
+
+def test_executor_does_not_read_replaced_column(registry, executor, sales_df):
+    frame = registry.register(sales_df).to_frame()
+    replaced = _replaced(frame, "sales", frame["sales"].to_numpy() * 2)
+    stats = executor.describe_columns(replaced, ["sales"])
+    expected = AnalysisTools.descriptive_statistics(replaced, "sales")
+    assert stats["sales"]["mean"] == pytest.approx(expected["mean"], rel=1e-9)
+
+
+def test_share_copies_a_source_modified_in_place(registry, sales_df):
+    df = sales_df.copy()
+    first = registry.share(df)
+    df.loc[:, "sales"] *= 2
+    second = registry.share(df)
+    assert second is not first and first.closed
+    np.testing.assert_array_equal(second.view("sales"), df["sales"].to_numpy())
+
+
+def test_share_reuses_a_shared_frame(registry, sales_df):
+    dataset = registry.register(sales_df)
+    assert registry.share(dataset.to_frame()) is dataset
+
+
+def test_release_frees_source_dataset(registry, sales_df):
+    dataset = registry.register(sales_df)
+    registry.release(sales_df)
+    assert dataset.closed
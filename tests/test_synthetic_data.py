@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.synthetic_data import SyntheticDataGenerator
+
+
+def test_columns_and_row_count():
+    generator = SyntheticDataGenerator(rows=2_500, chunk_size=1_000, numeric_columns=5)
+    df = generator.generate()
+    assert generator.num_chunks == 3
+    assert len(df) == 2_500
+    assert list(df.columns) == ["date", "product", "region", "sales", "quantity",
+                                "customer_satisfaction", "revenue", "metric_4"]
+    assert df["date"].is_monotonic_increasing
+    assert df["customer_satisfaction"].between(1.0, 5.0).all()
+
+
+def test_chunks_are_reproducible_in_any_order():
+    generator = SyntheticDataGenerator(rows=3_000, chunk_size=1_000)
+    later_first = generator.generate_chunk(2)
+    generator.generate_chunk(0)
+    pd.testing.assert_frame_equal(later_first, SyntheticDataGenerator(rows=3_000, chunk_size=1_000)
+                                  .generate_chunk(2))
+
+
+def test_parallel_generation_matches_serial():
+    generator = SyntheticDataGenerator(rows=4_000, chunk_size=1_000)
+    serial = pd.concat(generator.iter_chunks(workers=1), ignore_index=True)
+    parallel = pd.concat(generator.iter_chunks(workers=2), ignore_index=True)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_missing_rate_inserts_missing_values():
+    df = SyntheticDataGenerator(rows=5_000, chunk_size=5_000, missing_rate=0.1).generate()
+    assert 0.05 < df["sales"].isna().mean() < 0.15
+    assert df["region"].isna().any()
+
+
+def test_cardinality_must_match_categorical_columns():
+    with pytest.raises(ValueError):
+        SyntheticDataGenerator(categorical_columns=2, cardinality=[3])
+
+
+def test_csv_output_round_trips(tmp_path):
+    generator = SyntheticDataGenerator(rows=1_500, chunk_size=500)
+    result = generator.write(str(tmp_path / "data.csv"), fmt="csv")
+    assert result["rows"] == 1_500
+    loaded = pd.read_csv(tmp_path / "data.csv")
+    assert len(loaded) == 1_500
+    np.testing.assert_array_equal(loaded["sales"].to_numpy(), generator.generate()["sales"].to_numpy())
+
+
+def test_partitioned_parquet_output(tmp_path):
+    pytest.importorskip("pyarrow")
+    generator = SyntheticDataGenerator(rows=1_500, chunk_size=500)
+    result = generator.write_partitioned(str(tmp_path / "parts"), fmt="parquet")
+    assert len(result["files"]) == 3
+    loaded = pd.concat([pd.read_parquet(path) for path in result["files"]], ignore_index=True)
+    assert len(loaded) == 1_500
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SyntheticDataGenerator(rows=10).write(str(tmp_path / "x"), fmt="xml")
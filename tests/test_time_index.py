@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.data_analyst import DataAnalystAgent
+from tools.analysis_tools import AnalysisTools
+from tools.precision import Float32AnalysisTools
+from tools.time_index import TimeIndex, TimeIndexCache, parse_time_window
+
+
+def _untied(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy with distinct timestamps, so the first and last rows do not depend on the sort"""
+    df = df.copy()
+    df["date"] += pd.to_timedelta(np.arange(len(df)), unit="s")
+    return df
+
+
+@pytest.fixture
+def df(sales_df):
+    df = sales_df.copy()
+    df.loc[df.index[::50], "date"] = pd.NaT
+    return df
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("sales between 2024-01-01 and 2024-01-31",
+     {"start": pd.Timestamp("2024-01-01"), "end": pd.Timestamp("2024-02-01")}),
+    ("revenue since 2024-06-01", {"start": pd.Timestamp("2024-06-01")}),
+    ("trend over the last 30 days", {"last": pd.Timedelta(days=30)}),
+    ("growth in the past quarter", {"last": pd.DateOffset(months=3)}),
+])
+def test_parse_time_window(query, expected):
+    window = parse_time_window(query)
+    for key, value in expected.items():
+        assert window[key] == value
+
+
+def test_parse_without_window():
+    assert parse_time_window("Show correlation between sales and revenue") is None
+
+
+def test_order_matches_stable_sort(df):
+    index = TimeIndex.build(df, "date")
+    expected = df["date"].dropna().sort_values(kind="stable")
+    np.testing.assert_array_equal(index.order, df.index.get_indexer(expected.index))
+    np.testing.assert_array_equal(index.values, expected.to_numpy())
+
+
+def test_slice_matches_mask(df):
+    index = TimeIndex.build(df, "date")
+    start, end = pd.Timestamp("2024-03-01"), pd.Timestamp("2024-06-01")
+    expected = df[(df["date"] >= start) & (df["date"] < end)].sort_values("date", kind="stable")
+    pd.testing.assert_frame_equal(index.slice(df, start, end), expected)
+
+
+def test_resolve_last_is_relative_to_latest_row(df):
+    index = TimeIndex.build(df, "date")
+    start, end = index.resolve({"last": pd.Timedelta(days=7)})
+    assert end > index.end and start == index.end - pd.Timedelta(days=7) + pd.Timedelta(1, "ns")
+
+
+def test_trend_and_growth_with_index_match_sorting(df):
+    df = _untied(df.dropna(subset=["date"]))
+    index = TimeIndex.build(df, "date")
+    assert (AnalysisTools.trend_analysis(df, "date", "sales", time_index=index)
+            == pytest.approx(AnalysisTools.trend_analysis(df, "date", "sales")))
+    assert (AnalysisTools.calculate_growth_rate(df, "date", "sales", time_index=index)
+            == AnalysisTools.calculate_growth_rate(df, "date", "sales"))
+
+
+def test_cache_reuses_index(df):
+    cache = TimeIndexCache()
+    index = cache.get(df, "date")
+    df["sales"] = df["sales"] * 2
+    assert cache.get(df, "date") is index and cache.peek(df, "date") is index
+
+
+def test_cache_rebuilds_after_date_column_is_reassigned(sales_df):
+    df = _untied(sales_df)
+    cache = TimeIndexCache()
+    cache.get(df, "date")
+    df["date"] = df["date"].sample(frac=1, random_state=0).to_numpy()
+    assert cache.peek(df, "date") is None
+    index = cache.get(df, "date")
+    assert (AnalysisTools.calculate_growth_rate(df, "date", "sales", time_index=index)
+            == AnalysisTools.calculate_growth_rate(df, "date", "sales"))
+
+
+@pytest.mark.parametrize("tools", [AnalysisTools, Float32AnalysisTools])
+def test_trend_and_growth_without_valid_dates(sales_df, tools):
+    df = sales_df.copy()
+    df["date"] = pd.NaT
+    index = TimeIndex.build(df, "date")
+    assert len(index) == 0
+    # As without an index, the rows are taken in frame order
+    assert (tools.calculate_growth_rate(df, "date", "sales", time_index=index)
+            == tools.calculate_growth_rate(df, "date", "sales"))
+    assert (tools.trend_analysis(df, "date", "sales", time_index=index)
+            == tools.trend_analysis(df, "date", "sales"))
+    result = DataAnalystAgent().analyze(df, "trend", date_col="date", value_col="sales")
+    assert result["growth_analysis"]["first_value"] == df["sales"].iloc[0]
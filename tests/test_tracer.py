@@ -0,0 +1,88 @@
+import contextlib
+import io
+import json
+
+from agents.orchestrator import OrchestratorAgent
+from config import Config
+from tools.tracer import Tracer, get_tracer, traced
+
+
+def test_spans_nest_under_their_parent():
+    tracer = Tracer(enabled=True)
+    with tracer.span("outer", "test") as outer:
+        with tracer.span("inner", "test", rows=3) as inner:
+            pass
+    assert inner.parent_id == outer.span_id
+    assert inner.trace_id == outer.trace_id
+    trace = tracer.get_trace(outer.trace_id)
+    assert [s["name"] for s in trace] == ["inner", "outer"]
+    assert trace[0]["attributes"]["rows"] == 3
+
+
+def test_span_records_errors():
+    tracer = Tracer(enabled=True)
+    with contextlib.suppress(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+    assert tracer.spans[-1].attributes["error"] == "ValueError: boom"
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("ignored") as span:
+        assert span is None
+    assert not tracer.spans
+
+
+def test_follows_config_at_runtime(monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(Config, "TRACING_ENABLED", False)
+    assert not tracer.enabled
+    monkeypatch.setattr(Config, "TRACING_ENABLED", True)
+    with tracer.span("now traced"):
+        pass
+    assert len(tracer.spans) == 1
+
+    tracer.set_enabled(False)
+    assert not tracer.enabled
+    tracer.set_enabled(None)
+    assert tracer.enabled
+
+
+def test_traced_records_dataframe_rows(monkeypatch, sales_df):
+    monkeypatch.setattr(Config, "TRACING_ENABLED", True)
+
+    @traced("test")
+    def count(df):
+        return len(df)
+
+    assert count(sales_df) == len(sales_df)
+    assert get_tracer().spans[-1].attributes["rows"] == len(sales_df)
+
+
+def test_exports(tmp_path):
+    tracer = Tracer(enabled=True)
+    with tracer.span("a", "cat", rows=1):
+        pass
+    tracer.export(str(tmp_path / "chrome.json"), "chrome")
+    tracer.export(str(tmp_path / "otel.json"), "otel")
+    events = json.loads((tmp_path / "chrome.json").read_text())["traceEvents"]
+    assert events[0]["name"] == "a" and events[0]["ph"] == "X"
+    otel = json.loads((tmp_path / "otel.json").read_text())
+    assert otel["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "a"
+
+
+def test_enabling_tracing_at_runtime_adds_trace_to_response(monkeypatch, sales_df):
+    orchestrator = OrchestratorAgent()
+    monkeypatch.setattr(Config, "TRACING_ENABLED", True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = orchestrator.process_query("Analyze sales trends over time", sales_df)
+    names = {span["name"] for span in response["trace"]}
+    assert {"process_query", "plan"} <= names
+
+
+def test_profile_reports_functions(tmp_path):
+    with Tracer().profile(str(tmp_path), "query") as report:
+        sum(range(1000))
+    assert (tmp_path / "query.prof").exists()
+    assert report["peak_traced_bytes"] >= 0
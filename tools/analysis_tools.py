@@ -2,12 +2,16 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 from sklearn.linear_model import LinearRegression
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
+from tools.rollup_cube import RollupCube
+from tools.time_index import TimeIndex
+from tools.tracer import traced
 
 class AnalysisTools:
     """Tools for statistical analysis"""
     
     @staticmethod
+    @traced("analysis")
     def descriptive_statistics(df: pd.DataFrame, column: str) -> Dict[str, float]:
         """Calculate descriptive statistics for a column"""
         series = df[column]
@@ -24,21 +28,34 @@ class AnalysisTools:
         }
     
     @staticmethod
+    @traced("analysis")
     def correlation_analysis(df: pd.DataFrame) -> pd.DataFrame:
         """Calculate correlation matrix for numeric columns"""
         numeric_df = df.select_dtypes(include=[np.number])
         return numeric_df.corr()
     
     @staticmethod
-    def trend_analysis(df: pd.DataFrame, date_col: str, value_col: str) -> Dict[str, Any]:
+    @traced("analysis")
+    def trend_analysis(df: pd.DataFrame, date_col: str, value_col: str,
+                       cube: Optional[RollupCube] = None,
+                       time_index: Optional[TimeIndex] = None) -> Dict[str, Any]:
         """Analyze trends over time"""
-        df_sorted = df.sort_values(date_col)
+        if cube is not None and cube.covers(value_col, date_col=date_col):
+            return cube.trend_analysis(value_col)
         
-        # Convert dates to numeric for regression
-        df_sorted['date_numeric'] = pd.to_datetime(df_sorted[date_col]).astype(np.int64) // 10**9
-        
-        X = df_sorted['date_numeric'].values.reshape(-1, 1)
-        y = df_sorted[value_col].values
+        # An index without valid dates falls back to sorting the frame, which keeps row order
+        if time_index is not None and time_index.column == date_col and len(time_index):
+            # Reuse the parsed, sorted dates instead of sorting a copy of the frame
+            X = time_index.seconds().reshape(-1, 1)
+            y = time_index.take(df[value_col])
+        else:
+            df_sorted = df.sort_values(date_col)
+            
+            # Convert dates to numeric for regression
+            df_sorted['date_numeric'] = pd.to_datetime(df_sorted[date_col]).astype(np.int64) // 10**9
+            
+            X = df_sorted['date_numeric'].values.reshape(-1, 1)
+            y = df_sorted[value_col].values
         
         model = LinearRegression()
         model.fit(X, y)
@@ -53,6 +70,7 @@ class AnalysisTools:
         }
     
     @staticmethod
+    @traced("analysis")
     def detect_anomalies(df: pd.DataFrame, column: str, threshold: float = 3.0) -> List[int]:
         """Detect anomalies using z-score method"""
         z_scores = np.abs(stats.zscore(df[column].dropna()))
@@ -60,19 +78,35 @@ class AnalysisTools:
         return anomaly_indices.tolist()
     
     @staticmethod
-    def group_analysis(df: pd.DataFrame, group_col: str, value_col: str) -> pd.DataFrame:
+    @traced("analysis")
+    def group_analysis(df: pd.DataFrame, group_col: str, value_col: str,
+                       cube: Optional[RollupCube] = None) -> pd.DataFrame:
         """Perform group-wise analysis"""
-        return df.groupby(group_col)[value_col].agg([
+        if cube is not None and cube.covers(value_col, group_col=group_col):
+            return cube.group_analysis(group_col, value_col)
+        
+        return df.groupby(group_col, observed=False)[value_col].agg([
             'count', 'mean', 'median', 'std', 'min', 'max'
         ]).round(2)
     
     @staticmethod
-    def calculate_growth_rate(df: pd.DataFrame, date_col: str, value_col: str) -> Dict[str, float]:
+    @traced("analysis")
+    def calculate_growth_rate(df: pd.DataFrame, date_col: str, value_col: str,
+                              cube: Optional[RollupCube] = None,
+                              time_index: Optional[TimeIndex] = None) -> Dict[str, float]:
         """Calculate growth rates"""
-        df_sorted = df.sort_values(date_col)
+        if cube is not None and cube.covers(value_col, date_col=date_col):
+            return cube.calculate_growth_rate(value_col)
         
-        first_value = df_sorted[value_col].iloc[0]
-        last_value = df_sorted[value_col].iloc[-1]
+        if time_index is not None and time_index.column == date_col and len(time_index):
+            values = df[value_col]
+            first_value = values.iloc[time_index.order[0]]
+            last_value = values.iloc[time_index.order[-1]]
+        else:
+            df_sorted = df.sort_values(date_col)
+            
+            first_value = df_sorted[value_col].iloc[0]
+            last_value = df_sorted[value_col].iloc[-1]
         
         total_growth = ((last_value - first_value) / first_value) * 100
         
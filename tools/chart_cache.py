@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import pandas as pd
+from tools.tracer import traced
+
+# Parameters naming the columns a chart reads; the rest of the frame does not affect it
+_COLUMN_PARAMS = ("x_col", "y_col", "hue_col", "column")
+
+
+def chart_columns(viz_type: str, params: Dict[str, Any], df: pd.DataFrame) -> Tuple:
+    """Columns of df that a chart reads"""
+    columns = [params[name] for name in _COLUMN_PARAMS if params.get(name) in df.columns]
+    if viz_type == "heatmap" or not columns:
+        return tuple(df.columns)
+    return tuple(dict.fromkeys(columns))
+
+
+@traced("chart_cache")
+def fingerprint_frame(df: pd.DataFrame) -> str:
+    """Hash of the labels, dtypes and values of a frame.
+
+    Computed on every call rather than memoized per frame, so a frame
+    modified in place never serves a chart of its old contents.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    if isinstance(df.index, pd.RangeIndex):
+        digest.update(repr((df.index.start, df.index.stop, df.index.step)).encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    for col in df.columns:
+        digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def chart_key(fingerprint: str, viz_type: str, params: Dict[str, Any], fmt: str, dpi: int) -> str:
+    """Content address of a rendered chart"""
+    spec = json.dumps({"viz_type": viz_type, "params": params, "format": fmt, "dpi": dpi},
+                      sort_keys=True, default=str)
+    return hashlib.blake2b(f"{fingerprint}:{spec}".encode(), digest_size=20).hexdigest()
+
+
+class ChartCache:
+    """Rendered chart bytes keyed by content address.
+
+    Charts live as files under a directory bounded to max_bytes, evicting the
+    least recently used first (file mtime is touched on every hit). The most
+    recent charts are also kept in an in-memory hot tier so repeated requests
+    skip the disk read as well as matplotlib.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, hot_entries: int = 64):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hot_entries = hot_entries
+        self._hot: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    @traced("chart_cache")
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._hot.get(key)
+            if data is not None:
+                self._hot.move_to_end(key)
+                self.hits += 1
+                return data
+
+        path = self._path(key, fmt)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    @traced("chart_cache")
+    def put(self, key: str, fmt: str, data: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, fmt)
+        # Write then rename so concurrent readers never see a partial chart
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._remember(key, data)
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes is None or self._disk_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _remember(self, key: str, data: bytes):
+        self._hot[key] = data
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    def _evict(self):
+        """Delete the least recently used files until the directory fits in max_bytes"""
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self._hot.pop(path.stem, None)
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hot_entries": len(self._hot),
+                "disk_bytes": self._disk_bytes
+            }
+
+    def clear(self):
+        """Drop the hot tier and every cached file"""
+        with self._lock:
+            self._hot.clear()
+            self._disk_bytes = 0
+        if self.directory.exists():
+            for path in self.directory.iterdir():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from typing import Union, Dict, Any
+from config import Config
 
 class DataTools:
     """Tools for data loading and preprocessing"""
@@ -12,13 +13,40 @@ class DataTools:
             return source
         elif isinstance(source, str):
             if source.endswith('.csv'):
-                return pd.read_csv(source)
+                df = pd.read_csv(source)
+            elif source.endswith('.parquet'):
+                df = pd.read_parquet(source)
             elif source.endswith('.json'):
-                return pd.read_json(source)
+                df = pd.read_json(source)
             elif source.endswith(('.xls', '.xlsx')):
-                return pd.read_excel(source)
+                df = pd.read_excel(source)
+            else:
+                raise ValueError(f"Unsupported data source: {source}")
+            # Store numeric columns at the precision the analysis runs in
+            if Config.COMPUTE_PRECISION == "float32":
+                df = DataTools.downcast_numeric(df)
+            return df
         raise ValueError(f"Unsupported data source: {source}")
     
+    @staticmethod
+    def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+        """Store float64 columns as float32 and int64 columns as int32 where the values fit"""
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            if series.dtype == np.float64:
+                columns[col] = series.astype(np.float32)
+            elif series.dtype == np.int64 and len(series):
+                info = np.iinfo(np.int32)
+                if info.min <= series.min() and series.max() <= info.max:
+                    columns[col] = series.astype(np.int32)
+        if not columns:
+            return df
+        downcast = df.copy(deep=False)
+        for col, series in columns.items():
+            downcast[col] = series
+        return downcast
+    
     @staticmethod
     def get_data_summary(df: pd.DataFrame) -> Dict[str, Any]:
         """Get comprehensive data summary"""
@@ -56,7 +84,8 @@ class DataTools:
         """Generate sample sales data for testing"""
         np.random.seed(42)
         
-        dates = pd.date_range('2024-01-01', periods=rows, freq='D')
+        # Cap the calendar so large row counts stay within the Timestamp range
+        dates = pd.date_range('2024-01-01', periods=min(rows, 36500), freq='D')
         products = ['Product_A', 'Product_B', 'Product_C', 'Product_D']
         regions = ['North', 'South', 'East', 'West']
         
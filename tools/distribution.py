@@ -0,0 +1,260 @@
+import math
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import Config
+from tools.tracer import traced
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class _Buckets:
+    """Dense bucket counts starting at an integer offset, grown as new indices arrive"""
+
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, indices: np.ndarray):
+        if indices.size:
+            lo = int(indices.min())
+            self.merge(lo, np.bincount(indices - lo))
+
+    def merge(self, offset: int, counts: np.ndarray):
+        if not counts.size:
+            return
+        if not self.counts.size:
+            self.offset, self.counts = offset, counts.astype(np.int64, copy=True)
+            return
+        lo = min(self.offset, offset)
+        hi = max(self.offset + self.counts.size, offset + counts.size)
+        merged = np.zeros(hi - lo, dtype=np.int64)
+        merged[self.offset - lo:self.offset - lo + self.counts.size] += self.counts
+        merged[offset - lo:offset - lo + counts.size] += counts
+        self.offset, self.counts = lo, merged
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy guarantees.
+
+    Values are counted in logarithmic buckets (gamma = (1 + a) / (1 - a)), with
+    separate stores for positive and negative values and a bucket for zeros.
+    Any quantile is returned within a relative error a of the true value, the
+    memory is proportional to log(max / min) / a, and two sketches with the
+    same accuracy merge by adding bucket counts.
+    """
+
+    MIN_MAGNITUDE = 1e-12  # Smaller magnitudes count as zero
+
+    def __init__(self, relative_accuracy: float = Config.DISTRIBUTION_SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = _Buckets()
+        self.negative = _Buckets()
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def add(self, values: np.ndarray):
+        """Count an array of finite values"""
+        positive = values[values > self.MIN_MAGNITUDE]
+        negative = values[values < -self.MIN_MAGNITUDE]
+        self.positive.add(self._index(positive))
+        self.negative.add(self._index(-negative))
+        self.zero_count += values.size - positive.size - negative.size
+        self.count += values.size
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different accuracies")
+        self.positive.merge(other.positive.offset, other.positive.counts)
+        self.negative.merge(other.negative.offset, other.negative.counts)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket representative values in ascending order, with their counts"""
+        def values(buckets: _Buckets) -> np.ndarray:
+            indices = np.arange(buckets.offset, buckets.offset + buckets.counts.size)
+            return 2 * np.power(self.gamma, indices) / (self.gamma + 1)
+
+        return (np.concatenate([-values(self.negative)[::-1], [0.0], values(self.positive)]),
+                np.concatenate([self.negative.counts[::-1], [self.zero_count], self.positive.counts]))
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Approximate values at the given quantiles (in [0, 1])"""
+        if not self.count:
+            return np.full(len(qs), np.nan)
+        values, counts = self._ordered()
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        positions = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        return values[np.minimum(positions, values.size - 1)]
+
+    def cumulative_counts(self, points: np.ndarray) -> np.ndarray:
+        """Approximate number of values <= each point"""
+        values, counts = self._ordered()
+        cumulative = np.concatenate([[0], np.cumsum(counts)])
+        return cumulative[np.searchsorted(values, points, side='right')]
+
+
+class Histogram:
+    """Fixed-edge histogram; histograms over the same edges merge by adding counts"""
+
+    def __init__(self, edges: np.ndarray, counts: Optional[np.ndarray] = None):
+        self.edges = edges
+        self.counts = np.zeros(len(edges) - 1, dtype=np.int64) if counts is None else counts
+
+    @classmethod
+    def uniform(cls, lo: float, hi: float, bins: int) -> "Histogram":
+        if not hi > lo:
+            hi = lo + 1.0
+        return cls(np.linspace(lo, hi, bins + 1))
+
+    def add(self, values: np.ndarray):
+        """Count an array of finite values, clipping to the outer bins"""
+        lo, hi = self.edges[0], self.edges[-1]
+        bins = len(self.counts)
+        positions = ((values - lo) * (bins / (hi - lo))).astype(np.int64)
+        np.clip(positions, 0, bins - 1, out=positions)
+        self.counts += np.bincount(positions, minlength=bins)
+
+    def merge(self, other: "Histogram"):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        self.counts += other.counts
+
+    def to_dict(self) -> Dict[str, List]:
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist()}
+
+
+class ColumnDistribution:
+    """Mergeable distribution summary of one numeric column.
+
+    Holds count, missing, min, max, sums about a fixed shift (for the mean and
+    standard deviation), a fixed-bin histogram over [lo, hi] and a quantile
+    sketch, all over the finite values; NaN counts as missing and +/-inf is
+    counted separately as infinite. Partials built over the same range, e.g.
+    for row chunks or partitions of one column, merge exactly.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int = Config.DISTRIBUTION_BINS,
+                 relative_accuracy: float = Config.DISTRIBUTION_SKETCH_ACCURACY):
+        self.shift = (lo + hi) / 2 if np.isfinite(lo) and np.isfinite(hi) else 0.0
+        self.histogram = Histogram.uniform(lo, hi, bins) if np.isfinite(lo) else None
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.count = 0
+        self.missing = 0
+        self.infinite = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values: np.ndarray):
+        finite = np.isfinite(values)
+        valid = values[finite]
+        missing = int(np.isnan(values).sum())
+        self.missing += missing
+        self.infinite += values.size - valid.size - missing
+        if not valid.size:
+            return
+        shifted = valid - self.shift
+        self.count += valid.size
+        self.sum += float(shifted.sum())
+        self.sumsq += float(np.dot(shifted, shifted))
+        self.min = min(self.min, float(valid.min()))
+        self.max = max(self.max, float(valid.max()))
+        self.histogram.add(valid)
+        self.sketch.add(valid)
+
+    def merge(self, other: "ColumnDistribution"):
+        if other.shift != self.shift:
+            raise ValueError("Cannot merge distributions built over different ranges")
+        if other.histogram is not None:
+            if self.histogram is None:
+                self.histogram = Histogram(other.histogram.edges.copy())
+            self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+        self.count += other.count
+        self.missing += other.missing
+        self.infinite += other.infinite
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def adaptive_histogram(self, bins: int = Config.DISTRIBUTION_ADAPTIVE_BINS) -> Histogram:
+        """Equal-frequency bins with edges at sketch quantiles, so dense regions get narrow bins"""
+        edges = self.sketch.quantiles(np.linspace(0, 1, bins + 1))
+        edges[0], edges[-1] = self.min, self.max
+        edges = np.unique(np.clip(edges, self.min, self.max))
+        if edges.size < 2:
+            edges = np.array([self.min, self.max + 1.0])
+        cumulative = self.sketch.cumulative_counts(edges[1:-1])
+        counts = np.diff(np.concatenate([[0], cumulative, [self.count]]))
+        return Histogram(edges, np.maximum(counts, 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0, "missing": self.missing, "infinite": self.infinite}
+        mean = self.sum / self.count
+        variance = (self.sumsq - self.sum * mean) / (self.count - 1) if self.count > 1 else 0.0
+        quantiles = np.clip(self.sketch.quantiles(QUANTILES), self.min, self.max)
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "infinite": self.infinite,
+            "min": self.min,
+            "max": self.max,
+            "mean": mean + self.shift,
+            "std": math.sqrt(max(variance, 0.0)),
+            "quantiles": {f"p{round(q * 100)}": float(v) for q, v in zip(QUANTILES, quantiles)},
+            "histogram": self.histogram.to_dict(),
+            "adaptive_histogram": self.adaptive_histogram().to_dict()
+        }
+
+
+class DistributionProfiler:
+    """Histograms and quantile sketches for every numeric column.
+
+    The range of each column is taken first (one vectorized min/max), then the
+    rows are processed in chunks, each chunk updating the column's histogram,
+    sketch and moments with a handful of numpy calls. The per-column partials
+    are mergeable, so chunks or partitions can be profiled independently.
+    """
+
+    CHUNK_ROWS = 1 << 20
+
+    def __init__(self, bins: int = Config.DISTRIBUTION_BINS,
+                 relative_accuracy: float = Config.DISTRIBUTION_SKETCH_ACCURACY):
+        self.bins = bins
+        self.relative_accuracy = relative_accuracy
+
+    def profile_columns(self, df: pd.DataFrame,
+                        numeric_cols: Optional[List] = None) -> Dict[Any, ColumnDistribution]:
+        """Mergeable distribution partials for each numeric column"""
+        if numeric_cols is None:
+            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+
+        distributions = {}
+        for col in numeric_cols:
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            finite = values[np.isfinite(values)]
+            lo, hi = (finite.min(), finite.max()) if finite.size else (np.nan, np.nan)
+            distribution = ColumnDistribution(lo, hi, self.bins, self.relative_accuracy)
+            for start in range(0, len(values), self.CHUNK_ROWS):
+                distribution.add(values[start:start + self.CHUNK_ROWS])
+            distributions[col] = distribution
+        return distributions
+
+    @traced("analysis")
+    def profile(self, df: pd.DataFrame, numeric_cols: Optional[List] = None) -> Dict[str, Any]:
+        """Distribution statistics, quantiles and histograms of each numeric column"""
+        distributions = self.profile_columns(df, numeric_cols)
+        return {
+            "distributions": {str(col): dist.to_dict() for col, dist in distributions.items()},
+            "relative_accuracy": self.relative_accuracy
+        }
@@ -0,0 +1,49 @@
+from typing import Any, List, Optional
+import numpy as np
+import pandas as pd
+
+
+def _backing_array(series: pd.Series) -> np.ndarray:
+    """The array holding a column's values, without copying where pandas allows it"""
+    values = series.array
+    if hasattr(values, "codes"):
+        values = values.codes
+    elif hasattr(values, "asi8"):
+        values = values.asi8
+    return np.asarray(values)
+
+
+def _same_buffer(a: np.ndarray, b: np.ndarray) -> bool:
+    return (a.dtype == b.dtype and a.shape == b.shape and a.strides == b.strides
+            and a.__array_interface__["data"][0] == b.__array_interface__["data"][0])
+
+
+class FrameSnapshot:
+    """Labels, dtypes and backing arrays of a frame's columns at one point in time.
+
+    Caches keyed by id(df) keep one next to what they derived from the frame
+    and rebuild when it no longer matches: a column added, dropped, retyped,
+    reordered or assigned a new array. The arrays are held, so their memory
+    cannot be reused by a new column while the snapshot exists. Values
+    written in place into an existing array are not detected.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[List[Any]] = None):
+        self.num_rows = len(df)
+        self.whole_frame = columns is None
+        self.columns = list(df.columns) if columns is None else list(columns)
+        self.dtypes = [df[col].dtype for col in self.columns]
+        self.arrays = [_backing_array(df[col]) for col in self.columns]
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        if len(df) != self.num_rows:
+            return False
+        if self.whole_frame and list(df.columns) != self.columns:
+            return False
+        for col, dtype, array in zip(self.columns, self.dtypes, self.arrays):
+            if col not in df.columns:
+                return False
+            series = df[col]
+            if series.dtype != dtype or not _same_buffer(_backing_array(series), array):
+                return False
+        return True
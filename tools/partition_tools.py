@@ -0,0 +1,582 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import Config
+from tools.tracer import traced
+from tools.shared_dataset import SharedDatasetRegistry, attach_array, create_segment
+
+NAT = np.iinfo(np.int64).min
+
+
+def _column_array(series: pd.Series, kind: str) -> Tuple[np.ndarray, Optional[pd.Index]]:
+    """Array to share for a column (datetimes as int64 ns, categories as codes)"""
+    if kind == "categorical":
+        codes, uniques = pd.factorize(series, sort=True)
+        return codes, uniques
+    if kind == "datetime":
+        return pd.to_datetime(series).to_numpy(dtype='datetime64[ns]').view(np.int64), None
+    if series.dtype.kind in 'iuf' and isinstance(series.dtype, np.dtype):
+        return series.to_numpy(), None
+    return series.to_numpy(dtype=np.float64, na_value=np.nan), None
+
+
+def _valid_values(v: np.ndarray) -> np.ndarray:
+    return v[~np.isnan(v)] if v.dtype.kind == 'f' else v
+
+
+# Worker-side partial aggregations: each receives read-only views of its row
+# partition and returns small arrays that the parent merges
+
+def _run_partial(task: Tuple) -> Any:
+    """Attach to the shared columns, run one partial aggregation and detach"""
+    func, specs, start, stop, params = task
+    handles = []
+    columns = {}
+    try:
+        for key, spec in specs.items():
+            handle, array = attach_array(spec)
+            if handle is not None:
+                handles.append(handle)
+            columns[key] = array[start:stop]
+        return func(columns, **params)
+    finally:
+        columns.clear()
+        for handle in handles:
+            handle.close()
+
+
+def _moments_partial(columns: Dict, keys: List) -> Dict:
+    """Count, mean, central moment sums, min and max per column"""
+    out = {}
+    for key in keys:
+        v = columns[key]
+        valid = _valid_values(v)
+        n = valid.size
+        if n == 0:
+            out[key] = (0, 0.0, 0.0, 0.0, 0.0, np.nan, np.nan, v.size)
+            continue
+        x = valid.astype(np.float64, copy=False)
+        mean = x.mean()
+        d = x - mean
+        d2 = d * d
+        out[key] = (n, mean, d2.sum(), (d2 * d).sum(), (d2 * d2).sum(),
+                    valid.min().item(), valid.max().item(), v.size - n)
+    return out
+
+
+def _group_partial(columns: Dict, code_key, value_key, num_groups: int) -> Tuple:
+    """Per-group count, mean, M2, min and max"""
+    codes = columns[code_key]
+    v = columns[value_key]
+    valid = codes >= 0
+    if v.dtype.kind == 'f':
+        valid &= ~np.isnan(v)
+    c = codes[valid]
+    x = v[valid].astype(np.float64, copy=False)
+
+    count = np.bincount(c, minlength=num_groups)
+    sums = np.bincount(c, weights=x, minlength=num_groups)
+    mean = np.divide(sums, count, out=np.zeros(num_groups), where=count > 0)
+    d = x - mean[c]
+    m2 = np.bincount(c, weights=d * d, minlength=num_groups)
+    mins = np.full(num_groups, np.inf)
+    maxs = np.full(num_groups, -np.inf)
+    np.minimum.at(mins, c, x)
+    np.maximum.at(maxs, c, x)
+    return count, mean, m2, mins, maxs
+
+
+def _bin_keys(v: np.ndarray, codes: Optional[np.ndarray], lo: np.ndarray,
+              hi: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Map each valid value to a (group, bin) key over its group's [lo, hi] range"""
+    valid = ~np.isnan(v) if v.dtype.kind == 'f' else np.ones(v.size, dtype=bool)
+    if codes is not None:
+        valid &= codes >= 0
+    x = v[valid].astype(np.float64, copy=False)
+    c = codes[valid].astype(np.int64) if codes is not None else np.zeros(x.size, dtype=np.int64)
+    width = hi - lo
+    scale = np.divide(bins, width, out=np.zeros_like(width), where=width > 0)
+    b = ((x - lo[c]) * scale[c]).astype(np.int64)
+    np.clip(b, 0, bins - 1, out=b)
+    return c * bins + b, x
+
+
+def _histogram_partial(columns: Dict, targets: List[Dict], bins: int) -> List[np.ndarray]:
+    out = []
+    for t in targets:
+        codes = columns[t["codes"]] if t["codes"] is not None else None
+        keys, _ = _bin_keys(columns[t["value"]], codes, t["lo"], t["hi"], bins)
+        out.append(np.bincount(keys, minlength=len(t["lo"]) * bins))
+    return out
+
+
+def _select_partial(columns: Dict, targets: List[Dict], bins: int,
+                    wanted: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Return the values that fall into the bins holding the requested ranks"""
+    out = []
+    for t, keys_wanted in zip(targets, wanted):
+        codes = columns[t["codes"]] if t["codes"] is not None else None
+        keys, x = _bin_keys(columns[t["value"]], codes, t["lo"], t["hi"], bins)
+        mask = np.isin(keys, keys_wanted)
+        out.append((keys[mask], x[mask]))
+    return out
+
+
+def _corr_partial(columns: Dict, keys: List, shifts: np.ndarray, block_rows: int) -> Tuple:
+    """Pairwise-complete power sums for the correlation matrix"""
+    k = len(keys)
+    n = np.zeros((k, k))
+    s = np.zeros((k, k))
+    q = np.zeros((k, k))
+    ss = np.zeros((k, k))
+    length = len(columns[keys[0]])
+    for b0 in range(0, length, block_rows):
+        x = np.column_stack([columns[key][b0:b0 + block_rows].astype(np.float64) for key in keys])
+        x -= shifts
+        mask = ~np.isnan(x)
+        if mask.all():
+            n += x.shape[0]
+            s += x.sum(axis=0)[:, None]
+            ss += (x * x).sum(axis=0)[:, None]
+            q += x.T @ x
+        else:
+            m = mask.astype(np.float64)
+            xz = np.where(mask, x, 0.0)
+            n += m.T @ m
+            s += xz.T @ m
+            ss += (xz * xz).T @ m
+            q += xz.T @ xz
+    return n, s, q, ss
+
+
+def _trend_partial(columns: Dict, date_key, value_key, start: int) -> Dict:
+    """Regression co-moments plus the earliest and latest rows of the partition"""
+    t = columns[date_key]
+    y = columns[value_key]
+    has_date = t != NAT
+    out = {"n": 0, "first": None, "last": None}
+
+    dated = np.flatnonzero(has_date)
+    if dated.size:
+        td = t[dated]
+        first = dated[np.argmin(td)]
+        last = dated[td.size - 1 - np.argmax(td[::-1])]
+        out["first"] = (int(t[first]), start + int(first), float(y[first]))
+        out["last"] = (int(t[last]), start + int(last), float(y[last]))
+
+    valid = has_date & ~np.isnan(y) if y.dtype.kind == 'f' else has_date
+    x = (t[valid] // 10**9).astype(np.float64)
+    yv = y[valid].astype(np.float64)
+    if x.size:
+        mx, my = x.mean(), yv.mean()
+        dx, dy = x - mx, yv - my
+        out.update(n=x.size, mean=np.array([mx, my]),
+                   comoment=np.array([[dx @ dx, dx @ dy], [dx @ dy, dy @ dy]]))
+    return out
+
+
+def _zscore_partial(columns: Dict, key, mean: float, std: float,
+                    threshold: float, offset: int) -> np.ndarray:
+    """Positions (among non-null values) whose absolute z-score exceeds the threshold"""
+    valid = _valid_values(columns[key]).astype(np.float64, copy=False)
+    z = np.abs(valid - mean) / std
+    return np.flatnonzero(z > threshold) + offset
+
+
+# Parent-side merges
+
+def _merge_moments(parts: List[Tuple]) -> Dict[str, Any]:
+    """Combine partition moments (Chan/Pebay parallel update)"""
+    n, mean, m2, m3, m4 = 0, 0.0, 0.0, 0.0, 0.0
+    mins, maxs, missing = [], [], 0
+    for nb, mb, m2b, m3b, m4b, mnb, mxb, missb in parts:
+        missing += missb
+        if nb == 0:
+            continue
+        mins.append(mnb)
+        maxs.append(mxb)
+        if n == 0:
+            n, mean, m2, m3, m4 = nb, mb, m2b, m3b, m4b
+            continue
+        na = n
+        n = na + nb
+        delta = mb - mean
+        m4 = (m4 + m4b + delta**4 * na * nb * (na * na - na * nb + nb * nb) / n**3
+              + 6 * delta**2 * (na * na * m2b + nb * nb * m2) / n**2
+              + 4 * delta * (na * m3b - nb * m3) / n)
+        m3 = (m3 + m3b + delta**3 * na * nb * (na - nb) / n**2
+              + 3 * delta * (na * m2b - nb * m2) / n)
+        m2 = m2 + m2b + delta**2 * na * nb / n
+        mean = mean + delta * nb / n
+    return {"n": n, "mean": mean, "m2": m2, "m3": m3, "m4": m4, "missing": missing,
+            "min": min(mins) if mins else np.nan, "max": max(maxs) if maxs else np.nan}
+
+
+def _skewness(m: Dict) -> float:
+    """Bias-corrected skewness, matching pandas.Series.skew"""
+    n = m["n"]
+    if n < 3:
+        return np.nan
+    if m["m2"] == 0:
+        return 0.0
+    return n * (n - 1) ** 0.5 / (n - 2) * (m["m3"] / m["m2"] ** 1.5)
+
+
+def _kurtosis(m: Dict) -> float:
+    """Bias-corrected excess kurtosis, matching pandas.Series.kurtosis"""
+    n = m["n"]
+    if n < 4:
+        return np.nan
+    denominator = (n - 2) * (n - 3) * m["m2"] ** 2
+    if denominator == 0:
+        return 0.0
+    adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+    return n * (n + 1) * (n - 1) * m["m4"] / denominator - adj
+
+
+def _std(m2: float, n: int) -> float:
+    return math.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+
+
+class PartitionedExecutor:
+    """Runs DataAnalyst analyses as partial aggregations over row partitions in a process pool.
+
+    Workers attach to the columns by name instead of receiving pickled
+    copies. Frames registered in the shared dataset registry are used in
+    place; anything else is copied into temporary segments for the call.
+    Results match the shapes returned by AnalysisTools and DataTools.
+    """
+
+    QUANTILES = (0.25, 0.5, 0.75)
+
+    def __init__(self, workers: Optional[int] = None,
+                 min_partition_rows: int = Config.PARTITION_MIN_ROWS,
+                 registry: Optional[SharedDatasetRegistry] = None):
+        self.workers = workers or Config.PARALLEL_WORKERS
+        self.min_partition_rows = min_partition_rows
+        self.registry = registry
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _partitions(self, n: int) -> List[Tuple[int, int]]:
+        count = max(1, min(self.workers * 2, n // max(self.min_partition_rows, 1)))
+        bounds = np.linspace(0, n, count + 1, dtype=np.int64)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    @contextmanager
+    def _shared(self, df: pd.DataFrame, requests: Dict[Any, Tuple[Any, str]]):
+        """Resolve (column, kind) requests to shared column specs for the duration of a call.
+
+        Yields the specs and, for categorical requests, the categories the codes refer to.
+        """
+        dataset = self.registry.dataset_for(df) if self.registry is not None else None
+        specs, categories, segments = {}, {}, []
+        try:
+            for key, (col, kind) in requests.items():
+                if dataset is not None and dataset.column_kind(col) == kind and dataset.backs(df, col):
+                    specs[key] = dataset.column_spec(col)
+                    categories[key] = dataset.categories(col)
+                    continue
+                array, categories[key] = _column_array(df[col], kind)
+                segment, specs[key] = create_segment(array)
+                segments.append(segment)
+            yield specs, categories
+        finally:
+            for segment in segments:
+                segment.free()
+
+    def _map(self, func, specs: Dict, n: int, params: Any) -> List[Any]:
+        """Run a partial over every partition; params may be a dict or one dict per partition"""
+        partitions = self._partitions(n)
+        if isinstance(params, dict):
+            params = [params] * len(partitions)
+        tasks = [(func, specs, start, stop, p) for (start, stop), p in zip(partitions, params)]
+        if len(tasks) == 1:
+            return [_run_partial(tasks[0])]
+        return list(self._get_pool().map(_run_partial, tasks))
+
+    def _moments(self, specs: Dict, n: int, keys: List) -> Tuple[Dict, List[Dict]]:
+        parts = self._map(_moments_partial, specs, n, {"keys": keys})
+        merged = {key: _merge_moments([p[key] for p in parts]) for key in keys}
+        return merged, parts
+
+    def _exact_quantiles(self, specs: Dict, n: int, targets: List[Dict],
+                         quantiles: Tuple[float, ...]) -> List[np.ndarray]:
+        """Exact linear-interpolated quantiles per (target, group), in two more passes.
+
+        Pass one histograms every group over its [min, max] range; the parent
+        locates the bins containing the needed ranks, and pass two returns only
+        the values inside those bins so they can be sorted exactly.
+        """
+        max_groups = max(len(t["lo"]) for t in targets)
+        bins = int(max(16, min(4096, 2**22 // max_groups)))
+
+        hist_parts = self._map(_histogram_partial, specs, n, {"targets": targets, "bins": bins})
+
+        plans, wanted = [], []
+        for i, t in enumerate(targets):
+            groups = len(t["lo"])
+            counts = sum(p[i] for p in hist_parts).reshape(groups, bins)
+            cumulative = np.cumsum(counts, axis=1)
+            plan = []
+            keys = set()
+            for g in range(groups):
+                total = int(cumulative[g, -1])
+                if total == 0:
+                    plan.append(None)
+                    continue
+                ranks = []
+                for q in quantiles:
+                    h = (total - 1) * q
+                    for r in (math.floor(h), math.ceil(h)):
+                        b = int(np.searchsorted(cumulative[g], r, side='right'))
+                        offset = r - (int(cumulative[g, b - 1]) if b > 0 else 0)
+                        keys.add(g * bins + b)
+                        ranks.append((g * bins + b, offset))
+                plan.append(ranks)
+            plans.append(plan)
+            wanted.append(np.array(sorted(keys), dtype=np.int64))
+
+        select_parts = self._map(_select_partial, specs, n,
+                                 {"targets": targets, "bins": bins, "wanted": wanted})
+
+        results = []
+        for i, t in enumerate(targets):
+            keys = np.concatenate([p[i][0] for p in select_parts])
+            values = np.concatenate([p[i][1] for p in select_parts])
+            order = np.lexsort((values, keys))
+            keys, values = keys[order], values[order]
+            starts = {k: int(np.searchsorted(keys, k)) for k in wanted[i]}
+
+            out = np.full((len(t["lo"]), len(quantiles)), np.nan)
+            for g, ranks in enumerate(plans[i]):
+                if ranks is None:
+                    continue
+                total = int(t["counts"][g])
+                picked = [values[starts[key] + offset] for key, offset in ranks]
+                for j, q in enumerate(quantiles):
+                    h = (total - 1) * q
+                    low, high = picked[2 * j], picked[2 * j + 1]
+                    out[g, j] = low + (h - math.floor(h)) * (high - low)
+            results.append(out)
+        return results
+
+    def _describe(self, df: pd.DataFrame, columns: List) -> Tuple[Dict, Dict]:
+        """Merged moments and quartiles for the given numeric columns"""
+        if not columns:
+            return {}, {}
+        with self._shared(df, {col: (col, "numeric") for col in columns}) as (specs, _):
+            moments, _ = self._moments(specs, len(df), columns)
+            targets = [{"value": col, "codes": None,
+                        "lo": np.array([float(moments[col]["min"])]),
+                        "hi": np.array([float(moments[col]["max"])]),
+                        "counts": np.array([moments[col]["n"]])} for col in columns]
+            quartiles = self._exact_quantiles(specs, len(df), targets, self.QUANTILES)
+        return moments, {col: q[0] for col, q in zip(columns, quartiles)}
+
+    @traced("analysis")
+    def describe_columns(self, df: pd.DataFrame, columns: List) -> Dict[str, Dict[str, float]]:
+        """Descriptive statistics for several columns, as AnalysisTools.descriptive_statistics"""
+        moments, quartiles = self._describe(df, columns)
+        stats = {}
+        for col in columns:
+            m, (q25, median, q75) = moments[col], quartiles[col]
+            stats[col] = {
+                "mean": m["mean"] if m["n"] else np.nan,
+                "median": median,
+                "std": _std(m["m2"], m["n"]),
+                "min": m["min"],
+                "max": m["max"],
+                "q25": q25,
+                "q75": q75,
+                "skewness": _skewness(m),
+                "kurtosis": _kurtosis(m)
+            }
+        return stats
+
+    @traced("analysis")
+    def data_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Parallel equivalent of DataTools.get_data_summary"""
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        moments, quartiles = self._describe(df, numeric_cols)
+
+        missing = {}
+        for col in df.columns:
+            missing[col] = moments[col]["missing"] if col in moments else int(df[col].isnull().sum())
+
+        # Datetime columns are described by pandas; they are cheap next to the numeric work
+        datetime_cols = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+        described = df[datetime_cols].describe().to_dict() if datetime_cols else {}
+
+        for col in numeric_cols:
+            m, (q25, median, q75) = moments[col], quartiles[col]
+            described[col] = {
+                "count": float(m["n"]),
+                "mean": m["mean"] if m["n"] else np.nan,
+                "std": _std(m["m2"], m["n"]),
+                "min": float(m["min"]),
+                "25%": q25,
+                "50%": median,
+                "75%": q75,
+                "max": float(m["max"])
+            }
+
+        numeric_summary = {col: described[col] for col in df.columns if col in described}
+
+        return {
+            "shape": df.shape,
+            "columns": df.columns.tolist(),
+            "dtypes": df.dtypes.to_dict(),
+            "missing_values": missing,
+            "numeric_summary": numeric_summary,
+            "memory_usage": df.memory_usage(deep=True).sum()
+        }
+
+    @traced("analysis")
+    def correlation_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Pairwise-complete Pearson correlation matrix of numeric columns"""
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        # Shift by a sample mean so the power sums do not lose precision
+        shifts = np.array([np.nanmean(df[col].iloc[:10000].to_numpy(dtype=np.float64, na_value=np.nan))
+                           if len(df) else 0.0 for col in columns])
+        shifts = np.nan_to_num(shifts)
+        block_rows = max(1024, 8_000_000 // max(len(columns), 1))
+
+        with self._shared(df, {col: (col, "numeric") for col in columns}) as (specs, _):
+            parts = self._map(_corr_partial, specs, len(df),
+                              {"keys": columns, "shifts": shifts, "block_rows": block_rows})
+        n, s, q, ss = (sum(p[i] for p in parts) for i in range(4))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = n * ss - s * s
+            corr = (n * q - s * s.T) / np.sqrt(var * var.T)
+        corr[(n < 2) | (var <= 0) | (var.T <= 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag(var) > 0
+        corr[np.diag_indices_from(corr)] = np.where(diagonal, 1.0, np.nan)
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+    def _trend_parts(self, df: pd.DataFrame, date_col: str, value_col: str) -> List[Dict]:
+        requests = {"date": (date_col, "datetime"), "value": (value_col, "numeric")}
+        partitions = self._partitions(len(df))
+        params = [{"date_key": "date", "value_key": "value", "start": start}
+                  for start, _ in partitions]
+        with self._shared(df, requests) as (specs, _):
+            return self._map(_trend_partial, specs, len(df), params)
+
+    @traced("analysis")
+    def trend_analysis(self, df: pd.DataFrame, date_col: str, value_col: str) -> Dict[str, Any]:
+        """Least-squares trend from merged co-moments, as AnalysisTools.trend_analysis"""
+        n, mean, comoment = 0, np.zeros(2), np.zeros((2, 2))
+        for p in self._trend_parts(df, date_col, value_col):
+            if p["n"] == 0:
+                continue
+            if n == 0:
+                n, mean, comoment = p["n"], p["mean"], p["comoment"]
+                continue
+            total = n + p["n"]
+            delta = p["mean"] - mean
+            comoment = comoment + p["comoment"] + np.outer(delta, delta) * n * p["n"] / total
+            mean = mean + delta * p["n"] / total
+            n = total
+
+        cxx, cxy, cyy = comoment[0, 0], comoment[0, 1], comoment[1, 1]
+        slope = cxy / cxx if cxx > 0 else 0.0
+        if cyy > 0:
+            r_squared = cxy * cxy / (cxx * cyy) if cxx > 0 else 0.0
+        else:
+            r_squared = 1.0
+        return {
+            "trend": "increasing" if slope > 0 else "decreasing",
+            "slope": float(slope),
+            "intercept": float(mean[1] - slope * mean[0]),
+            "r_squared": float(r_squared)
+        }
+
+    @traced("analysis")
+    def calculate_growth_rate(self, df: pd.DataFrame, date_col: str, value_col: str) -> Dict[str, float]:
+        """Growth between the earliest and latest rows (stable date order)"""
+        parts = self._trend_parts(df, date_col, value_col)
+        firsts = [p["first"] for p in parts if p["first"] is not None]
+        lasts = [p["last"] for p in parts if p["last"] is not None]
+        first_value = min(firsts, key=lambda f: (f[0], f[1]))[2]
+        last_value = max(lasts, key=lambda f: (f[0], f[1]))[2]
+
+        total_growth = ((last_value - first_value) / first_value) * 100
+        return {
+            "total_growth_percent": round(total_growth, 2),
+            "first_value": float(first_value),
+            "last_value": float(last_value)
+        }
+
+    @traced("analysis")
+    def group_analysis(self, df: pd.DataFrame, group_col: str, value_col: str) -> pd.DataFrame:
+        """Group count/mean/median/std/min/max, as AnalysisTools.group_analysis"""
+        requests = {"codes": (group_col, "categorical"), "value": (value_col, "numeric")}
+
+        with self._shared(df, requests) as (specs, categories):
+            uniques = categories["codes"]
+            groups = len(uniques)
+            parts = self._map(_group_partial, specs, len(df),
+                              {"code_key": "codes", "value_key": "value", "num_groups": groups})
+
+            count, mean, m2 = np.zeros(groups), np.zeros(groups), np.zeros(groups)
+            mins, maxs = np.full(groups, np.inf), np.full(groups, -np.inf)
+            for cb, mb, m2b, mnb, mxb in parts:
+                total = count + cb
+                delta = mb - mean
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    m2 = np.where(total > 0, m2 + m2b + delta**2 * count * cb / total, 0.0)
+                    mean = np.where(total > 0, mean + delta * cb / total, 0.0)
+                count = total
+                mins, maxs = np.minimum(mins, mnb), np.maximum(maxs, mxb)
+
+            medians = self._exact_quantiles(specs, len(df), [{
+                "value": "value", "codes": "codes",
+                "lo": np.where(count > 0, mins, 0.0), "hi": np.where(count > 0, maxs, 0.0),
+                "counts": count
+            }], (0.5,))[0][:, 0]
+
+        empty = count == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+        result = pd.DataFrame({
+            "count": count.astype(np.int64),
+            "mean": np.where(empty, np.nan, mean),
+            "median": medians,
+            "std": std,
+            "min": np.where(empty, np.nan, mins),
+            "max": np.where(empty, np.nan, maxs)
+        }, index=pd.Index(uniques, name=group_col))
+        value_dtype = df[value_col].dtype
+        if value_dtype.kind in 'iu' and not empty.any():
+            result[["min", "max"]] = result[["min", "max"]].astype(value_dtype)
+        return result.round(2)
+
+    @traced("analysis")
+    def detect_anomalies(self, df: pd.DataFrame, column: str, threshold: float = 3.0) -> List[int]:
+        """Z-score anomalies, as AnalysisTools.detect_anomalies"""
+        with self._shared(df, {column: (column, "numeric")}) as (specs, _):
+            merged, parts = self._moments(specs, len(df), [column])
+            m = merged[column]
+            std = math.sqrt(m["m2"] / m["n"]) if m["n"] else 0.0
+            if std == 0:
+                return []
+            offsets = np.concatenate([[0], np.cumsum([p[column][0] for p in parts])[:-1]])
+            params = [{"key": column, "mean": m["mean"], "std": std,
+                       "threshold": threshold, "offset": int(offset)} for offset in offsets]
+            positions = self._map(_zscore_partial, specs, len(df), params)
+        return np.concatenate(positions).tolist()
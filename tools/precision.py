@@ -0,0 +1,221 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from tools.analysis_tools import AnalysisTools
+from tools.rollup_cube import RollupCube
+from tools.time_index import TimeIndex
+from tools.tracer import traced
+
+BLOCK = 1 << 16
+# Rows per float32 GEMM; for narrow matrices BLAS accumulates all of them in float32
+GEMM_BLOCK = 1 << 12
+
+
+def as_float32(values) -> np.ndarray:
+    """Column values as float32 with NaN for missing, without copying float32 input"""
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float32, na_value=np.nan)
+    return np.asarray(values, dtype=np.float32)
+
+
+def as_shifted_float32(values) -> Tuple[np.ndarray, float]:
+    """Column values as float32 about a float64 shift near their centre, and the shift.
+
+    float32 keeps about 7 significant digits of each value, so converting data
+    with a large offset, e.g. a mean of 1e6 and a standard deviation of 1,
+    would round away most of its spread. Subtracting the shift in float64
+    first keeps the residuals, and the statistics computed from them, accurate
+    relative to the spread. float32 input is returned unshifted, as its
+    rounding has already happened.
+    """
+    dtype = values.dtype if hasattr(values, "dtype") else np.asarray(values).dtype
+    if dtype == np.float32:
+        return as_float32(values), 0.0
+    if isinstance(values, pd.Series):
+        x = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        x = np.asarray(values, dtype=np.float64)
+    # The median of a strided sample is close enough to the centre and costs no full pass
+    sample = x[::max(1, x.size // 1024)]
+    sample = sample[np.isfinite(sample)]
+    shift = float(np.median(sample)) if sample.size else 0.0
+    shifted = np.empty(x.shape, dtype=np.float32)
+    np.subtract(x, shift, out=shifted, casting='same_kind')
+    return shifted, shift
+
+
+def block_sum(x: np.ndarray) -> np.ndarray:
+    """Sum of a float32 array along axis 0, in float64.
+
+    Each block of BLOCK rows is summed in float32 with numpy's pairwise
+    summation (error grows with log(BLOCK), not BLOCK), and the block sums are
+    accumulated in float64, so the error stays that of one block, about 1e-7
+    relative, however many rows there are while the data is only ever read as
+    float32.
+    """
+    n = x.shape[0]
+    full = n // BLOCK * BLOCK
+    total = x[full:].sum(axis=0, dtype=np.float64)
+    if full:
+        blocks = x[:full].reshape((-1, BLOCK) + x.shape[1:])
+        total = total + blocks.sum(axis=1).sum(axis=0, dtype=np.float64)
+    return total
+
+
+def central_moments(x: np.ndarray) -> Dict[str, float]:
+    """Count, mean and second to fourth central moment sums of the non-missing values"""
+    valid = x[~np.isnan(x)]
+    n = valid.size
+    if not n:
+        return {"n": 0, "mean": np.nan, "m2": np.nan, "m3": np.nan, "m4": np.nan}
+    mean = float(block_sum(valid)) / n
+    d = valid - np.float32(mean)
+    # Correct the float32 rounding of the shift, a compensated second pass
+    correction = float(block_sum(d)) / n
+    mean += correction
+    d -= np.float32(correction)
+    d2 = d * d
+    return {"n": n, "mean": mean, "m2": float(block_sum(d2)), "m3": float(block_sum(d2 * d)),
+            "m4": float(block_sum(d2 * d2))}
+
+
+def cross_products(A: np.ndarray, B: Optional[np.ndarray] = None) -> np.ndarray:
+    """A^T B (A^T A by default) for float32 matrices, one float32 GEMM per block of rows accumulated in float64"""
+    B = A if B is None else B
+    total = np.zeros((A.shape[1], B.shape[1]))
+    for start in range(0, A.shape[0], GEMM_BLOCK):
+        total += A[start:start + GEMM_BLOCK].T @ B[start:start + GEMM_BLOCK]
+    return total
+
+
+class Float32AnalysisTools(AnalysisTools):
+    """AnalysisTools computing in float32 with compensated summation.
+
+    Numeric columns are read (or stored, see DataTools.downcast_numeric) as
+    float32, halving the memory traffic and the size of every intermediate, while
+    sums are formed blockwise and accumulated in float64 and variances use
+    shifted two-pass moments. float64 columns are shifted near their centre
+    before the conversion (see as_shifted_float32), so means, variances,
+    correlations and slopes agree with the float64 results to about 1e-7 of
+    the data's spread even when it sits far from zero. Columns already stored
+    as float32 cannot be shifted back: one with a large offset relative to its
+    spread has lost those digits at storage. Group statistics and growth
+    rates are inherited unchanged.
+    """
+
+    @staticmethod
+    @traced("analysis")
+    def descriptive_statistics(df: pd.DataFrame, column: str) -> Dict[str, float]:
+        """Calculate descriptive statistics for a column"""
+        x, shift = as_shifted_float32(df[column])
+        moments = central_moments(x)
+        n, m2, m3, m4 = moments["n"], moments["m2"], moments["m3"], moments["m4"]
+        valid = x[~np.isnan(x)]
+        q25, median, q75 = (np.quantile(valid, [0.25, 0.5, 0.75]).astype(np.float64) + shift
+                            if n else (np.nan, np.nan, np.nan))
+
+        # Bias-adjusted skewness and excess kurtosis, matching pandas
+        skewness = kurtosis = np.nan
+        if n > 2 and m2 > 0:
+            skewness = np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5
+        if n > 3 and m2 > 0:
+            kurtosis = (n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 * m2)
+                        - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+        return {
+            "mean": moments["mean"] + shift,
+            "median": float(median),
+            "std": float(np.sqrt(m2 / (n - 1))) if n > 1 else np.nan,
+            "min": float(valid.min()) + shift if n else np.nan,
+            "max": float(valid.max()) + shift if n else np.nan,
+            "q25": float(q25),
+            "q75": float(q75),
+            "skewness": float(skewness),
+            "kurtosis": float(kurtosis)
+        }
+
+    @staticmethod
+    @traced("analysis")
+    def correlation_analysis(df: pd.DataFrame) -> pd.DataFrame:
+        """Calculate correlation matrix for numeric columns"""
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        X = np.empty((len(df), len(numeric_cols)), dtype=np.float32)
+        for i, col in enumerate(numeric_cols):
+            # Correlations do not depend on the shift
+            X[:, i] = as_shifted_float32(df[col])[0]
+
+        missing = np.isnan(X)
+        if not missing.any():
+            X -= (block_sum(X) / max(len(X), 1)).astype(np.float32)
+            sxy = cross_products(X)
+            scale = np.sqrt(np.diag(sxy))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = sxy / np.outer(scale, scale)
+        else:
+            # Pairwise-complete sums from masked products, as pandas' pairwise deletion
+            valid = (~missing).astype(np.float32)
+            with np.errstate(invalid='ignore'):
+                shift = np.nanmean(X, axis=0)
+            X -= np.nan_to_num(shift).astype(np.float32)
+            X[missing] = 0.0
+            n = cross_products(valid, valid)
+            sx = cross_products(X, valid)          # sum of x_i over rows where j is valid
+            sxx = cross_products(X * X, valid)
+            sxy = cross_products(X)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cov = sxy - sx * sx.T / n
+                var_i = sxx - sx * sx / n
+                corr = cov / np.sqrt(var_i * var_i.T)
+                corr[n < 2] = np.nan
+        np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=numeric_cols, columns=numeric_cols)
+
+    @staticmethod
+    @traced("analysis")
+    def trend_analysis(df: pd.DataFrame, date_col: str, value_col: str,
+                       cube: Optional[RollupCube] = None,
+                       time_index: Optional[TimeIndex] = None) -> Dict[str, Any]:
+        """Analyze trends over time"""
+        if cube is not None and cube.covers(value_col, date_col=date_col):
+            return cube.trend_analysis(value_col)
+
+        if time_index is not None and time_index.column == date_col and len(time_index):
+            seconds = time_index.seconds()
+            y, shift = as_shifted_float32(time_index.take(df[value_col]))
+        else:
+            seconds = pd.to_datetime(df[date_col]).to_numpy(dtype='datetime64[s]').astype(np.int64)
+            y, shift = as_shifted_float32(df[value_col])
+
+        # Centre the timestamps in int64 first; epoch seconds do not fit a float32 mantissa
+        t0 = int(seconds.mean())
+        t = (seconds - t0).astype(np.float32)
+        mean_t = float(block_sum(t)) / len(t)
+        mean_y = float(block_sum(y)) / len(y)
+        t -= np.float32(mean_t)
+        y = y - np.float32(mean_y)
+
+        sxx = float(block_sum(t * t))
+        sxy = float(block_sum(t * y))
+        syy = float(block_sum(y * y))
+        slope = sxy / sxx if sxx > 0 else 0.0
+        intercept = shift + mean_y - slope * (t0 + mean_t)
+
+        return {
+            "trend": "increasing" if slope > 0 else "decreasing",
+            "slope": float(slope),
+            "intercept": float(intercept),
+            "r_squared": float(sxy * sxy / (sxx * syy)) if sxx > 0 and syy > 0 else 0.0
+        }
+
+    @staticmethod
+    @traced("analysis")
+    def detect_anomalies(df: pd.DataFrame, column: str, threshold: float = 3.0) -> List[int]:
+        """Detect anomalies using z-score method"""
+        x, _ = as_shifted_float32(df[column])
+        valid = x[~np.isnan(x)]
+        moments = central_moments(valid)
+        if not moments["n"] or not moments["m2"] > 0:
+            return []
+        std = np.sqrt(moments["m2"] / moments["n"])  # Population std, as scipy.stats.zscore
+        z = np.abs(valid - np.float32(moments["mean"]))
+        return np.flatnonzero(z > np.float32(threshold * std)).tolist()
+
@@ -0,0 +1,454 @@
+import math
+import os
+import re
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+from config import Config
+from tools.frame_snapshot import FrameSnapshot
+from tools.rollup_cube import detect_date_column
+
+# Nanoseconds per unit of work, calibrated on the sample and synthetic datasets
+_EXACT_NS = {
+    "null_numeric": 2,      # per value, isnull().sum()
+    "null_object": 20,
+    "memory_object": 50,    # per value, memory_usage(deep=True)
+    "describe": 130,        # per numeric value, describe() plus descriptive_statistics
+    "correlation": 5,       # per row x numeric column pair
+    "index_build": 5,       # per n log2 n
+    "index_scan": 50,       # per row, trend and growth over a cached time index
+    "group": 80,            # per row
+    "anomaly": 15,          # per row
+    "segment_block": 25,    # per row x metric, building the shifted value block
+    "segments": 6,          # per row x dimension x metric
+    "distribution": 40,     # per numeric value, histogram, sketch and moments
+    "factorize": 60,        # per value of an object column
+    "cube_build": 115,      # per row x dimension x metric
+    "cube_cell": 20,        # per cell read
+    "sample": 100,          # per sampled row
+    "line": 40,             # per plotted point
+    "bar": 650_000,         # per bar
+    "heatmap_cell": 1_500_000,  # per annotated seaborn cell
+    "heatmap_image": 1_000,     # per imshow cell of a wide matrix
+}
+# Single-core cost of the partitioned executor, per row (per value for summary)
+_PARTITIONED_NS = {"summary": 65, "correlation": 7.5, "trend": 100, "group": 110, "anomaly": 25}
+_FIXED_MS = {"exact": 0.5, "rollup": 0.2, "partitioned": 20.0, "sampled": 1.0, "viz": 40.0, "heatmap": 400.0}
+# Per-call overhead of the pandas/sklearn implementations (per numeric column for summary)
+_TASK_FIXED_MS = {"summary": 2.5, "correlation": 1.0, "trend": 2.0, "group": 1.5, "anomaly": 0.5,
+                  "segments": 2.0, "distribution": 1.0}
+
+_DETAIL_WORDS = ["summary", "summarize", "describe", "statistics", "stats", "overview", "profile"]
+_GROUP_WORDS = ["group", "by", "category", "segment"]
+_ANOMALY_WORDS = ["anomal", "outlier", "unusual"]
+_DISTRIBUTION_WORDS = ["distribution", "histogram", "spread", "percentile", "quantile", "skew"]
+_SEGMENT_WORDS = ["segment", "insight", "driver", "interesting", "compare", "performance"]
+
+
+def _mentioned(query_lower: str, columns: List) -> Optional[Any]:
+    """First column whose name appears as a word in the query"""
+    for col in columns:
+        name = str(col).lower()
+        for candidate in {name, name.replace('_', ' ')}:
+            if re.search(rf"\b{re.escape(candidate)}\b", query_lower):
+                return col
+    return None
+
+
+class DatasetStatistics:
+    """Row count, cardinalities and footprint of a frame, computed once for planning"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.rows = len(df)
+        self.columns = len(df.columns)
+        self.numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        self.categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        self.object_cols = df.select_dtypes(include=['object']).columns.tolist()
+        self.date_col = detect_date_column(df)
+
+        self.cardinalities = {}
+        for col in self.categorical_cols:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self.cardinalities[col] = len(series.cat.categories)
+            else:
+                self.cardinalities[col] = int(series.nunique())
+
+        # Object columns are sized from a prefix instead of a full deep scan
+        memory = df.memory_usage(deep=False)
+        self.memory_bytes = int(memory.sum())
+        for col in self.object_cols:
+            head = df[col].head(1000)
+            if len(head):
+                per_value = head.memory_usage(deep=True, index=False) / len(head)
+                self.memory_bytes += int((per_value - 8) * self.rows)
+
+        self.days = 0
+        if self.date_col is not None and self.rows:
+            dates = pd.to_datetime(df[self.date_col])
+            if dates.notna().any():
+                self.days = int((dates.max() - dates.min()).days) + 1
+
+    def cube_cells(self) -> Dict[str, int]:
+        """Upper bound on the occupied day x category cells of each rollup dimension"""
+        slots = self.days + 1
+        return {col: min(self.rows, slots * max(self.cardinalities[col], 1))
+                for col in self.categorical_cols if col != self.date_col}
+
+    def cube_is_compact(self) -> bool:
+        """Whether a rollup cube is bound to have well under one cell per row"""
+        return self.days + sum(self.cube_cells().values()) <= self.rows / 4
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "columns": self.columns,
+            "numeric_columns": len(self.numeric_cols),
+            "cardinalities": self.cardinalities,
+            "date_column": self.date_col,
+            "days": self.days,
+            "memory_mb": round(self.memory_bytes / 1024**2, 2)
+        }
+
+
+class QueryPlanner:
+    """Cost-based planner for orchestrator queries.
+
+    Queries are matched to tasks by keyword as before, but columns named in
+    the query are preferred, tasks whose output nothing reads are skipped or
+    downgraded, and each DataAnalyst task is costed against every strategy
+    available for it (exact, rollup, partitioned, sampled) using cached
+    dataset statistics. The cheapest exact strategy wins; sampling is only
+    used when that would exceed Config.PLANNER_TASK_BUDGET_MS.
+    """
+
+    def __init__(self, data_analyst):
+        self.data_analyst = data_analyst
+        self._statistics: Dict[int, Tuple[FrameSnapshot, DatasetStatistics]] = {}
+
+    def statistics(self, df: pd.DataFrame) -> DatasetStatistics:
+        """Dataset statistics, computed once per frame and again when its columns change"""
+        key = id(df)
+        entry = self._statistics.get(key)
+        if entry is not None and entry[0].matches(df):
+            return entry[1]
+        stats = DatasetStatistics(df)
+        if entry is None:
+            weakref.finalize(df, self._statistics.pop, key, None)
+        self._statistics[key] = (FrameSnapshot(df), stats)
+        return stats
+
+    def plan(self, query: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Build and cost the task list for a query"""
+        stats = self.statistics(df)
+        tasks, skipped = self._build_tasks(query.lower(), stats)
+
+        # A cube build is shared by every task in the plan that can read from it
+        cube_tasks = sum(1 for task in tasks if task["agent"] == "DataAnalyst"
+                         and self._rollup_cost(task["analysis_type"], task.get("params", {}), df, stats))
+        for task in tasks:
+            self._cost(task, df, stats, max(cube_tasks, 1))
+
+        return {
+            "description": f"Execute {len(tasks)} analysis tasks",
+            "tasks": tasks,
+            "skipped": skipped,
+            "statistics": stats.to_dict(),
+            "estimated_ms": round(sum(task["estimated_ms"] for task in tasks), 2)
+        }
+
+    def _build_tasks(self, query_lower: str, stats: DatasetStatistics) -> Tuple[List[Dict], List[Dict]]:
+        tasks, skipped = [], []
+        numeric_cols = stats.numeric_cols
+        value_col = _mentioned(query_lower, numeric_cols) or (numeric_cols[0] if numeric_cols else None)
+
+        # Insights and recommendations only read the shape and missing values
+        detailed = any(word in query_lower for word in _DETAIL_WORDS)
+        tasks.append({
+            "agent": "DataAnalyst",
+            "action": "Generate data summary",
+            "analysis_type": "summary",
+            "params": {"detailed": detailed}
+        })
+
+        if any(word in query_lower for word in ["trend", "time", "over time", "growth"]):
+            if stats.date_col is not None and value_col is not None:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Analyze trends",
+                    "analysis_type": "trend",
+                    "params": {"date_col": stats.date_col, "value_col": value_col}
+                })
+                tasks.append({
+                    "agent": "Visualizer",
+                    "action": "Create trend visualization",
+                    "viz_type": "line",
+                    "params": {
+                        "x_col": stats.date_col,
+                        "y_col": value_col,
+                        "title": f"{value_col} Trend Over Time"
+                    }
+                })
+
+        if any(word in query_lower for word in ["correlation", "relationship", "related"]):
+            if len(numeric_cols) >= 2:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Analyze correlations",
+                    "analysis_type": "correlation"
+                })
+                tasks.append({
+                    "agent": "Visualizer",
+                    "action": "Create correlation heatmap",
+                    "viz_type": "heatmap",
+                    "source": "correlation",
+                    "params": {"title": "Correlation Matrix"}
+                })
+            else:
+                skipped.append({"task": "DataAnalyst.correlation",
+                                "reason": "fewer than two numeric columns"})
+
+        if any(word in query_lower for word in _GROUP_WORDS):
+            categorical_cols = stats.categorical_cols
+            group_col = _mentioned(query_lower, categorical_cols) or (categorical_cols[0] if categorical_cols else None)
+
+            if group_col is not None and value_col is not None:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Analyze by groups",
+                    "analysis_type": "group",
+                    "params": {"group_col": group_col, "value_col": value_col}
+                })
+                # Chart the group means the analysis produces instead of the raw rows
+                tasks.append({
+                    "agent": "Visualizer",
+                    "action": "Create group comparison",
+                    "viz_type": "bar",
+                    "source": "group",
+                    "params": {
+                        "x_col": group_col,
+                        "y_col": value_col,
+                        "title": f"{value_col} by {group_col}"
+                    }
+                })
+
+        if any(word in query_lower for word in _ANOMALY_WORDS):
+            if value_col is not None:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Detect anomalies",
+                    "analysis_type": "anomaly",
+                    "params": {"column": value_col}
+                })
+
+        if any(word in query_lower for word in _DISTRIBUTION_WORDS):
+            if value_col is not None:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Profile distributions",
+                    "analysis_type": "distribution"
+                })
+                # Plot the bin counts the analysis produces instead of re-binning the rows
+                tasks.append({
+                    "agent": "Visualizer",
+                    "action": "Create distribution histogram",
+                    "viz_type": "histogram",
+                    "source": "distribution",
+                    "params": {"column": value_col, "title": f"{value_col} Distribution"}
+                })
+
+        # If no specific intent, do comprehensive analysis
+        comprehensive = len(tasks) == 1
+        if comprehensive:
+            tasks[0]["params"]["detailed"] = True
+            if len(numeric_cols) >= 2:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Analyze correlations",
+                    "analysis_type": "correlation"
+                })
+        
+        # Look past the first group/metric pair whenever segments matter to the answer
+        segment_intent = any(word in query_lower for word in _GROUP_WORDS + _ANOMALY_WORDS + _SEGMENT_WORDS)
+        if (segment_intent or comprehensive) and numeric_cols:
+            if [col for col in stats.categorical_cols if col != stats.date_col]:
+                tasks.append({
+                    "agent": "DataAnalyst",
+                    "action": "Scan all segments",
+                    "analysis_type": "segments"
+                })
+
+        # Only the last visualization reaches the response
+        viz_tasks = [task for task in tasks if task["agent"] == "Visualizer"]
+        for task in viz_tasks[:-1]:
+            tasks.remove(task)
+            skipped.append({"task": f"Visualizer.{task['viz_type']}",
+                            "reason": "result replaced by a later visualization"})
+
+        return tasks, skipped
+
+    def _cost(self, task: Dict[str, Any], df: pd.DataFrame, stats: DatasetStatistics, cube_tasks: int = 1):
+        """Attach the chosen strategy, its estimated cost and the alternatives to a task"""
+        if task["agent"] == "Visualizer":
+            task["strategy"] = "exact"
+            task["estimated_ms"] = round(self._viz_ms(task, stats), 2)
+            task["candidates"] = {"exact": task["estimated_ms"]}
+            return
+
+        candidates, selection = self._candidates(task, df, stats, cube_tasks)
+        exact_results = {name: ms for name, ms in selection.items() if name != "sampled"}
+        strategy = min(exact_results, key=exact_results.get)
+        reason = "cheapest exact strategy" if len(exact_results) > 1 else None
+
+        if "sampled" in selection and exact_results[strategy] > Config.PLANNER_TASK_BUDGET_MS:
+            strategy = "sampled"
+            reason = f"exact estimate exceeds {Config.PLANNER_TASK_BUDGET_MS} ms budget"
+        if task["analysis_type"] == "summary" and not task["params"]["detailed"]:
+            reason = "basic summary, detailed statistics are not used by this query"
+
+        task["strategy"] = strategy
+        task["estimated_ms"] = round(candidates[strategy], 2)
+        task["candidates"] = {name: round(ms, 2) for name, ms in candidates.items()}
+        task["reason"] = reason
+
+    def _candidates(self, task: Dict[str, Any], df: pd.DataFrame, stats: DatasetStatistics,
+                    cube_tasks: int = 1) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Estimated milliseconds per strategy, and the (amortized) costs used to choose"""
+        analysis_type = task["analysis_type"]
+        params = task.get("params", {})
+        n = stats.rows
+        ns = _EXACT_NS
+        log_n = math.log2(max(n, 2))
+
+        if analysis_type == "summary":
+            numeric = len(stats.numeric_cols)
+            objects = len(stats.object_cols)
+            basic = n * ((stats.columns - objects) * ns["null_numeric"] + objects * ns["null_object"])
+            if not params.get("detailed"):
+                return {"exact": _FIXED_MS["exact"] + basic / 1e6}, {"exact": 0.0}
+            exact = basic + n * (numeric * ns["describe"] + objects * ns["memory_object"])
+            work = {"exact": exact}
+        elif analysis_type == "correlation":
+            work = {"exact": n * len(stats.numeric_cols) ** 2 * ns["correlation"]}
+        elif analysis_type == "trend":
+            index_cached = self.data_analyst.time_indexes.peek(df, params["date_col"]) is not None
+            build = 0 if index_cached else n * log_n * ns["index_build"]
+            work = {"exact": build + n * ns["index_scan"]}
+        elif analysis_type == "group":
+            work = {"exact": n * ns["group"]}
+        elif analysis_type == "segments":
+            dimensions = [col for col in stats.categorical_cols if col != stats.date_col]
+            objects = [col for col in dimensions if col in stats.object_cols]
+            metrics = len(stats.numeric_cols)
+            work = {"exact": n * (metrics * (ns["segment_block"] + len(dimensions) * ns["segments"])
+                                  + len(objects) * ns["factorize"])}
+        elif analysis_type == "distribution":
+            work = {"exact": n * len(stats.numeric_cols) * ns["distribution"]}
+        else:
+            work = {"exact": n * ns["anomaly"]}
+
+        overhead = _TASK_FIXED_MS[analysis_type]
+        if analysis_type == "summary":
+            overhead *= len(stats.numeric_cols)
+        candidates = {"exact": _FIXED_MS["exact"] + overhead + work["exact"] / 1e6}
+        selection = dict(candidates)
+
+        rollup = self._rollup_cost(analysis_type, params, df, stats)
+        if rollup is not None:
+            query_ms, build_ms = rollup
+            candidates["rollup"] = _FIXED_MS["rollup"] + query_ms + build_ms
+            selection["rollup"] = _FIXED_MS["rollup"] + query_ms + build_ms / cube_tasks
+
+        executor = self.data_analyst.executor
+        partitions = 0
+        if executor is not None:
+            partitions = min(executor.workers * 2, n // max(executor.min_partition_rows, 1))
+        # A single partition runs in-process and only adds the copy into shared memory
+        if partitions > 1 and analysis_type in _PARTITIONED_NS:
+            parallelism = min(executor.workers, os.cpu_count() or 1, partitions)
+            unit = _PARTITIONED_NS[analysis_type]
+            if analysis_type == "summary":
+                per_row = unit * len(stats.numeric_cols)
+            elif analysis_type == "correlation":
+                per_row = unit * len(stats.numeric_cols) ** 2
+            else:
+                per_row = unit
+            candidates["partitioned"] = selection["partitioned"] = (
+                _FIXED_MS["partitioned"] + n * per_row / parallelism / 1e6)
+
+        sample_rows = Config.PLANNER_SAMPLE_ROWS
+        if analysis_type in ("summary", "correlation", "segments", "distribution") and n > 2 * sample_rows:
+            scale = sample_rows / n
+            if analysis_type == "summary":
+                sampled = basic + (exact - basic) * scale
+            else:
+                sampled = work["exact"] * scale
+            sampled += sample_rows * ns["sample"]
+            candidates["sampled"] = selection["sampled"] = _FIXED_MS["sampled"] + overhead + sampled / 1e6
+
+        return candidates, selection
+
+    def _rollup_cost(self, analysis_type: str, params: Dict[str, Any], df: pd.DataFrame,
+                     stats: DatasetStatistics) -> Optional[Tuple[float, float]]:
+        """(query ms, build ms) when a rollup cube could answer the task"""
+        if self.data_analyst.cubes is None or analysis_type not in ("trend", "group"):
+            return None
+        if params["value_col"] not in stats.numeric_cols:
+            return None
+        if analysis_type == "trend" and params["date_col"] != stats.date_col:
+            return None
+
+        dimensions = [col for col in stats.categorical_cols if col != stats.date_col]
+        if analysis_type == "group" and params["group_col"] not in dimensions:
+            return None
+
+        if not stats.cube_is_compact():
+            return None
+
+        read = stats.days if analysis_type == "trend" else stats.cube_cells()[params["group_col"]]
+        query_ms = read * _EXACT_NS["cube_cell"] / 1e6
+        cube = self.data_analyst.cubes.peek(df)
+        if cube is not None:
+            return query_ms, 0.0
+        build = stats.rows * max(len(dimensions), 1) * len(stats.numeric_cols) * _EXACT_NS["cube_build"]
+        return query_ms, build / 1e6
+
+    def _viz_ms(self, task: Dict[str, Any], stats: DatasetStatistics) -> float:
+        if task["viz_type"] == "line":
+            return _FIXED_MS["viz"] + stats.rows * _EXACT_NS["line"] / 1e6
+        if task["viz_type"] == "bar":
+            if task.get("source") == "group":
+                bars = stats.cardinalities.get(task["params"]["x_col"], stats.rows)
+            else:
+                bars = stats.rows
+            return _FIXED_MS["viz"] + bars * _EXACT_NS["bar"] / 1e6
+        if task["viz_type"] == "heatmap":
+            cells = len(stats.numeric_cols) ** 2
+            if len(stats.numeric_cols) <= Config.HEATMAP_DETAIL_MAX_COLS:
+                return _FIXED_MS["viz"] + cells * _EXACT_NS["heatmap_cell"] / 1e6
+            return _FIXED_MS["heatmap"] + cells * _EXACT_NS["heatmap_image"] / 1e6
+        return _FIXED_MS["viz"]
+
+    @staticmethod
+    def explain(plan: Dict[str, Any]) -> str:
+        """Text table of each task's strategy with estimated and actual cost"""
+        stats = plan["statistics"]
+        lines = [
+            f"Plan: {stats['rows']:,} rows x {stats['columns']} columns, {stats['memory_mb']} MB",
+            f"  {'task':<28} {'strategy':<12} {'est ms':>10} {'actual ms':>10}  alternatives",
+        ]
+        actual_total = 0.0
+        for task in plan["tasks"]:
+            name = f"{task['agent']}.{task.get('analysis_type') or task.get('viz_type')}"
+            actual = task.get("actual_ms")
+            actual_total += actual or 0.0
+            alternatives = ", ".join(f"{k}={v:g}" for k, v in task["candidates"].items()
+                                     if k != task["strategy"])
+            lines.append(f"  {name:<28} {task['strategy']:<12} {task['estimated_ms']:>10.1f} "
+                         f"{actual if actual is not None else float('nan'):>10.1f}  {alternatives}")
+            if task.get("reason"):
+                lines.append(f"  {'':<28} {task['reason']}")
+        for skipped in plan.get("skipped", []):
+            lines.append(f"  {skipped['task']:<28} {'skipped':<12} {skipped['reason']}")
+        lines.append(f"  {'total':<28} {'':<12} {plan['estimated_ms']:>10.1f} {actual_total:>10.1f}")
+        return "\n".join(lines)
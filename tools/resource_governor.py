@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+from typing import Dict, Any, Optional
+from config import Config
+from tools.segment_scan import SegmentScanner
+from tools.distribution import DistributionProfiler
+
+_MB = 1024 * 1024
+
+# Transient 8-byte values per row each analysis allocates, measured with tracemalloc
+_COPIES_PER_ROW = {
+    "trend": 5,        # seconds, values in time order and the regression's centred copies
+    "index_build": 4,  # parsed dates, argsort scratch, order and sorted values
+    "group": 4,        # group codes, sorted values and the median scratch
+    "anomaly": 5,      # dropna copy, z-score intermediates and their absolute values
+}
+# Building a rollup cube: date keys and day order, plus per metric and per dimension copies
+_CUBE_BUILD_COPIES = {"base": 7, "metric": 5, "dimension": 8}
+_LINE_BYTES_PER_POINT = 100  # matplotlib keeps x/y copies, the path and its transform
+_BAR_BYTES = 5 * 1024
+
+
+def process_memory() -> Optional[int]:
+    """Resident set size of this process in bytes, if the platform reports it"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS, which only makes the check more conservative
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def physical_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class QueryBudget:
+    """Time and memory a single query has used so far"""
+
+    def __init__(self, timeout_s: float):
+        self.started = time.perf_counter()
+        self.timeout_ms = timeout_s * 1000
+        self.start_memory = process_memory()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def remaining_ms(self) -> float:
+        return self.timeout_ms - self.elapsed_ms
+
+    def memory_used(self) -> int:
+        """How much the process has grown since the query started"""
+        current = process_memory()
+        if current is None or self.start_memory is None:
+            return 0
+        return max(current - self.start_memory, 0)
+
+
+class ResourceGovernor:
+    """Admits, degrades or rejects each planned task before it runs.
+
+    Each task's peak transient memory is estimated from the dataset statistics
+    for every strategy the planner costed, alongside the planner's time
+    estimate. A strategy fits when its memory fits in both what is left of the
+    per-query budget and the headroom under the process ceiling, and its time
+    fits in what is left of Config.AGENT_TIMEOUT. The planned strategy runs if
+    it fits; otherwise the cheapest fitting alternative does (exact strategies
+    such as partitioned execution before sampling), and the task is rejected
+    when nothing fits.
+    """
+
+    def __init__(self, query_memory_mb: float = Config.GOVERNOR_QUERY_MEMORY_MB,
+                 process_memory_mb: Optional[float] = Config.GOVERNOR_PROCESS_MEMORY_MB,
+                 timeout_s: float = Config.AGENT_TIMEOUT):
+        self.query_memory = int(query_memory_mb * _MB)
+        if process_memory_mb is None:
+            physical = physical_memory()
+            self.process_memory = int(physical * 0.75) if physical else None
+        else:
+            self.process_memory = int(process_memory_mb * _MB)
+        self.timeout_s = timeout_s
+
+    def start_query(self) -> QueryBudget:
+        return QueryBudget(self.timeout_s)
+
+    def memory_limit(self, budget: QueryBudget) -> int:
+        """Bytes the next task may allocate"""
+        limit = self.query_memory - budget.memory_used()
+        current = process_memory()
+        if self.process_memory is not None and current is not None:
+            limit = min(limit, self.process_memory - current)
+        return max(limit, 0)
+
+    def admit(self, task: Dict[str, Any], stats, budget: QueryBudget, index_cached: bool = True,
+              cube_cached: bool = True) -> bool:
+        """Choose a strategy that fits the remaining budget; False if the task must be skipped"""
+        memory_limit = self.memory_limit(budget)
+        time_limit = budget.remaining_ms
+        planned = task["strategy"]
+
+        candidates = dict(task.get("candidates", {planned: task.get("estimated_ms", 0.0)}))
+        if task["agent"] == "Visualizer" and task["viz_type"] == "line" \
+                and stats.rows > Config.PLANNER_SAMPLE_ROWS:
+            # Plotting a sample of the points is the only degraded chart
+            candidates["sampled"] = candidates[planned] * Config.PLANNER_SAMPLE_ROWS / stats.rows
+
+        footprints = {name: self.estimate_bytes(task, name, stats, index_cached, cube_cached)
+                      for name in candidates}
+        fits = [name for name in candidates
+                if footprints[name] <= memory_limit and candidates[name] <= time_limit]
+
+        if planned in fits:
+            strategy, action = planned, "run"
+        elif fits:
+            # Prefer an exact result, then the fastest
+            strategy = min(fits, key=lambda name: (name == "sampled", candidates[name]))
+            action = "degraded"
+        else:
+            strategy, action = planned, "rejected"
+
+        over = []
+        if footprints[planned] > memory_limit:
+            over.append(f"needs ~{footprints[planned] / _MB:.0f} MB of {memory_limit / _MB:.0f} MB available")
+        if candidates[planned] > time_limit:
+            over.append(f"estimated {candidates[planned]:.0f} ms exceeds {max(time_limit, 0):.0f} ms left")
+
+        task["governor"] = {
+            "action": action,
+            "estimated_mb": round(footprints[strategy] / _MB, 2),
+            "memory_limit_mb": round(memory_limit / _MB, 2)
+        }
+        if action != "run":
+            task["governor"]["reason"] = f"{planned} {', '.join(over)}"
+        if action == "degraded":
+            task["strategy"] = strategy
+            task["estimated_ms"] = round(candidates[strategy], 2)
+            task["reason"] = f"governor: {task['governor']['reason']}, using {strategy}"
+        return action != "rejected"
+
+    def estimate_bytes(self, task: Dict[str, Any], strategy: str, stats,
+                       index_cached: bool = True, cube_cached: bool = True) -> int:
+        """Peak transient memory of a task under a strategy, from the dataset's shape.
+
+        A rollup task reads a built cube for free, but the first one in a plan
+        pays for building it unless cube_cached says it already exists.
+        """
+        rows = stats.rows
+        sample = 0
+        if strategy == "sampled":
+            rows = min(rows, Config.PLANNER_SAMPLE_ROWS)
+            sample = int(stats.memory_bytes / max(stats.rows, 1) * rows)  # The sampled frame itself
+
+        if task["agent"] == "Visualizer":
+            return sample + self._viz_bytes(task, stats, rows)
+
+        analysis_type = task["analysis_type"]
+        params = task.get("params", {})
+        numeric = len(stats.numeric_cols)
+
+        if strategy == "rollup":
+            return 0 if cube_cached else self._cube_build_bytes(stats)
+        if strategy == "partitioned":
+            # The parent copies the columns into shared memory once; workers map them
+            return rows * max(numeric, 1) * 8
+
+        if analysis_type == "summary":
+            footprint = rows * stats.columns  # isnull() mask
+            if params.get("detailed"):
+                footprint += rows * numeric * 8 + rows * 8 * 2  # describe() copy and a quantile sort
+        elif analysis_type == "correlation":
+            footprint = rows * numeric * 9  # float64 matrix plus its validity mask
+        elif analysis_type == "trend":
+            copies = _COPIES_PER_ROW["trend"] + (0 if index_cached else _COPIES_PER_ROW["index_build"])
+            footprint = rows * copies * 8
+        elif analysis_type == "segments":
+            dimensions = len([col for col in stats.categorical_cols if col != stats.date_col])
+            footprint = (rows * (numeric + dimensions) * 8
+                         + min(rows, SegmentScanner.CHUNK_ROWS) * 3 * numeric * 8)
+        elif analysis_type == "distribution":
+            footprint = rows * 8 + min(rows, DistributionProfiler.CHUNK_ROWS) * 8 * 4
+        else:
+            footprint = rows * _COPIES_PER_ROW.get(analysis_type, 4) * 8
+        return sample + footprint
+
+    @staticmethod
+    def _cube_build_bytes(stats) -> int:
+        dimensions = len([col for col in stats.categorical_cols if col != stats.date_col])
+        copies = (_CUBE_BUILD_COPIES["base"] + _CUBE_BUILD_COPIES["metric"] * len(stats.numeric_cols)
+                  + _CUBE_BUILD_COPIES["dimension"] * dimensions)
+        return stats.rows * copies * 8
+
+    def _viz_bytes(self, task: Dict[str, Any], stats, rows: int) -> int:
+        viz_type = task["viz_type"]
+        if viz_type == "line":
+            return rows * _LINE_BYTES_PER_POINT
+        if viz_type == "bar":
+            bars = rows
+            if task.get("source") == "group":
+                bars = stats.cardinalities.get(task["params"]["x_col"], rows)
+            return bars * _BAR_BYTES
+        if viz_type == "heatmap":
+            return len(stats.numeric_cols) ** 2 * 8 * 4
+        return 0
@@ -0,0 +1,296 @@
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from tools.frame_snapshot import FrameSnapshot
+from tools.tracer import traced
+
+SECONDS_PER_DAY = 86400
+
+
+def detect_date_column(df: pd.DataFrame) -> Optional[str]:
+    """First datetime column, or the first column named like a date"""
+    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    if not date_cols:
+        date_cols = [col for col in df.columns if 'date' in str(col).lower()]
+    return date_cols[0] if date_cols else None
+
+
+def _cell_index(keys: np.ndarray, size: int):
+    """Compress dense cell keys to the cells that actually occur"""
+    if size <= max(len(keys) * 4, 1 << 20):
+        present = np.bincount(keys, minlength=size) > 0
+        cells = np.flatnonzero(present)
+        lookup = np.full(size, -1, dtype=np.int64)
+        lookup[cells] = np.arange(len(cells))
+        return cells, lookup[keys]
+    return np.unique(keys, return_inverse=True)
+
+
+def _cell_stats(inverse: np.ndarray, values: np.ndarray, shift: float, num_cells: int) -> Dict[str, np.ndarray]:
+    """count, shifted sum and sum of squares, min and max per cell"""
+    valid = ~np.isnan(values)
+    cell = inverse[valid]
+    x = values[valid]
+    shifted = x - shift
+    mins = np.full(num_cells, np.inf)
+    maxs = np.full(num_cells, -np.inf)
+    np.minimum.at(mins, cell, x)
+    np.maximum.at(maxs, cell, x)
+    return {
+        "count": np.bincount(cell, minlength=num_cells).astype(np.int32),
+        "sum": np.bincount(cell, weights=shifted, minlength=num_cells),
+        "sumsq": np.bincount(cell, weights=shifted * shifted, minlength=num_cells),
+        "min": mins,
+        "max": maxs
+    }
+
+
+class RollupCube:
+    """Materialized day x dimension aggregates for trend, group and growth queries.
+
+    For every categorical dimension the cube keeps one cell per occupied
+    (day, category) pair with count, sum, sum of squares, min and max of each
+    metric (sums are shifted by the metric mean to keep variances accurate).
+    The day rollup also keeps within-day time sums so trend regressions stay
+    exact for timestamps that are not at midnight, and the first/last row of
+    each day for growth rates. Group medians cannot be rolled up, so the exact
+    per-category medians are computed once at build time.
+    """
+
+    def __init__(self, date_col: Optional[str], day_origin: int, num_days: int,
+                 metrics: List[str], shifts: Dict[str, float], metric_dtypes: Dict[str, np.dtype],
+                 days: Dict[str, Any], dimensions: Dict[str, Dict[str, Any]], num_rows: int):
+        self.date_col = date_col
+        self.day_origin = day_origin
+        self.num_days = num_days
+        self.metrics = metrics
+        self.shifts = shifts
+        self.metric_dtypes = metric_dtypes
+        self.days = days
+        self.dimensions = dimensions
+        self.num_rows = num_rows
+
+    @classmethod
+    @traced("rollup")
+    def build(cls, df: pd.DataFrame, date_col: Optional[str] = None,
+              dimensions: Optional[List[str]] = None, metrics: Optional[List[str]] = None) -> "RollupCube":
+        """Aggregate a DataFrame into the cube in a few vectorized passes"""
+        date_col = date_col if date_col is not None else detect_date_column(df)
+        if dimensions is None:
+            dimensions = df.select_dtypes(include=['object', 'category']).columns.tolist()
+            dimensions = [col for col in dimensions if col != date_col]
+        if metrics is None:
+            metrics = df.select_dtypes(include=['number']).columns.tolist()
+
+        n = len(df)
+        positions = np.arange(n)
+
+        if date_col is not None:
+            ns = pd.to_datetime(df[date_col]).to_numpy(dtype='datetime64[ns]').view(np.int64)
+            dated = ns != np.iinfo(np.int64).min
+            seconds = ns // 10**9
+            day = seconds // SECONDS_PER_DAY
+            day_origin = int(day[dated].min()) if dated.any() else 0
+            num_days = int(day[dated].max()) - day_origin + 1 if dated.any() else 0
+            # Undated rows go to an overflow slot that only the group rollups see
+            day_index = np.where(dated, day - day_origin, num_days)
+            second_of_day = np.where(dated, seconds - day * SECONDS_PER_DAY, 0).astype(np.float64)
+        else:
+            dated = np.zeros(n, dtype=bool)
+            day_origin, num_days = 0, 0
+            day_index = np.zeros(n, dtype=np.int64)
+            second_of_day = np.zeros(n)
+
+        values = {m: df[m].to_numpy(dtype=np.float64, na_value=np.nan) for m in metrics}
+        shifts = {m: float(np.nan_to_num(np.nanmean(values[m]))) if n else 0.0 for m in metrics}
+        metric_dtypes = {m: df[m].dtype for m in metrics}
+
+        # Day rollup: regression time sums plus the first and last row of each day
+        days: Dict[str, Any] = {"metrics": {}}
+        if date_col is not None and num_days:
+            order = positions[dated][np.argsort(ns[dated], kind='stable')]
+            ordered_days = day_index[order]
+            first_rows = np.full(num_days, -1, dtype=np.int64)
+            last_rows = np.full(num_days, -1, dtype=np.int64)
+            first_rows[ordered_days[::-1]] = order[::-1]
+            last_rows[ordered_days] = order
+            days["has_rows"] = first_rows >= 0
+
+            for m in metrics:
+                v = values[m]
+                valid = dated & ~np.isnan(v)
+                d = day_index[valid]
+                s = second_of_day[valid]
+                y = v[valid] - shifts[m]
+                days["metrics"][m] = {
+                    "count": np.bincount(d, minlength=num_days).astype(np.int32),
+                    "sum": np.bincount(d, weights=y, minlength=num_days),
+                    "sumsq": np.bincount(d, weights=y * y, minlength=num_days),
+                    "sum_s": np.bincount(d, weights=s, minlength=num_days),
+                    "sum_ss": np.bincount(d, weights=s * s, minlength=num_days),
+                    "sum_sy": np.bincount(d, weights=s * y, minlength=num_days),
+                    "first": np.where(first_rows >= 0, v[np.maximum(first_rows, 0)], np.nan),
+                    "last": np.where(last_rows >= 0, v[np.maximum(last_rows, 0)], np.nan)
+                }
+
+        # Day x dimension rollups
+        cube_dims: Dict[str, Dict[str, Any]] = {}
+        slots = num_days + 1
+        for dim in dimensions:
+            codes, categories = pd.factorize(df[dim], sort=True)
+            if isinstance(df[dim].dtype, pd.CategoricalDtype):
+                categories = df[dim].cat.categories
+                codes = df[dim].cat.codes.to_numpy()
+            has_group = codes >= 0
+            keys = day_index[has_group].astype(np.int64) * len(categories) + codes[has_group]
+            cells, inverse = _cell_index(keys, slots * max(len(categories), 1))
+
+            stats = {}
+            medians = {}
+            for m in metrics:
+                stats[m] = _cell_stats(inverse, values[m][has_group], shifts[m], len(cells))
+                medians[m] = (pd.Series(values[m][has_group]).groupby(codes[has_group]).median()
+                              .reindex(range(len(categories))).to_numpy())
+
+            cube_dims[dim] = {
+                "categories": categories,
+                "cell_day": (cells // max(len(categories), 1)).astype(np.int32),
+                "cell_code": (cells % max(len(categories), 1)).astype(np.int32),
+                "stats": stats,
+                "medians": medians
+            }
+
+        return cls(date_col, day_origin, num_days, metrics, shifts, metric_dtypes,
+                   days, cube_dims, n)
+
+    @property
+    def num_cells(self) -> int:
+        return sum(len(d["cell_day"]) for d in self.dimensions.values()) + self.num_days
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for m in self.days["metrics"].values():
+            total += sum(a.nbytes for a in m.values())
+        for d in self.dimensions.values():
+            total += d["cell_day"].nbytes + d["cell_code"].nbytes
+            for stats in d["stats"].values():
+                total += sum(a.nbytes for a in stats.values())
+        return total
+
+    def covers(self, value_col: str, date_col: Optional[str] = None,
+               group_col: Optional[str] = None) -> bool:
+        """Whether the cube can answer a query on these columns"""
+        if value_col not in self.metrics:
+            return False
+        if date_col is not None and (date_col != self.date_col or value_col not in self.days["metrics"]):
+            return False
+        if group_col is not None and group_col not in self.dimensions:
+            return False
+        return True
+
+    def trend_analysis(self, value_col: str) -> Dict[str, Any]:
+        """Exact least-squares trend from the day rollup"""
+        m = self.days["metrics"][value_col]
+        count = m["count"].astype(np.float64)
+        total = count.sum()
+        day_seconds = (self.day_origin + np.arange(self.num_days)) * float(SECONDS_PER_DAY)
+
+        mean_x = (count @ day_seconds + m["sum_s"].sum()) / total
+        mean_y = m["sum"].sum() / total
+        dx = day_seconds - mean_x
+        sxx = (count * dx * dx).sum() + 2 * (dx * m["sum_s"]).sum() + m["sum_ss"].sum()
+        sxy = (dx * (m["sum"] - count * mean_y)).sum() + (m["sum_sy"] - m["sum_s"] * mean_y).sum()
+        syy = m["sumsq"].sum() - total * mean_y * mean_y
+
+        slope = sxy / sxx if sxx > 0 else 0.0
+        if syy > 0:
+            r_squared = sxy * sxy / (sxx * syy) if sxx > 0 else 0.0
+        else:
+            r_squared = 1.0
+        return {
+            "trend": "increasing" if slope > 0 else "decreasing",
+            "slope": float(slope),
+            "intercept": float(mean_y + self.shifts[value_col] - slope * mean_x),
+            "r_squared": float(r_squared)
+        }
+
+    def calculate_growth_rate(self, value_col: str) -> Dict[str, float]:
+        """Growth between the first row of the first day and the last row of the last day"""
+        occupied = np.flatnonzero(self.days["has_rows"])
+        m = self.days["metrics"][value_col]
+        first_value = m["first"][occupied[0]]
+        last_value = m["last"][occupied[-1]]
+
+        total_growth = ((last_value - first_value) / first_value) * 100
+        return {
+            "total_growth_percent": round(float(total_growth), 2),
+            "first_value": float(first_value),
+            "last_value": float(last_value)
+        }
+
+    def group_analysis(self, group_col: str, value_col: str) -> pd.DataFrame:
+        """Group count/mean/median/std/min/max from the dimension cells"""
+        dim = self.dimensions[group_col]
+        stats = dim["stats"][value_col]
+        groups = len(dim["categories"])
+        code = dim["cell_code"]
+
+        count = np.bincount(code, weights=stats["count"], minlength=groups)
+        sums = np.bincount(code, weights=stats["sum"], minlength=groups)
+        sumsq = np.bincount(code, weights=stats["sumsq"], minlength=groups)
+        mins = np.full(groups, np.inf)
+        maxs = np.full(groups, -np.inf)
+        np.minimum.at(mins, code, stats["min"])
+        np.maximum.at(maxs, code, stats["max"])
+
+        empty = count == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.shifts[value_col] + sums / count
+            var = np.maximum(sumsq - sums * sums / count, 0.0) / (count - 1)
+        result = pd.DataFrame({
+            "count": count.astype(np.int64),
+            "mean": np.where(empty, np.nan, mean),
+            "median": dim["medians"][value_col],
+            "std": np.where(count > 1, np.sqrt(var), np.nan),
+            "min": np.where(empty, np.nan, mins),
+            "max": np.where(empty, np.nan, maxs)
+        }, index=pd.Index(dim["categories"], name=group_col))
+
+        dtype = self.metric_dtypes[value_col]
+        if dtype.kind in 'iu' and not empty.any():
+            result[["min", "max"]] = result[["min", "max"]].astype(dtype)
+        return result.round(2)
+
+
+class RollupCubeCache:
+    """Builds one cube per DataFrame and drops it when the frame is collected.
+
+    A cube is rebuilt when the frame's columns no longer match the ones it
+    was built from.
+    """
+
+    def __init__(self):
+        self._cubes: Dict[int, Tuple[FrameSnapshot, RollupCube]] = {}
+
+    def get(self, df: pd.DataFrame) -> RollupCube:
+        cube = self.peek(df)
+        if cube is None:
+            key = id(df)
+            cube = RollupCube.build(df)
+            if key not in self._cubes:
+                weakref.finalize(df, self._cubes.pop, key, None)
+            self._cubes[key] = (FrameSnapshot(df), cube)
+        return cube
+
+    def peek(self, df: pd.DataFrame) -> Optional[RollupCube]:
+        """The cube for a frame if one has been built from its current columns, without building it"""
+        entry = self._cubes.get(id(df))
+        return entry[1] if entry is not None and entry[0].matches(df) else None
+
+    def clear(self):
+        self._cubes.clear()
+
+    def __len__(self) -> int:
+        return len(self._cubes)
@@ -0,0 +1,153 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from config import Config
+from tools.rollup_cube import detect_date_column
+from tools.tracer import traced
+
+
+def factorize_columns(df: pd.DataFrame, columns: List) -> Dict[Any, Tuple[np.ndarray, pd.Index]]:
+    """Integer codes (-1 for missing) and categories for each column, reusing categorical codes"""
+    factorized = {}
+    for col in columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            factorized[col] = (series.cat.codes.to_numpy(), series.cat.categories)
+        else:
+            codes, categories = pd.factorize(series, sort=True)
+            factorized[col] = (codes, categories)
+    return factorized
+
+
+class SegmentScanner:
+    """Compares every categorical value x numeric column segment against the rest of the data.
+
+    Categorical columns are factorized once. Rows are then processed in
+    cache-sized chunks: the chunk's numeric columns are shifted by their means
+    into one matrix of [valid, value, value^2] columns, and each dimension's
+    one-hot indicator multiplies that matrix, giving the count, sum and sum of
+    squares of every segment for every metric in one sparse product. The scan
+    is linear in rows x dimensions x metrics with no pandas groupby. Segments
+    are tested against the remaining rows with a Welch z-score and ranked by
+    effect size (mean difference in overall standard deviations).
+    """
+
+    CHUNK_ROWS = 65536
+
+    def __init__(self, top_k: int = Config.SEGMENT_TOP_K, min_size: int = Config.SEGMENT_MIN_SIZE,
+                 min_z: float = Config.SEGMENT_MIN_Z, min_effect: float = Config.SEGMENT_MIN_EFFECT):
+        self.top_k = top_k
+        self.min_size = min_size
+        self.min_z = min_z
+        self.min_effect = min_effect
+
+    @traced("analysis")
+    def scan(self, df: pd.DataFrame, categorical_cols: Optional[List] = None,
+             numeric_cols: Optional[List] = None) -> Dict[str, Any]:
+        """Top-k segments by effect size among those that pass the size and significance filters"""
+        if categorical_cols is None:
+            date_col = detect_date_column(df)
+            categorical_cols = [col for col in df.select_dtypes(include=['object', 'category']).columns
+                                if col != date_col]
+        if numeric_cols is None:
+            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+
+        dimensions = factorize_columns(df, categorical_cols)
+        columns = [df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in numeric_cols]
+        m = len(columns)
+        if not dimensions or not m:
+            return self._result([], 0, categorical_cols, numeric_cols)
+
+        means = np.array([np.nanmean(v) if len(v) and not np.isnan(v).all() else 0.0 for v in columns])
+        totals = np.zeros(3 * m)
+        cells = {dim: np.zeros((len(categories), 3 * m)) for dim, (_, categories) in dimensions.items()}
+
+        for start in range(0, len(df), self.CHUNK_ROWS):
+            stop = min(start + self.CHUNK_ROWS, len(df))
+            rows = stop - start
+            block = np.empty((rows, 3 * m))
+            for i, values in enumerate(columns):
+                chunk = values[start:stop]
+                valid = ~np.isnan(chunk)
+                block[:, i] = valid
+                block[:, m + i] = np.where(valid, chunk - means[i], 0.0)
+            np.multiply(block[:, m:2 * m], block[:, m:2 * m], out=block[:, 2 * m:])
+            totals += block.sum(axis=0)
+
+            indptr = np.arange(rows + 1)
+            for dim, (codes, categories) in dimensions.items():
+                chunk_codes = codes[start:stop]
+                grouped = chunk_codes >= 0
+                indicator = sp.csc_matrix(
+                    (grouped.astype(np.float64), np.where(grouped, chunk_codes, 0).astype(np.int32), indptr),
+                    shape=(len(categories), rows))
+                cells[dim] += indicator @ block
+
+        found = []
+        total, total_sum, total_sumsq = totals[:m], totals[m:2 * m], totals[2 * m:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt((total_sumsq - total_sum * total_sum / total) / (total - 1))
+        usable = (total >= 2 * self.min_size) & (std > 0)
+
+        for dim, (_, categories) in dimensions.items():
+            count, sums, sumsq = cells[dim][:, :m], cells[dim][:, m:2 * m], cells[dim][:, 2 * m:]
+
+            # The rest of the data is every valid row outside the segment
+            rest_count = total - count
+            rest_sums = total_sum - sums
+            rest_sumsq = total_sumsq - sumsq
+            with np.errstate(divide='ignore', invalid='ignore'):
+                seg_mean = sums / count
+                rest_mean = rest_sums / rest_count
+                seg_var = (sumsq - sums * seg_mean) / (count - 1)
+                rest_var = (rest_sumsq - rest_sums * rest_mean) / (rest_count - 1)
+                diff = seg_mean - rest_mean
+                scale = np.sqrt(np.maximum(seg_var, 0) / count + np.maximum(rest_var, 0) / rest_count)
+                z = np.where(scale > 0, diff / scale, 0.0)
+                effect = diff / std
+
+            keep = (usable & (count >= self.min_size) & (rest_count >= self.min_size)
+                    & (np.abs(z) >= self.min_z) & (np.abs(effect) >= self.min_effect))
+            for segment, metric in zip(*np.nonzero(keep)):
+                found.append({
+                    "dimension": dim, "segment": categories[segment], "metric": numeric_cols[metric],
+                    "count": count[segment, metric], "rows": total[metric],
+                    "mean": seg_mean[segment, metric] + means[metric], "overall_mean": means[metric],
+                    "effect": effect[segment, metric], "z": z[segment, metric]
+                })
+
+        scanned = sum(len(categories) for _, categories in dimensions.values()) * m
+        return self._result(found, scanned, categorical_cols, numeric_cols)
+
+    def _result(self, found: List[Dict[str, Any]], scanned: int, categorical_cols: List,
+                numeric_cols: List) -> Dict[str, Any]:
+        return {
+            "segments": self._rank(found),
+            "segments_scanned": scanned,
+            "significant_segments": len(found),
+            "dimensions": [str(col) for col in categorical_cols],
+            "metrics": [str(col) for col in numeric_cols]
+        }
+
+    def _rank(self, found: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the top k candidates by |effect size|"""
+        top = sorted(found, key=lambda f: abs(f["effect"]), reverse=True)[:self.top_k]
+
+        segments = []
+        for f in top:
+            mean, overall = float(f["mean"]), float(f["overall_mean"])
+            segments.append({
+                "dimension": str(f["dimension"]),
+                "segment": str(f["segment"]),
+                "metric": str(f["metric"]),
+                "count": int(f["count"]),
+                "share_percent": round(float(f["count"] / f["rows"]) * 100, 2),
+                "mean": round(mean, 4),
+                "overall_mean": round(overall, 4),
+                "lift_percent": round((mean - overall) / abs(overall) * 100, 2) if overall else None,
+                "effect_size": round(float(f["effect"]), 3),
+                "z_score": round(float(f["z"]), 2),
+                "direction": "above" if mean > overall else "below"
+            })
+        return segments
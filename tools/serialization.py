@@ -0,0 +1,315 @@
+import base64
+import io
+import json
+import struct
+import zlib
+from typing import Dict, Any, BinaryIO, Iterator, List, Optional, Tuple, TypedDict
+import numpy as np
+import pandas as pd
+from tools.tracer import traced
+
+MAGIC = b"\x93AAR\x01"
+RECORDS_MAGIC = b"\x93AAS\x01"
+
+# Frame header after the magic: flags, structure length, buffer region length
+_HEADER = struct.Struct("<BIQ")
+_COMPRESSED = 1
+_LENGTH = struct.Struct("<Q")  # Prefix of each frame in a binary record log
+_ALIGN = 8  # Buffers start on 8-byte boundaries so arrays decode as aligned views
+
+# Structures smaller than this are stored uncompressed
+_COMPRESS_MIN_BYTES = 1024
+
+
+class QueryResponse(TypedDict, total=False):
+    """What OrchestratorAgent.process_query returns"""
+    query: str
+    execution_plan: Dict[str, Any]
+    analysis_results: Dict[str, Any]
+    insights: List[str]
+    recommendations: List[Dict[str, Any]]
+    agents_used: List[str]
+    relevant_memories: List[Dict[str, Any]]
+    time_window: Dict[str, Any]
+    explain: str
+    trace: List[Dict[str, Any]]
+    profile: Dict[str, Any]
+
+
+class MemoryRecord(TypedDict):
+    """One entry of the MemorySystem store"""
+    timestamp: str
+    query: str
+    agents_used: List[str]
+    results: Dict[str, Any]
+    insights: str
+
+
+_REQUIRED = {
+    "response": {"query": str, "execution_plan": dict, "analysis_results": dict, "insights": list,
+                 "recommendations": list, "agents_used": list, "relevant_memories": list},
+    "memory": {"timestamp": str, "query": str, "agents_used": list, "results": dict, "insights": str},
+}
+
+
+def validate(record: Dict[str, Any], schema: str = "response"):
+    """Raise ValueError if a required field of the schema is missing or has the wrong type"""
+    for field, kind in _REQUIRED[schema].items():
+        if field not in record:
+            raise ValueError(f"{schema} is missing '{field}'")
+        if not isinstance(record[field], kind):
+            raise ValueError(f"{schema} field '{field}' should be {kind.__name__}, "
+                             f"got {type(record[field]).__name__}")
+
+
+def _key(key):
+    if key is None or isinstance(key, (str, bool, int, float)):
+        return key
+    if isinstance(key, np.generic):
+        return key.item()
+    return str(key)
+
+
+def _plain(obj):
+    """JSON-compatible stand-in for a value that is not a container, number, string, array or bytes"""
+    if isinstance(obj, np.generic):
+        return obj.item() if not isinstance(obj, np.datetime64) else str(obj)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.to_dict()
+    if isinstance(obj, pd.Index):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if obj is pd.NaT:
+        return None
+    if hasattr(obj, 'savefig'):  # matplotlib Figure
+        return "Matplotlib Figure"
+    # Timestamps, dates, dtypes and anything else
+    return str(obj)
+
+
+def normalize(obj, images: bool = True):
+    """Convert a response to plain dicts, lists, strings, numbers, None and bytes.
+
+    numpy scalars become Python numbers, arrays lists, frames and series
+    their to_dict(), dates and dtypes strings and figures a placeholder.
+    Chart image bytes are replaced by their size unless images is set.
+    """
+    kind = type(obj)
+    if obj is None or kind is str or kind is int or kind is float or kind is bool:
+        return obj
+    if isinstance(obj, dict):
+        return {_key(k): normalize(v, images) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [normalize(v, images) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return normalize(obj.tolist(), images)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj) if images else f"Image ({len(obj)} bytes)"
+    return normalize(_plain(obj), images)
+
+
+def _keys_normalized(obj):
+    """Copy of the containers in obj with every dict key made JSON-compatible"""
+    if isinstance(obj, dict):
+        return {_key(k): _keys_normalized(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_keys_normalized(v) for v in obj]
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index, set, frozenset)):
+        return _keys_normalized(_plain(obj))
+    return obj
+
+
+class _Encoder:
+    """Serializes through the C JSON encoder, which only calls back for non-JSON values.
+
+    In binary mode numeric arrays and bytes are moved out of band: the
+    structure holds a small reference and the raw buffer is appended to the
+    frame, so an array costs its nbytes instead of a decimal rendering.
+    """
+
+    def __init__(self, binary: bool, images: bool):
+        self.binary = binary
+        self.images = images
+        self.buffers: List[bytes] = []
+        self.offset = 0
+
+    def _buffer(self, data: bytes) -> List[int]:
+        position = self.offset
+        self.buffers.append(data)
+        padding = -len(data) % _ALIGN
+        if padding:
+            self.buffers.append(b"\x00" * padding)
+        self.offset += len(data) + padding
+        return [position, len(data)]
+
+    def default(self, obj):
+        if isinstance(obj, np.ndarray):
+            if self.binary and obj.dtype.kind in 'biuf':
+                array = np.ascontiguousarray(obj, dtype=obj.dtype.newbyteorder('<'))
+                return {"$array": self._buffer(array.tobytes()), "dtype": array.dtype.str,
+                        "shape": list(array.shape)}
+            return obj.tolist()
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            if not self.images:
+                return f"Image ({len(obj)} bytes)"
+            if self.binary:
+                return {"$bytes": self._buffer(bytes(obj))}
+            return {"$bytes": base64.b64encode(obj).decode("ascii")}
+        return _plain(obj)
+
+    def structure(self, obj) -> bytes:
+        encode = json.JSONEncoder(separators=(",", ":"), default=self.default).encode
+        try:
+            text = encode(obj)
+        except TypeError:
+            # A key JSON does not accept (numpy integer, timestamp, tuple); normalize keys first
+            self.buffers, self.offset = [], 0
+            text = encode(_keys_normalized(obj))
+        return text.encode("utf-8")
+
+
+def _json_hook(obj: Dict[str, Any]):
+    if len(obj) == 1 and "$bytes" in obj:
+        return base64.b64decode(obj["$bytes"])
+    return obj
+
+
+@traced("serialization")
+def dumps(obj, fmt: str = "binary", images: bool = True) -> bytes:
+    """Encode a response or memory payload as a compact binary frame or compact JSON.
+
+    Both formats convert numpy and pandas values from inside the C JSON
+    encoder rather than walking the payload in Python first. A binary frame
+    is MAGIC, a header, the structure as compact JSON (zlib-compressed once
+    it is large enough to pay off) and the raw array and image buffers.
+    """
+    if fmt not in ("binary", "json"):
+        raise ValueError(f"Unsupported serialization format: {fmt}")
+    encoder = _Encoder(fmt == "binary", images)
+    structure = encoder.structure(obj)
+    if fmt == "json":
+        return structure
+
+    flags = 0
+    if len(structure) >= _COMPRESS_MIN_BYTES:
+        structure, flags = zlib.compress(structure, 1), _COMPRESSED
+    padding = b"\x00" * (-(len(MAGIC) + _HEADER.size + len(structure)) % _ALIGN)
+    header = MAGIC + _HEADER.pack(flags, len(structure) + len(padding), encoder.offset)
+    return b"".join([header, structure, padding] + encoder.buffers)
+
+
+@traced("serialization")
+def loads(data: bytes, copy_arrays: bool = False):
+    """Decode either format, detected from the leading bytes.
+
+    Arrays in a binary frame come back as read-only views over data unless
+    copy_arrays is set.
+    """
+    if data[:len(RECORDS_MAGIC)] == RECORDS_MAGIC:
+        return [loads(record, copy_arrays) for _, record, _ in iter_log(io.BytesIO(data))]
+    if data[:len(MAGIC)] != MAGIC:
+        return json.loads(bytes(data), object_hook=_json_hook)
+
+    flags, structure_length, buffer_length = _HEADER.unpack_from(data, len(MAGIC))
+    start = len(MAGIC) + _HEADER.size
+    structure = bytes(data[start:start + structure_length])
+    if flags & _COMPRESSED:
+        structure = zlib.decompressobj().decompress(structure)
+    else:
+        structure = structure.rstrip(b"\x00")
+    if not buffer_length:
+        return json.loads(structure)
+
+    buffers = memoryview(data)[start + structure_length:]
+    if len(buffers) != buffer_length:
+        raise ValueError("Truncated serialization frame")
+
+    def resolve(obj: Dict[str, Any]):
+        if len(obj) == 3 and "$array" in obj:
+            position, length = obj["$array"]
+            array = np.frombuffer(buffers[position:position + length], dtype=np.dtype(obj["dtype"]))
+            array = array.reshape(obj["shape"])
+            return array.copy() if copy_arrays else array
+        if len(obj) == 1 and "$bytes" in obj:
+            position, length = obj["$bytes"]
+            return bytes(buffers[position:position + length])
+        return obj
+
+    return json.loads(structure, object_hook=resolve)
+
+
+def log_header(fmt: str = "binary") -> bytes:
+    """Bytes a record log starts with"""
+    return RECORDS_MAGIC + b"\x00" * (-len(RECORDS_MAGIC) % _ALIGN) if fmt == "binary" else b""
+
+
+def append_log(f: BinaryIO, encoded: bytes, fmt: str = "binary") -> int:
+    """Append one record, encoded with dumps, to a log file open for appending; returns its offset.
+
+    Binary records are length-prefixed frames; JSON records are one line
+    each (compact JSON never contains a raw newline), i.e. JSON Lines.
+    """
+    position = f.tell()
+    if position == 0:
+        header = log_header(fmt)
+        f.write(header)
+        position = len(header)
+    if fmt == "json":
+        f.write(encoded + b"\n")
+        return position
+    f.write(_LENGTH.pack(len(encoded)))
+    f.write(encoded)
+    return position + _LENGTH.size
+
+
+def log_format(head: bytes) -> Optional[str]:
+    """Format of a record log from its first bytes, or None if it is not a log"""
+    if head.startswith(RECORDS_MAGIC):
+        return "binary"
+    if not head.strip() or head.lstrip()[:1] == b"{":
+        return "json"
+    return None
+
+
+def iter_log(f: BinaryIO) -> Iterator[Tuple[int, bytes, int]]:
+    """Offset, encoding and end offset of each record in a log file, read sequentially.
+
+    Stops before a truncated last record, as an interrupted append leaves.
+    """
+    f.seek(0)
+    head = f.read(len(RECORDS_MAGIC))
+    if log_format(head) == "binary":
+        position = len(log_header("binary"))
+        f.seek(position)
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            length, = _LENGTH.unpack(prefix)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield position + _LENGTH.size, data, position + _LENGTH.size + length
+            position += _LENGTH.size + length
+    else:
+        f.seek(0)
+        position = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            if line.strip():
+                yield position, line[:-1], position + len(line)
+            position += len(line)
+
+
+def encode_response(response: Dict[str, Any], fmt: str = "binary", images: bool = True) -> bytes:
+    """Validate a process_query response against QueryResponse and encode it"""
+    validate(response, "response")
+    return dumps(response, fmt, images)
+
+
+def decode_response(data: bytes, copy_arrays: bool = False) -> QueryResponse:
+    response = loads(data, copy_arrays)
+    validate(response, "response")
+    return response
@@ -0,0 +1,324 @@
+import os
+import tempfile
+import uuid
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import Config
+
+# (backend, location, dtype, length): everything a process needs to attach to a column
+ColumnSpec = Tuple[str, str, str, int]
+
+
+class _Segment:
+    """Owner handle for one shared-memory block or memory-mapped file"""
+
+    def __init__(self, backend: str, location: str, shm: Optional[SharedMemory] = None):
+        self.backend = backend
+        self.location = location
+        self.shm = shm
+
+    def free(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        elif self.backend == "mmap" and os.path.exists(self.location):
+            os.remove(self.location)
+
+
+def create_segment(array: np.ndarray, backend: str = "shm",
+                   directory: Optional[str] = None) -> Tuple[_Segment, ColumnSpec]:
+    """Copy an array into a new shared segment and return its owner handle and spec"""
+    array = np.ascontiguousarray(array)
+    spec_dtype = array.dtype.str
+
+    if backend == "shm":
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+        return _Segment(backend, shm.name, shm), (backend, shm.name, spec_dtype, len(array))
+
+    if backend == "mmap":
+        fd, path = tempfile.mkstemp(prefix="agentic_", suffix=".bin", dir=directory)
+        os.close(fd)
+        if len(array):
+            mapped = np.memmap(path, dtype=array.dtype, mode='w+', shape=array.shape)
+            mapped[:] = array
+            mapped.flush()
+            del mapped
+        return _Segment(backend, path), (backend, path, spec_dtype, len(array))
+
+    raise ValueError(f"Unknown shared data backend: {backend}")
+
+
+def attach_array(spec: ColumnSpec) -> Tuple[Optional[SharedMemory], np.ndarray]:
+    """Map a column read-only; the returned handle must be closed after the views are dropped"""
+    backend, location, dtype, length = spec
+    if backend == "shm":
+        shm = SharedMemory(name=location)
+        array = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+        array.flags.writeable = False
+        return shm, array
+    if length == 0:
+        return None, np.empty(0, dtype=dtype)
+    return None, np.memmap(location, dtype=dtype, mode='r', shape=(length,))
+
+
+def _codes_dtype(categories: int) -> np.dtype:
+    """Smallest signed integer type pandas accepts for categorical codes"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class SharedDataset:
+    """A DataFrame whose columns live in shared memory or memory-mapped files.
+
+    Numeric and datetime columns are stored as flat arrays and string-like
+    columns as categorical codes, so any process can attach to read-only
+    views of the data without copying or pickling it.
+    """
+
+    def __init__(self, name: str, columns: Dict[Any, Dict[str, Any]], num_rows: int,
+                 segments: Optional[List[_Segment]] = None, index: Optional[pd.Index] = None,
+                 passthrough: Optional[Dict[Any, pd.Series]] = None,
+                 column_order: Optional[List] = None):
+        self.name = name
+        self.columns = columns
+        self.num_rows = num_rows
+        self.index = index
+        self.passthrough = passthrough or {}
+        self.column_order = column_order or list(columns)
+        self._segments = segments or []
+        self._handles: List[SharedMemory] = []
+        self._views: Dict[Any, np.ndarray] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self.closed = False
+
+    @classmethod
+    def create(cls, name: str, df: pd.DataFrame, backend: str = "shm",
+               directory: Optional[str] = None) -> "SharedDataset":
+        """Copy a DataFrame into shared segments"""
+        columns, segments, passthrough = {}, [], {}
+        try:
+            for col in df.columns:
+                series = df[col]
+                dtype = series.dtype
+                categories = None
+
+                if isinstance(dtype, np.dtype) and dtype.kind in 'iufb':
+                    kind, array = "numeric", series.to_numpy()
+                elif isinstance(dtype, np.dtype) and dtype.kind == 'M':
+                    kind, array = "datetime", series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+                elif isinstance(dtype, pd.CategoricalDtype):
+                    kind, categories = "categorical", series.cat.categories
+                    array = series.cat.codes.to_numpy().astype(_codes_dtype(len(categories)))
+                elif dtype == object or pd.api.types.is_string_dtype(dtype):
+                    codes, categories = pd.factorize(series, sort=True)
+                    kind, array = "categorical", codes.astype(_codes_dtype(len(categories)))
+                else:
+                    # Extension types we cannot share stay in the owning process only
+                    passthrough[col] = series
+                    continue
+
+                segment, spec = create_segment(array, backend, directory)
+                segments.append(segment)
+                columns[col] = {"kind": kind, "spec": spec, "categories": categories}
+        except Exception:
+            for segment in segments:
+                segment.free()
+            raise
+
+        dataset = cls(name, columns, len(df), segments, df.index, passthrough, list(df.columns))
+        for col, column in columns.items():
+            handle, view = attach_array(column["spec"])
+            if handle is not None:
+                dataset._handles.append(handle)
+            dataset._views[col] = view
+        return dataset
+
+    @classmethod
+    def attach(cls, descriptor: Dict[str, Any]) -> "SharedDataset":
+        """Attach to a dataset created in another process (read-only, does not own the segments)"""
+        dataset = cls(descriptor["name"], descriptor["columns"], descriptor["num_rows"])
+        for col, column in dataset.columns.items():
+            handle, view = attach_array(column["spec"])
+            if handle is not None:
+                dataset._handles.append(handle)
+            dataset._views[col] = view
+        return dataset
+
+    def descriptor(self) -> Dict[str, Any]:
+        """Picklable description that other processes can attach to"""
+        return {"name": self.name, "columns": self.columns, "num_rows": self.num_rows}
+
+    def column_spec(self, col) -> Optional[ColumnSpec]:
+        column = self.columns.get(col)
+        return column["spec"] if column else None
+
+    def column_kind(self, col) -> Optional[str]:
+        column = self.columns.get(col)
+        return column["kind"] if column else None
+
+    def categories(self, col) -> Optional[pd.Index]:
+        column = self.columns.get(col)
+        return column["categories"] if column else None
+
+    def view(self, col) -> np.ndarray:
+        """Read-only view of the stored array (codes for categorical columns)"""
+        return self._views[col]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(view.nbytes for view in self._views.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Zero-copy DataFrame over the shared views"""
+        if self.closed:
+            raise ValueError(f"Shared dataset '{self.name}' has been dropped")
+        if self._frame is not None:
+            return self._frame
+
+        data = {}
+        for col in self.column_order:
+            if col in self.passthrough:
+                data[col] = self.passthrough[col].array
+                continue
+            column = self.columns[col]
+            view = self._views[col]
+            if column["kind"] == "datetime":
+                data[col] = view.view('datetime64[ns]')
+            elif column["kind"] == "categorical":
+                data[col] = pd.Categorical.from_codes(view, categories=column["categories"])
+            else:
+                data[col] = view
+
+        self._frame = pd.DataFrame(data, index=self.index, copy=False)
+        return self._frame
+
+    def backs(self, df: pd.DataFrame, col) -> bool:
+        """Whether a frame's column is a view over this dataset's segment for it"""
+        column = self.columns.get(col)
+        if column is None or self.closed or len(df) != self.num_rows or col not in df.columns:
+            return False
+        values = df[col].array
+        if column["kind"] == "categorical":
+            if not hasattr(values, "codes") or not values.categories.equals(column["categories"]):
+                return False
+            values = values.codes
+        array, view = np.asarray(values), self._views[col]
+        # Overlapping is not enough: a reordered or shifted view shares memory too
+        return (np.shares_memory(array, view) and array.strides == view.strides
+                and array.__array_interface__["data"][0] == view.__array_interface__["data"][0])
+
+    def owns(self, df: pd.DataFrame) -> bool:
+        """Whether every shared column a frame has is backed by this dataset's segments"""
+        present = [col for col in self.columns if col in df.columns]
+        return bool(present) and all(self.backs(df, col) for col in present)
+
+    def close(self):
+        """Drop the views and detach; owners also free the segments"""
+        self._frame = None
+        self._views.clear()
+        for handle in self._handles:
+            handle.close()
+        self._handles.clear()
+        for segment in self._segments:
+            segment.free()
+        self._segments.clear()
+        self.closed = True
+
+
+def _free_datasets(datasets: Dict[str, SharedDataset]):
+    for dataset in list(datasets.values()):
+        dataset.close()
+    datasets.clear()
+
+
+class SharedDatasetRegistry:
+    """Registers DataFrames as shared datasets and frees their segments when they are dropped"""
+
+    def __init__(self, backend: Optional[str] = None, directory: Optional[str] = None):
+        self.backend = backend or Config.SHARED_DATA_BACKEND
+        self.directory = directory or Config.SHARED_DATA_DIR
+        self._datasets: Dict[str, SharedDataset] = {}
+        self._sources: Dict[int, str] = {}
+        # Free everything at interpreter exit or when the registry is collected
+        self._finalizer = weakref.finalize(self, _free_datasets, self._datasets)
+
+    def register(self, df: pd.DataFrame, name: Optional[str] = None) -> SharedDataset:
+        """Copy a DataFrame into shared memory under a name"""
+        name = name or f"dataset_{uuid.uuid4().hex[:8]}"
+        if name in self._datasets:
+            self.drop(name)
+        # A frame registered again may have changed since; its earlier copy is superseded
+        previous = self._sources.get(id(df))
+        if previous is not None:
+            self.drop(previous)
+
+        dataset = SharedDataset.create(name, df, self.backend, self.directory)
+        self._datasets[name] = dataset
+        self._sources[id(df)] = name
+        # Release the segments once the source frame is garbage collected
+        weakref.finalize(df, self._source_collected, id(df), name)
+        return dataset
+
+    def share(self, df: pd.DataFrame) -> SharedDataset:
+        """Return the dataset backing a frame, or copy the frame into a new one.
+
+        A source frame is copied again on every call, since it may have been
+        modified in place since it was last shared; frames from to_frame()
+        are reused as long as their columns are still views over the segments.
+        """
+        existing = self.dataset_for(df)
+        return existing if existing is not None else self.register(df)
+
+    def dataset_for(self, df: pd.DataFrame) -> Optional[SharedDataset]:
+        """Find the dataset whose segments back every shared column of a frame"""
+        for dataset in self._datasets.values():
+            if dataset.owns(df):
+                return dataset
+        return None
+
+    def release(self, df: pd.DataFrame):
+        """Free the dataset backing a frame and the one it was last registered as"""
+        dataset = self.dataset_for(df)
+        if dataset is not None:
+            self.drop(dataset.name)
+        name = self._sources.get(id(df))
+        if name is not None:
+            self.drop(name)
+
+    def get(self, name: str) -> SharedDataset:
+        return self._datasets[name]
+
+    def drop(self, name: str):
+        """Free a dataset's segments"""
+        dataset = self._datasets.pop(name, None)
+        if dataset is not None:
+            dataset.close()
+        self._sources = {k: v for k, v in self._sources.items() if v != name}
+
+    def drop_all(self):
+        _free_datasets(self._datasets)
+        self._sources.clear()
+
+    def _source_collected(self, source_id: int, name: str):
+        if self._sources.get(source_id) == name:
+            self.drop(name)
+
+    def names(self) -> List[str]:
+        return list(self._datasets)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(dataset.nbytes for dataset in self._datasets.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._datasets
+
+    def __len__(self) -> int:
+        return len(self._datasets)
@@ -0,0 +1,258 @@
+"""Scalable synthetic data generation for load testing.
+
+Generate 100M rows into a directory of Parquet part files on 8 cores:
+
+    python -m tools.synthetic_data --rows 100000000 --output data/ --format parquet --workers 8
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Union
+import numpy as np
+import pandas as pd
+
+# name, baseline level, relative noise, dtype
+_NUMERIC_SPECS = [
+    ("sales", 5000.0, 0.35, "int64"),
+    ("quantity", 50.0, 0.45, "int64"),
+    ("customer_satisfaction", 3.0, 0.2, "float64"),
+]
+_CATEGORICAL_NAMES = ["product", "region"]
+
+
+class SyntheticDataGenerator:
+    """Generates large sales-like datasets as independent, reproducible chunks"""
+
+    def __init__(self, rows: int = 1_000_000, chunk_size: int = 1_000_000,
+                 numeric_columns: int = 4, categorical_columns: int = 2,
+                 cardinality: Union[int, List[int]] = 4, start_date: str = "2024-01-01",
+                 days: int = 730, trend: float = 0.0005, seasonality: float = 0.15,
+                 weekly_seasonality: float = 0.05, anomaly_rate: float = 0.001,
+                 anomaly_scale: float = 6.0, missing_rate: float = 0.0, seed: int = 42):
+        if isinstance(cardinality, int):
+            cardinality = [cardinality] * categorical_columns
+        if len(cardinality) != categorical_columns:
+            raise ValueError("cardinality must have one entry per categorical column")
+
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.numeric_columns = numeric_columns
+        self.categorical_columns = categorical_columns
+        self.cardinality = list(cardinality)
+        self.start_date = np.datetime64(start_date, "D")
+        self.days = days
+        self.trend = trend
+        self.seasonality = seasonality
+        self.weekly_seasonality = weekly_seasonality
+        self.anomaly_rate = anomaly_rate
+        self.anomaly_scale = anomaly_scale
+        self.missing_rate = missing_rate
+        self.seed = seed
+
+        self.categorical_names = [
+            _CATEGORICAL_NAMES[i] if i < len(_CATEGORICAL_NAMES) else f"category_{i}"
+            for i in range(categorical_columns)
+        ]
+        self.numeric_specs = self._build_numeric_specs()
+        self.category_labels = [
+            np.array([f"{name}_{k}" for k in range(card)], dtype=object)
+            for name, card in zip(self.categorical_names, self.cardinality)
+        ]
+        self.category_effects = self._build_category_effects()
+
+    @property
+    def num_chunks(self) -> int:
+        return (self.rows + self.chunk_size - 1) // self.chunk_size
+
+    def _build_numeric_specs(self) -> List[tuple]:
+        """Column specs, with revenue derived from sales when there is room for it"""
+        specs = list(_NUMERIC_SPECS[:self.numeric_columns])
+        if self.numeric_columns > len(_NUMERIC_SPECS):
+            specs.append(("revenue", None, 0.1, "float64"))
+        for i in range(len(specs), self.numeric_columns):
+            specs.append((f"metric_{i}", 100.0, 0.3, "float64"))
+        return specs
+
+    def _build_category_effects(self) -> List[np.ndarray]:
+        """Per-category level multipliers, shared by every chunk"""
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(1,)))
+        return [rng.uniform(0.7, 1.3, card) for card in self.cardinality]
+
+    def chunk_rng(self, index: int) -> np.random.Generator:
+        """Independent random stream for one chunk, so chunks can be generated in any order"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(0, index)))
+
+    def generate_chunk(self, index: int) -> pd.DataFrame:
+        """Generate one chunk of rows"""
+        start = index * self.chunk_size
+        n = min(self.chunk_size, self.rows - start)
+        rng = self.chunk_rng(index)
+
+        # Dates advance with the global row position so the dataset spans the full period
+        positions = np.arange(start, start + n, dtype=np.int64)
+        day = (positions * self.days) // max(self.rows, 1)
+        dates = self.start_date + day.astype("timedelta64[D]")
+
+        # Trend plus yearly and weekly seasonality
+        level = (1.0 + self.trend * day
+                 + self.seasonality * np.sin(2 * np.pi * day / 365.25)
+                 + self.weekly_seasonality * np.sin(2 * np.pi * day / 7))
+
+        data: Dict[str, Any] = {"date": dates.astype("datetime64[ns]")}
+
+        for name, labels, effects in zip(self.categorical_names, self.category_labels,
+                                         self.category_effects):
+            codes = rng.integers(0, len(labels), n)
+            level = level * effects[codes]
+            if self.missing_rate:
+                codes[rng.random(n) < self.missing_rate] = -1
+            data[name] = pd.Categorical.from_codes(codes, categories=labels)
+
+        for name, base, noise, dtype in self.numeric_specs:
+            if base is None:
+                values = data["sales"] * rng.uniform(0.8, 1.2, n)
+            else:
+                values = base * level * (1.0 + noise * rng.standard_normal(n))
+            values = np.maximum(values, 0.0)
+
+            if self.anomaly_rate:
+                anomalies = rng.random(n) < self.anomaly_rate
+                values[anomalies] *= self.anomaly_scale
+
+            if name == "customer_satisfaction":
+                values = np.clip(values, 1.0, 5.0)
+            if dtype == "int64":
+                values = np.rint(values)
+
+            if self.missing_rate:
+                values[rng.random(n) < self.missing_rate] = np.nan
+            elif dtype == "int64":
+                values = values.astype(np.int64)
+            data[name] = values
+
+        return pd.DataFrame(data)
+
+    def iter_chunks(self, workers: int = 1) -> Iterator[pd.DataFrame]:
+        """Yield chunks in order, generating them across processes when workers > 1"""
+        if workers <= 1:
+            for index in range(self.num_chunks):
+                yield self.generate_chunk(index)
+            return
+
+        # Keep a bounded window of chunks in flight so memory stays flat
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            next_index = 0
+            while next_index < self.num_chunks or pending:
+                while next_index < self.num_chunks and len(pending) < workers * 2:
+                    pending.append(executor.submit(self.generate_chunk, next_index))
+                    next_index += 1
+                yield pending.pop(0).result()
+
+    def generate(self) -> pd.DataFrame:
+        """Generate the whole dataset in memory"""
+        return pd.concat(list(self.iter_chunks()), ignore_index=True)
+
+    def write(self, path: str, fmt: str = "parquet", workers: int = 1) -> Dict[str, Any]:
+        """Stream all chunks into a single Parquet or CSV file"""
+        path = Path(path)
+        rows_written = 0
+
+        if fmt == "parquet":
+            pa, pq = _require_pyarrow()
+            writer = None
+            try:
+                for chunk in self.iter_chunks(workers):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(str(path), table.schema)
+                    writer.write_table(table)
+                    rows_written += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        elif fmt == "csv":
+            for i, chunk in enumerate(self.iter_chunks(workers)):
+                chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+                rows_written += len(chunk)
+
+        else:
+            raise ValueError(f"Unsupported output format: {fmt}")
+
+        return {"path": str(path), "rows": rows_written, "chunks": self.num_chunks}
+
+    def write_partitioned(self, directory: str, fmt: str = "parquet",
+                          workers: int = 1) -> Dict[str, Any]:
+        """Write one part file per chunk, with each worker writing its own chunks"""
+        if fmt == "parquet":
+            _require_pyarrow()
+        elif fmt != "csv":
+            raise ValueError(f"Unsupported output format: {fmt}")
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        indices = range(self.num_chunks)
+
+        if workers <= 1:
+            paths = [self._write_part(i, str(directory), fmt) for i in indices]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                paths = list(executor.map(self._write_part, indices,
+                                          [str(directory)] * len(indices), [fmt] * len(indices)))
+
+        return {"path": str(directory), "rows": self.rows, "chunks": len(paths), "files": paths}
+
+    def _write_part(self, index: int, directory: str, fmt: str) -> str:
+        chunk = self.generate_chunk(index)
+        path = os.path.join(directory, f"part-{index:05d}.{fmt}")
+        if fmt == "parquet":
+            chunk.to_parquet(path, index=False)
+        else:
+            chunk.to_csv(path, index=False)
+        return path
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic sales data for load testing")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--numeric-columns", type=int, default=4)
+    parser.add_argument("--categorical-columns", type=int, default=2)
+    parser.add_argument("--cardinality", type=int, nargs="+", default=[4])
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--anomaly-rate", type=float, default=0.001)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", required=True,
+                        help="Output file, or directory of part files when it ends with '/'")
+    args = parser.parse_args()
+
+    cardinality = args.cardinality[0] if len(args.cardinality) == 1 else args.cardinality
+    generator = SyntheticDataGenerator(
+        rows=args.rows, chunk_size=args.chunk_size, numeric_columns=args.numeric_columns,
+        categorical_columns=args.categorical_columns, cardinality=cardinality, days=args.days,
+        anomaly_rate=args.anomaly_rate, missing_rate=args.missing_rate, seed=args.seed
+    )
+
+    if args.output.endswith("/"):
+        result = generator.write_partitioned(args.output, args.format, args.workers)
+    else:
+        result = generator.write(args.output, args.format, args.workers)
+    print(f"✅ Wrote {result['rows']:,} rows in {result['chunks']} chunks to {result['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import re
+import weakref
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+from tools.frame_snapshot import FrameSnapshot
+from tools.tracer import traced
+
+_DATE = r"(\d{4}-\d{2}-\d{2})"
+_RANGE_PATTERN = re.compile(rf"\b(?:between|from)\s+{_DATE}\s+(?:and|to|until)\s+{_DATE}")
+_SINCE_PATTERN = re.compile(rf"\b(?:since|after|from)\s+{_DATE}")
+_LAST_PATTERN = re.compile(r"\b(?:last|past|previous)\s+(\d+\s+)?(day|week|month|quarter|year)s?\b")
+
+_UNIT_OFFSETS = {
+    "day": lambda n: pd.Timedelta(days=n),
+    "week": lambda n: pd.Timedelta(weeks=n),
+    "month": lambda n: pd.DateOffset(months=n),
+    "quarter": lambda n: pd.DateOffset(months=3 * n),
+    "year": lambda n: pd.DateOffset(years=n),
+}
+
+
+def parse_time_window(query: str) -> Optional[Dict[str, Any]]:
+    """Extract a time window such as "last 30 days" or "since 2024-06-01" from a query"""
+    query_lower = query.lower()
+
+    match = _RANGE_PATTERN.search(query_lower)
+    if match:
+        return {"start": pd.Timestamp(match.group(1)),
+                "end": pd.Timestamp(match.group(2)) + pd.Timedelta(days=1),
+                "label": match.group(0)}
+
+    match = _SINCE_PATTERN.search(query_lower)
+    if match:
+        return {"start": pd.Timestamp(match.group(1)), "label": match.group(0)}
+
+    match = _LAST_PATTERN.search(query_lower)
+    if match:
+        count = int(match.group(1)) if match.group(1) else 1
+        return {"last": _UNIT_OFFSETS[match.group(2)](count), "label": match.group(0)}
+
+    return None
+
+
+class TimeIndex:
+    """Parsed, time-sorted view of a date column.
+
+    The column is parsed once and a stable sorted permutation of its valid
+    (non-NaT) rows is kept, so range lookups are binary searches and analyses
+    can read values in time order without sorting or copying the frame.
+    """
+
+    def __init__(self, column: str, order: np.ndarray, values: np.ndarray, num_rows: int):
+        self.column = column
+        self.order = order
+        self.values = values
+        self.num_rows = num_rows
+        self._seconds: Optional[np.ndarray] = None
+
+    @classmethod
+    @traced("time_index")
+    def build(cls, df: pd.DataFrame, date_col: str) -> "TimeIndex":
+        parsed = pd.to_datetime(df[date_col]).to_numpy(dtype='datetime64[ns]')
+        valid = ~np.isnat(parsed)
+
+        if valid.all() and (parsed[1:] >= parsed[:-1]).all():
+            # Already in time order, e.g. a frame sliced from another index
+            order = np.arange(len(parsed))
+        else:
+            positions = np.flatnonzero(valid)
+            order = positions[np.argsort(parsed[positions], kind='stable')]
+
+        values = parsed[order]
+        values.flags.writeable = False
+        order.flags.writeable = False
+        return cls(date_col, order, values, len(df))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @property
+    def start(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.values[0]) if len(self) else None
+
+    @property
+    def end(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.values[-1]) if len(self) else None
+
+    def bounds(self, start=None, end=None) -> Tuple[int, int]:
+        """Sorted positions [lo, hi) of rows with start <= t < end"""
+        lo = 0 if start is None else int(np.searchsorted(self.values, np.datetime64(start, 'ns'), 'left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.values, np.datetime64(end, 'ns'), 'left'))
+        return lo, max(lo, hi)
+
+    def positions(self, start=None, end=None) -> np.ndarray:
+        """Row positions in the window, in time order (a view, not a copy)"""
+        lo, hi = self.bounds(start, end)
+        return self.order[lo:hi]
+
+    def slice(self, df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+        """Rows in the window, in time order"""
+        return df.take(self.positions(start, end))
+
+    def resolve(self, window: Dict[str, Any]) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """Turn a parsed window into [start, end) bounds; "last N" is relative to the latest row"""
+        if "last" in window:
+            if not len(self):
+                return None, None
+            end = self.end + pd.Timedelta(1, 'ns')
+            return self.end - window["last"] + pd.Timedelta(1, 'ns'), end
+        return window.get("start"), window.get("end")
+
+    def seconds(self) -> np.ndarray:
+        """Epoch seconds of the valid rows in time order"""
+        if self._seconds is None:
+            self._seconds = self.values.view(np.int64) // 10**9
+        return self._seconds
+
+    def take(self, series: pd.Series) -> np.ndarray:
+        """Values of a column in time order"""
+        return series.to_numpy()[self.order]
+
+
+class TimeIndexCache:
+    """Builds one time index per DataFrame and date column.
+
+    An index is rebuilt when the date column no longer holds the array it
+    was built from, e.g. after the column is reassigned.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[int, str], Tuple[FrameSnapshot, TimeIndex]] = {}
+
+    def get(self, df: pd.DataFrame, date_col: str) -> TimeIndex:
+        index = self.peek(df, date_col)
+        if index is None:
+            key = (id(df), date_col)
+            index = TimeIndex.build(df, date_col)
+            if key not in self._indexes:
+                weakref.finalize(df, self._indexes.pop, key, None)
+            self._indexes[key] = (FrameSnapshot(df, [date_col]), index)
+        return index
+
+    def peek(self, df: pd.DataFrame, date_col: str) -> Optional[TimeIndex]:
+        """The index for a frame if one has been built from its current date column, without building it"""
+        entry = self._indexes.get((id(df), date_col))
+        return entry[1] if entry is not None and entry[0].matches(df) else None
+
+    def clear(self):
+        self._indexes.clear()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
@@ -0,0 +1,261 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import pandas as pd
+from config import Config
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def _current_memory() -> int:
+    """Current memory in bytes (traced heap when profiling, otherwise RSS)"""
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class Span:
+    """A single timed operation"""
+
+    def __init__(self, name: str, category: str, trace_id: str,
+                 parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.time_ns()
+        self.end_ns = self.start_ns
+        self._start_perf = time.perf_counter_ns()
+        self._start_memory = _current_memory()
+
+    def set(self, **attributes):
+        """Attach extra attributes to the span"""
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start_perf)
+        self.attributes["memory_delta_bytes"] = _current_memory() - self._start_memory
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """Collects nested spans and exports them as Chrome or OpenTelemetry JSON.
+
+    With enabled left as None the tracer follows Config.TRACING_ENABLED,
+    read each time a span starts, so it can be switched on at runtime.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_spans: int = 10000,
+                 service_name: str = "agentic_analytics"):
+        self._enabled = enabled
+        self.service_name = service_name
+        self.spans = deque(maxlen=max_spans)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return Config.TRACING_ENABLED if self._enabled is None else self._enabled
+
+    def set_enabled(self, enabled: Optional[bool]):
+        """Turn tracing on or off for this tracer; None follows Config.TRACING_ENABLED again"""
+        self._enabled = enabled
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **attributes):
+        """Time the enclosed block as a child of the current span"""
+        if not self.enabled:
+            yield None
+            return
+
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        span = Span(name, category, trace_id, parent.span_id if parent else None, attributes)
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.finish()
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Return the finished spans of one trace"""
+        return [s.to_dict() for s in self.spans if s.trace_id == trace_id]
+
+    def clear(self):
+        self.spans.clear()
+
+    @contextmanager
+    def profile(self, output_dir: str, name: str, top_n: int = 20):
+        """Run the block under cProfile and tracemalloc and collect a report"""
+        report: Dict[str, Any] = {}
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+            profile_file = output_path / f"{name}.prof"
+            profiler.dump_stats(str(profile_file))
+
+            stats_stream = io.StringIO()
+            pstats.Stats(profiler, stream=stats_stream).sort_stats("cumulative").print_stats(top_n)
+
+            report.update({
+                "profile_file": str(profile_file),
+                "top_functions": stats_stream.getvalue(),
+                "peak_traced_bytes": peak,
+                "top_allocations": [
+                    {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:top_n]
+                ]
+            })
+
+    def export_chrome_trace(self, path: str):
+        """Write spans in the Chrome trace event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for span in list(self.spans):
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {"trace_id": span.trace_id, "span_id": span.span_id,
+                         "parent_id": span.parent_id, **span.attributes}
+            })
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def export_otel(self, path: str):
+        """Write spans as OTLP/JSON (OpenTelemetry collector file format)"""
+        spans = []
+        for span in list(self.spans):
+            otel_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [_otel_attribute("category", span.category)] +
+                              [_otel_attribute(k, v) for k, v in span.attributes.items()]
+            }
+            if span.parent_id:
+                otel_span["parentSpanId"] = span.parent_id
+            if "error" in span.attributes:
+                otel_span["status"] = {"code": 2, "message": span.attributes["error"]}
+            spans.append(otel_span)
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otel_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "agentic_analytics.tracer"}, "spans": spans}]
+            }]
+        }
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+    def export(self, path: str, fmt: str = "chrome"):
+        if fmt == "otel":
+            self.export_otel(path)
+        else:
+            self.export_chrome_trace(path)
+
+
+def _otel_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_tracer = Tracer(max_spans=Config.TRACE_MAX_SPANS)
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer shared by the agents and tools"""
+    return _tracer
+
+
+def traced(category: str):
+    """Decorator that wraps a tool call in a span and records rows processed"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+
+            attributes = {}
+            for arg in list(args) + list(kwargs.values()):
+                if isinstance(arg, pd.DataFrame):
+                    attributes["rows"] = len(arg)
+                    attributes["columns"] = len(arg.columns)
+                    break
+            with tracer.span(func.__qualname__, category, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,8 +1,14 @@
+import math
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 from typing import Optional, List
 import numpy as np
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+from config import Config
+from tools.distribution import DistributionProfiler, Histogram
+from tools.tracer import traced
 
 class VizTools:
     """Tools for data visualization"""
@@ -11,6 +17,7 @@ class VizTools:
         plt.style.use(style)
         self.figsize = figsize
     
+    @traced("viz")
     def create_line_chart(self, df: pd.DataFrame, x_col: str, y_col: str, 
                          title: str = "Line Chart", save_path: Optional[str] = None):
         """Create a line chart"""
@@ -28,6 +35,7 @@ class VizTools:
         
         return fig
     
+    @traced("viz")
     def create_bar_chart(self, df: pd.DataFrame, x_col: str, y_col: str,
                         title: str = "Bar Chart", save_path: Optional[str] = None):
         """Create a bar chart"""
@@ -45,6 +53,7 @@ class VizTools:
         
         return fig
     
+    @traced("viz")
     def create_scatter_plot(self, df: pd.DataFrame, x_col: str, y_col: str,
                            hue_col: Optional[str] = None, title: str = "Scatter Plot",
                            save_path: Optional[str] = None):
@@ -70,12 +79,34 @@ class VizTools:
         
         return fig
     
+    @traced("viz")
     def create_heatmap(self, df: pd.DataFrame, title: str = "Correlation Heatmap",
-                      save_path: Optional[str] = None):
-        """Create a correlation heatmap"""
-        fig, ax = plt.subplots(figsize=self.figsize)
-        sns.heatmap(df, annot=True, fmt='.2f', cmap='coolwarm', center=0,
-                   square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+                      save_path: Optional[str] = None, cluster: Optional[bool] = None,
+                      top_k: Optional[int] = None, annotate_threshold: Optional[float] = None):
+        """Create a correlation heatmap.
+
+        Matrices up to Config.HEATMAP_DETAIL_MAX_COLS columns are drawn with
+        seaborn and annotated in every cell. Wider ones are drawn as a single
+        imshow image, reordered by hierarchical clustering so correlated blocks
+        sit together, and only cells with |value| >= annotate_threshold are
+        annotated. top_k keeps the k most strongly correlated columns.
+        """
+        matrix = df.select_dtypes(include=['number'])
+        if top_k is not None and top_k < len(matrix.columns):
+            matrix = self._top_correlated(matrix, top_k)
+        
+        detailed = len(matrix.columns) <= Config.HEATMAP_DETAIL_MAX_COLS
+        if cluster is None:
+            cluster = not detailed
+        if cluster:
+            matrix = self._cluster_order(matrix)
+        
+        if detailed:
+            fig, ax = plt.subplots(figsize=self.figsize)
+            sns.heatmap(matrix, annot=True, fmt='.2f', cmap='coolwarm', center=0,
+                       square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+        else:
+            fig, ax = self._draw_matrix(matrix, annotate_threshold)
         ax.set_title(title)
         plt.tight_layout()
         
@@ -84,14 +115,110 @@ class VizTools:
         
         return fig
     
+    def create_heatmap_tiles(self, df: pd.DataFrame, tile_size: int = Config.HEATMAP_DETAIL_MAX_COLS,
+                             title: str = "Correlation Heatmap", cluster: bool = True) -> List:
+        """Split a clustered matrix into diagonal blocks of tile_size columns, one heatmap each"""
+        matrix = df.select_dtypes(include=['number'])
+        if cluster:
+            matrix = self._cluster_order(matrix)
+        
+        figures = []
+        for start in range(0, len(matrix.columns), tile_size):
+            stop = min(start + tile_size, len(matrix.columns))
+            tile = matrix.iloc[start:stop, start:stop] if self._is_square(matrix) else matrix.iloc[:, start:stop]
+            figures.append(self.create_heatmap(tile, title=f"{title} ({start + 1}-{stop})", cluster=False))
+        return figures
+    
+    def _draw_matrix(self, matrix: pd.DataFrame, annotate_threshold: Optional[float] = None):
+        """imshow rendering of a wide matrix with sparse labels and thresholded annotations"""
+        if annotate_threshold is None:
+            annotate_threshold = Config.HEATMAP_ANNOTATE_THRESHOLD
+        values = matrix.to_numpy(dtype=np.float64)
+        rows, cols = values.shape
+        
+        if self._is_square(matrix):
+            vmin, vmax = -1.0, 1.0
+        else:
+            limit = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+            vmin, vmax = -limit, limit
+        
+        side = max(self.figsize[1], min(cols / 8, 24))
+        fig, ax = plt.subplots(figsize=(side * 1.15, side))
+        image = ax.imshow(values, cmap='coolwarm', vmin=vmin, vmax=vmax,
+                          interpolation='nearest', aspect='equal' if rows == cols else 'auto')
+        fig.colorbar(image, ax=ax, shrink=0.8)
+        ax.grid(False)
+        
+        # Label every column while they stay legible, otherwise every n-th
+        for axis, labels, count in ((ax.xaxis, matrix.columns, cols), (ax.yaxis, matrix.index, rows)):
+            step = max(1, math.ceil(count / Config.HEATMAP_MAX_LABELS))
+            ticks = np.arange(0, count, step)
+            axis.set_ticks(ticks)
+            axis.set_ticklabels([str(labels[i]) for i in ticks], fontsize=6 if step == 1 else 7)
+        plt.setp(ax.get_xticklabels(), rotation=90)
+        
+        # Annotate the strongest off-diagonal cells only, capped so text never dominates the render
+        strength = np.abs(np.nan_to_num(values))
+        if rows == cols:
+            np.fill_diagonal(strength, 0.0)
+        cells = np.flatnonzero(strength >= annotate_threshold)
+        if len(cells) > Config.HEATMAP_MAX_ANNOTATIONS:
+            keep = np.argpartition(strength.ravel()[cells], -Config.HEATMAP_MAX_ANNOTATIONS)
+            cells = cells[keep[-Config.HEATMAP_MAX_ANNOTATIONS:]]
+        fontsize = max(3, min(8, 400 / max(rows, cols)))
+        for row, col in zip(*np.unravel_index(cells, values.shape)):
+            ax.text(col, row, f"{values[row, col]:.2f}", ha='center', va='center', fontsize=fontsize)
+        
+        return fig, ax
+    
+    @staticmethod
+    def _is_square(matrix: pd.DataFrame) -> bool:
+        return matrix.shape[0] == matrix.shape[1] and matrix.index.equals(matrix.columns)
+    
+    @staticmethod
+    def _cluster_order(matrix: pd.DataFrame) -> pd.DataFrame:
+        """Reorder a correlation matrix so that strongly correlated columns are adjacent"""
+        if not VizTools._is_square(matrix) or len(matrix.columns) < 3:
+            return matrix
+        distance = 1.0 - np.abs(np.nan_to_num(matrix.to_numpy(dtype=np.float64)))
+        distance = (distance + distance.T) / 2
+        np.fill_diagonal(distance, 0.0)
+        order = leaves_list(linkage(squareform(np.clip(distance, 0.0, None), checks=False), method='average'))
+        return matrix.iloc[order, order]
+    
+    @staticmethod
+    def _top_correlated(matrix: pd.DataFrame, k: int) -> pd.DataFrame:
+        """Block of the k columns with the strongest correlation to any other column"""
+        if not VizTools._is_square(matrix):
+            return matrix.iloc[:, :k]
+        strength = np.abs(np.nan_to_num(matrix.to_numpy(dtype=np.float64)))
+        np.fill_diagonal(strength, 0.0)
+        top = np.sort(np.argsort(strength.max(axis=0), kind='stable')[::-1][:k])
+        return matrix.iloc[top, top]
+    
+    @traced("viz")
     def create_distribution_plot(self, df: pd.DataFrame, column: str,
                                 title: str = "Distribution Plot",
                                 save_path: Optional[str] = None):
-        """Create a distribution plot with histogram and KDE"""
+        """Create a histogram of a column, binned in one vectorized pass"""
+        distribution = DistributionProfiler().profile_columns(df, [column])[column]
+        histogram = distribution.histogram or Histogram.uniform(0.0, 1.0, 1)
+        return self.create_histogram_plot(histogram.edges, histogram.counts, column, title, save_path)
+    
+    @traced("viz")
+    def create_histogram_plot(self, edges, counts, column: str, title: str = "Distribution Plot",
+                              save_path: Optional[str] = None):
+        """Draw precomputed bin counts; unequal bins are drawn as densities"""
+        edges = np.asarray(edges, dtype=np.float64)
+        counts = np.asarray(counts, dtype=np.float64)
+        widths = np.diff(edges)
+        uniform = np.allclose(widths, widths[0]) if len(widths) else True
+        heights = counts if uniform else np.divide(counts, widths, out=np.zeros_like(counts), where=widths > 0)
+        
         fig, ax = plt.subplots(figsize=self.figsize)
-        ax.hist(df[column], bins=30, alpha=0.7, color='steelblue', edgecolor='black')
+        ax.bar(edges[:-1], heights, width=widths, align='edge', alpha=0.7, color='steelblue', edgecolor='black')
         ax.set_xlabel(column)
-        ax.set_ylabel('Frequency')
+        ax.set_ylabel('Frequency' if uniform else 'Density (count per unit)')
         ax.set_title(title)
         ax.grid(True, alpha=0.3, axis='y')
         plt.tight_layout()